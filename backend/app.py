@@ -1,16 +1,39 @@
 import os
+import time
 from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 from config import config
-from extensions import db, jwt
-from database import init_db
+from extensions import (
+    db, jwt, event_hub, rate_limiter, metrics, replica_router,
+    importer, idempotency, catalog_gc, trending, revocation_store, progress_buffer, profiler,
+    slow_queries, response_cache, friend_suggestions,
+)
+from database import init_db, configure_sqlite
 
 # Load environment variables from .env file
 load_dotenv()
 
+class StartupTimer:
+    """Records how long each create_app phase takes."""
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    def summary(self):
+        total = (self._last - self.started) * 1000
+        parts = ", ".join(f"{phase} {ms:.1f}ms" for phase, ms in self.phases)
+        return f"Startup took {total:.1f}ms ({parts})"
+
 def create_app(config_name=None):
     """Application factory that configures extensions and routes."""
+    timer = StartupTimer()
     app = Flask(__name__)
 
     env_config = config_name or os.environ.get('FLASK_CONFIG', 'default')
@@ -26,29 +49,77 @@ def create_app(config_name=None):
 
     # Configure JWT secret; fall back to SECRET_KEY if none provided.
     app.config.setdefault('JWT_SECRET_KEY', os.environ.get('JWT_SECRET_KEY') or app.config.get('SECRET_KEY'))
+    timer.mark('config')
 
     CORS(app)
     db.init_app(app)
+    configure_sqlite(app)
     jwt.init_app(app)
+    event_hub.init_app(app)
+    rate_limiter.init_app(app)
+    metrics.init_app(app)
+    replica_router.init_app(app)
+    importer.init_app(app)
+    idempotency.init_app(app)
+    catalog_gc.init_app(app)
+    trending.init_app(app)
+    revocation_store.init_app(app)
+    progress_buffer.init_app(app)
+    profiler.init_app(app)
+    slow_queries.init_app(app)
+    response_cache.init_app(app)
+    friend_suggestions.init_app(app)
+    timer.mark('extensions')
 
     # Register Blueprints
     from routes.auth import auth_bp
     from routes.health import health_bp
     from routes.goals import goals_bp
     from routes.books import books_bp
+    from routes.events import events_bp
+    from routes.export import export_bp
+    from routes.imports import imports_bp
+    from routes.dashboard import dashboard_bp
+    from routes.reading import reading_bp
+    from routes.follows import follows_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(health_bp, url_prefix='/api')
     app.register_blueprint(goals_bp, url_prefix='/api')
     app.register_blueprint(books_bp, url_prefix='/api')
+    app.register_blueprint(events_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(imports_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api')
+    app.register_blueprint(reading_bp, url_prefix='/api')
+    app.register_blueprint(follows_bp, url_prefix='/api')
+
+    from services.ratings import rebuild_ratings_command
+    app.cli.add_command(rebuild_ratings_command)
+    timer.mark('blueprints')
     
-    
-    # Initialize the Ephemeral DB (create tables + seed)
-    init_db(app, seed=True)
+    # Initialize the Ephemeral DB (create tables + seed). Under the production
+    # server this runs once in the master process (see gunicorn.conf.py).
+    if app.config['INIT_DB_ON_STARTUP']:
+        init_db(app, seed=app.config['SEED_DATABASE'], timer=timer)
 
+    app.logger.info(timer.summary())
     return app
 
 
+def start_background_jobs(app):
+    """
+    Start the periodic jobs (catalog GC, trending snapshot). Call after
+    create_app, once the schema exists, and in one process only:
+    gunicorn.conf.py does so in the worker holding SCHEDULER_LOCK_FILE.
+    """
+    catalog_gc.start(app)
+    trending.start(app)
+
+
 if __name__ == '__main__':
     app = create_app()
+    # With the reloader, only the serving child process runs the jobs
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_jobs(app)
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,330 @@
+"""
+In-process load benchmark for the BookMarkd API.
+
+Seeds a synthetic dataset, drives every endpoint from concurrent worker
+threads through the WSGI app (no network), and reports throughput and
+p50/p95/p99 latency per endpoint. Results can be compared against a
+committed baseline to flag regressions.
+
+Usage (from backend/):
+    python -m benchmarks.load
+    python -m benchmarks.load --users 500 --workers 8 --iterations 50
+    python -m benchmarks.load --update-baseline
+
+Baselines are machine-dependent; regenerate them on the machine that runs
+the comparison (e.g. the CI runner) rather than comparing across hosts.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from extensions import db
+from models import User, Book, UserBook, BookGoal, PageGoal, HourGoal
+from services.ratings import rebuild_rating_aggregates
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "load.json"
+PASSWORD = "password123"
+
+# Simulated upstream latency for the stubbed recommendations provider.
+UPSTREAM_LATENCY_SECONDS = 0.005
+
+
+class _StubGroqResponse:
+    status_code = 200
+
+    def json(self):
+        return {"choices": [{"message": {"content": (
+            "1. Dune by Frank Herbert\n"
+            "2. Circe by Madeline Miller\n"
+            "3. Range by David Epstein"
+        )}}]}
+
+
+def _stub_groq_post(*args, **kwargs):
+    time.sleep(UPSTREAM_LATENCY_SECONDS)
+    return _StubGroqResponse()
+
+
+def seed(app, users: int, books: int, books_per_user: int, goals_per_user: int) -> List[int]:
+    """Populate the database and return the seeded user ids."""
+    rng = random.Random(42)
+    # pbkdf2 is deliberately slow; hash once and share it across users.
+    password_hash = generate_password_hash(PASSWORD, method="pbkdf2:sha256")
+
+    with app.app_context():
+        db.create_all()
+        user_rows = [
+            User(username=f"bench{i}", email=f"bench{i}@bench.test", password_hash=password_hash)
+            for i in range(users)
+        ]
+        book_rows = [
+            Book(title=f"Bench Book {i}", author=f"Author {i % 97}",
+                 page_count=rng.randint(100, 900), genre=rng.choice(["Fantasy", "Sci-Fi", "History"]))
+            for i in range(books)
+        ]
+        db.session.add_all(user_rows + book_rows)
+        db.session.flush()
+
+        links, goals = [], []
+        for user in user_rows:
+            for book in rng.sample(book_rows, k=min(books_per_user, books)):
+                progress = rng.randint(0, book.page_count)
+                links.append(UserBook(
+                    user_id=user.user_id, book_id=book.book_id, page_progress=progress,
+                    user_rating=round(rng.uniform(1, 5), 1) if progress == book.page_count else None
+                ))
+            for g in range(goals_per_user):
+                model, field = [(BookGoal, "num_books"), (PageGoal, "num_pages"), (HourGoal, "num_hours")][g % 3]
+                goals.append(model(user_id=user.user_id, description="Read 10 this year (bench)", **{field: 10}))
+        db.session.add_all(links + goals)
+        db.session.commit()
+        rebuild_rating_aggregates()
+        return [u.user_id for u in user_rows]
+
+
+class Recorder:
+    """Thread-safe latency samples per endpoint label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def call(self, label, fn, *args, expect=(200, 201), **kwargs):
+        start = time.perf_counter()
+        response = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.samples[label].append(elapsed)
+            if response.status_code not in expect:
+                self.errors[label] += 1
+        return response
+
+
+def _worker(app, recorder, user_ids, tokens, iterations, auth_every, worker_id):
+    client = app.test_client()
+    rng = random.Random(worker_id)
+    call = recorder.call
+
+    for i in range(iterations):
+        index = rng.randrange(len(user_ids))
+        user_id = user_ids[index]
+        headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+
+        if auth_every and i % auth_every == 0:
+            username = f"w{worker_id}i{i}"
+            call("POST /api/auth/register", client.post, "/api/auth/register",
+                 json={"username": username, "email": f"{username}@bench.test", "password": PASSWORD})
+            call("POST /api/auth/login", client.post, "/api/auth/login",
+                 json={"email": f"bench{index}@bench.test", "password": PASSWORD})
+
+        call("GET /api/auth/me", client.get, "/api/auth/me", headers=headers)
+        call("GET /api/books", client.get, "/api/books", headers=headers)
+        call("GET /api/goals", client.get, "/api/goals", headers=headers)
+
+        created = call("POST /api/books", client.post, "/api/books", headers=headers, json={
+            "title": f"Worker {worker_id} Book {i}", "author": "Bench", "total_pages": 300,
+        })
+        if created.status_code == 201:
+            book_id = created.get_json()["id"]
+            call("PUT /api/books/<id>/progress", client.put, f"/api/books/{book_id}/progress",
+                 headers=headers, json={"page_progress": 300})
+            call("PUT /api/books/<id>/rating", client.put, f"/api/books/{book_id}/rating",
+                 headers=headers, json={"rating": 4.0})
+            call("DELETE /api/books/<id>", client.delete, f"/api/books/{book_id}", headers=headers)
+
+        goal = call("POST /api/goals", client.post, "/api/goals", headers=headers, json={
+            "amount": 12, "type": "books read", "duration": "this year",
+        })
+        if goal.status_code == 201:
+            goal_id = goal.get_json()["goal"]["id"]
+            call("PUT /api/goals/<id>", client.put, f"/api/goals/{goal_id}",
+                 headers=headers, json={"progress": 3})
+            call("DELETE /api/goals/<id>", client.delete, f"/api/goals/{goal_id}", headers=headers)
+
+        call("POST /api/recommendations", client.post, "/api/recommendations", headers=headers, json={
+            "genre": "Sci-Fi", "length": "long", "series": "no", "mood": "curious",
+        })
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Dict]:
+    report = {}
+    for label, values in sorted(recorder.samples.items()):
+        values = sorted(values)
+        report[label] = {
+            "count": len(values),
+            "errors": recorder.errors.get(label, 0),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+        }
+    return report
+
+
+def merge_rounds(reports: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """Per endpoint, take the median of each statistic across rounds to damp scheduler noise."""
+    merged = {}
+    for label in sorted(set().union(*reports)):
+        rows = [r[label] for r in reports if label in r]
+        merged[label] = {
+            "count": sum(row["count"] for row in rows),
+            "errors": sum(row["errors"] for row in rows),
+        }
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            merged[label][key] = round(statistics.median(row[key] for row in rows), 3)
+    return merged
+
+
+def compare(report: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return human-readable regressions of report relative to baseline."""
+    regressions = []
+    for label, base in sorted(baseline.items()):
+        current = report.get(label)
+        if current is None:
+            regressions.append(f"{label}: missing from this run")
+            continue
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{label}: errors {base.get('errors', 0)} -> {current['errors']}")
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: throughput {base['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+    return regressions
+
+
+def run(args) -> Dict:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        # A file database gives each worker thread its own connection.
+        workdir = tempfile.mkdtemp(prefix="bookmarkd-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    app = create_app(args.config)
+    user_ids = seed(app, args.users, args.books, args.books_per_user, args.goals_per_user)
+    with app.app_context():
+        tokens = {uid: create_access_token(identity=str(uid)) for uid in user_ids}
+
+    rounds = []
+    with mock.patch.dict("os.environ", {"GROQ_API_KEY": "benchmark-stub"}), \
+            mock.patch("routes.books.requests.post", _stub_groq_post):
+        for round_no in range(args.rounds):
+            recorder = Recorder()
+            threads = [
+                threading.Thread(target=_worker, args=(
+                    app, recorder, user_ids, tokens, args.iterations, args.auth_every,
+                    round_no * args.workers + worker_id,
+                ))
+                for worker_id in range(args.workers)
+            ]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            total = sum(len(v) for v in recorder.samples.values())
+            rounds.append((elapsed, total, summarize(recorder, elapsed)))
+
+    return {
+        "params": {k: getattr(args, k) for k in (
+            "config", "users", "books", "books_per_user", "goals_per_user",
+            "workers", "iterations", "auth_every", "rounds",
+        )},
+        "elapsed_s": round(sum(r[0] for r in rounds), 3),
+        "throughput_rps": round(statistics.median(r[1] / r[0] for r in rounds), 2),
+        "endpoints": merge_rounds([r[2] for r in rounds]),
+    }
+
+
+def print_report(result: Dict) -> None:
+    print(f"\n{result['throughput_rps']} req/s overall in {result['elapsed_s']}s")
+    print(f"{'endpoint':34} {'count':>6} {'err':>4} {'req/s':>9} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9}")
+    for label, row in result["endpoints"].items():
+        print(f"{label:34} {row['count']:>6} {row['errors']:>4} {row['throughput_rps']:>9} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="benchmark", help="create_app configuration name")
+    parser.add_argument("--database-url", help="database to benchmark against (default: a fresh temp SQLite file)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--books", type=int, default=500)
+    parser.add_argument("--books-per-user", type=int, default=20)
+    parser.add_argument("--goals-per-user", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=25, help="scenario loops per worker")
+    parser.add_argument("--rounds", type=int, default=3, help="measured rounds; statistics are medians across rounds")
+    parser.add_argument("--auth-every", type=int, default=10,
+                        help="run register+login every N loops (pbkdf2 dominates otherwise); 0 disables")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed relative p95/throughput regression before failing")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="also write the full JSON report here")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    print_report(result)
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("params") != result["params"]:
+        print("\nWarning: baseline was recorded with different parameters; comparison may be meaningless.")
+    regressions = compare(result["endpoints"], baseline["endpoints"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
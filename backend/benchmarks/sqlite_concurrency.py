@@ -0,0 +1,141 @@
+"""
+Concurrent read throughput: in-memory SQLite on a single StaticPool
+connection ('ephemeral') versus a file database in WAL mode with pooled
+per-thread connections ('sqlite_wal'), with and without a concurrent writer.
+Failed requests count reads or writes that errored, e.g. when threads
+interleave transactions on the shared StaticPool connection.
+
+Usage (from backend/):
+    python -m benchmarks.sqlite_concurrency
+    python -m benchmarks.sqlite_concurrency --threads 1 2 4 8 --requests 300
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from config import config, EphemeralDBConfig, SQLiteWALConfig
+from benchmarks.load import seed
+
+READ_PATHS = ("/api/books", "/api/goals", "/api/auth/me")
+
+
+def _profile(base, **overrides):
+    """Benchmark variant of a config: no demo seed, no throttling."""
+    return type(f"Bench{base.__name__}", (base,), {
+        "SEED_DATABASE": False,
+        "RATELIMIT_ENABLED": False,
+        "METRICS_ENABLED": False,
+        **overrides,
+    })
+
+
+def _build_app(name, args):
+    app = create_app(name)
+    user_ids = seed(app, args.users, args.books, args.books_per_user, goals_per_user=3)
+    with app.app_context():
+        headers = [{"Authorization": f"Bearer {create_access_token(identity=str(uid))}"} for uid in user_ids]
+    return app, headers
+
+
+def measure(app, headers, threads, requests_per_thread, writers=0):
+    """
+    Return (read requests per second, failed requests) for concurrent
+    readers, optionally while `writers` threads keep updating progress.
+    """
+    failures = [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + writers + 1)
+    done = threading.Event()
+
+    def attempt(call, *args, **kwargs):
+        try:
+            ok = call(*args, **kwargs).status_code == 200
+        except Exception:
+            # Errors escaping the app (e.g. during session teardown) count too.
+            ok = False
+        if not ok:
+            with lock:
+                failures[0] += 1
+
+    def reader(offset):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(requests_per_thread):
+            attempt(client.get, READ_PATHS[i % len(READ_PATHS)], headers=headers[(offset + i) % len(headers)])
+
+    def writer(offset):
+        client = app.test_client()
+        user_headers = headers[offset % len(headers)]
+        book_ids = [b["id"] for b in client.get("/api/books", headers=user_headers).get_json()]
+        barrier.wait()
+        i = 0
+        while not done.is_set():
+            book_id = book_ids[i % len(book_ids)]
+            attempt(client.put, f"/api/books/{book_id}/progress",
+                    json={"page_progress": i % 50}, headers=user_headers)
+            i += 1
+
+    readers = [threading.Thread(target=reader, args=(n * 7,)) for n in range(threads)]
+    background = [threading.Thread(target=writer, args=(n * 13 + 1,)) for n in range(writers)]
+    for w in readers + background:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in readers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for w in background:
+        w.join()
+    return threads * requests_per_thread / elapsed, failures[0]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=200, help="requests per thread")
+    parser.add_argument("--writers", type=int, nargs="+", default=[0, 1],
+                        help="concurrent progress-update threads to run alongside the readers")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--books", type=int, default=500)
+    parser.add_argument("--books-per-user", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    # create_app lets DATABASE_URL override the profile's database.
+    os.environ.pop("DATABASE_URL", None)
+    workdir = tempfile.mkdtemp(prefix="bookmarkd-wal-")
+    config["bench_ephemeral"] = _profile(EphemeralDBConfig)
+    config["bench_sqlite_wal"] = _profile(
+        SQLiteWALConfig,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+    )
+
+    profiles = {
+        "ephemeral (StaticPool)": _build_app("bench_ephemeral", args),
+        "sqlite_wal (pooled)": _build_app("bench_sqlite_wal", args),
+    }
+
+    print(f"{'profile':24} {'writers':>7} {'readers':>7} {'read req/s':>10} {'failed':>7}")
+    for writers in args.writers:
+        for label, (app, headers) in profiles.items():
+            for threads in args.threads:
+                rps, failed = measure(app, headers, threads, args.requests, writers)
+                print(f"{label:24} {writers:>7} {threads:>7} {rps:>10.1f} {failed:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,28 @@
 import os
+import tempfile
 from sqlalchemy import StaticPool
 
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SEED_DATABASE = True
+    # Set INIT_DB_ON_STARTUP=0 when the schema is managed outside the app
+    INIT_DB_ON_STARTUP = os.environ.get('INIT_DB_ON_STARTUP', '1') != '0'
+    # Profile requests carrying a signed X-Profile-Token (see services/profiler.py)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+    # Production server sizing (read by gunicorn.conf.py). One worker by default:
+    # the SSE hub, idempotency keys and the response and suggestion caches live
+    # in process memory until shared backends are configured.
+    SERVER_BIND = os.environ.get('BIND', '0.0.0.0:5001')
+    SERVER_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 8))
+    # Each open SSE stream holds a server thread; keep half for other requests
+    EVENTS_MAX_STREAMS = int(os.environ.get('EVENTS_MAX_STREAMS', max(SERVER_THREADS // 2, 1)))
+    # Held by the one worker that runs the periodic jobs (see gunicorn.conf.py)
+    SCHEDULER_LOCK_FILE = os.environ.get(
+        'SCHEDULER_LOCK_FILE', os.path.join(tempfile.gettempdir(), 'bookmarkd-scheduler.lock')
+    )
     
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -18,18 +36,45 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    # Applied to the primary and the replica engine alike
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get('DB_POOL_SIZE', 10)),
+        "max_overflow": int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        "pool_timeout": int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        "pool_recycle": int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        "pool_pre_ping": True,
+    }
+    # Read-only endpoints are served from here when set (see services/replica.py)
+    SQLALCHEMY_BINDS = (
+        {'replica': os.environ['REPLICA_DATABASE_URL']}
+        if os.environ.get('REPLICA_DATABASE_URL') else {}
+    )
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    # GET /api/events; the hub is per process, so several workers need EVENTS_ENABLED=0
+    EVENTS_ENABLED = os.environ.get('EVENTS_ENABLED', '1') == '1'
+    # Recompute GET /api/books/trending in the background (see services/trending.py)
+    TRENDING_INTERVAL_SECONDS = int(os.environ.get('TRENDING_INTERVAL_SECONDS', 900))
+    # Log statements slower than this with their query plan (see services/slow_queries.py)
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    # GET /api/slow-queries exposes SQL and plans; off unless asked for, admin token required
+    SLOW_QUERY_ENDPOINT_ENABLED = os.environ.get('SLOW_QUERY_ENDPOINT_ENABLED', '0') == '1'
+    # Log slow statements' parameter values, not just their types; they include secrets
+    SLOW_QUERY_LOG_PARAMETERS = os.environ.get('SLOW_QUERY_LOG_PARAMETERS', '0') == '1'
+    # Coalesce page progress updates in memory (see services/progress_buffer.py).
+    # The buffer is per process, so reads only see buffered progress from the
+    # worker that took the update: gunicorn.conf.py refuses it with WEB_CONCURRENCY > 1.
+    PROGRESS_WRITE_BEHIND = os.environ.get('PROGRESS_WRITE_BEHIND', '0') == '1'
+    PROGRESS_FLUSH_SECONDS = float(os.environ.get('PROGRESS_FLUSH_SECONDS', 2))
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-
-config = {
-    'development': DevelopmentConfig,
-    'production': ProductionConfig,
-    'testing': TestingConfig,
-    'default': DevelopmentConfig
-}
+    # The test suite seeds a template database once and copies it per test
+    # (see tests/conftest.py) instead of seeding every app
+    SEED_DATABASE = False
+    # Single process: revocations are known locally, no need to poll the table
+    REVOCATION_SYNC_SECONDS = 0
 
 class EphemeralDBConfig(Config):
     # Single-process, in-memory SQLite
@@ -39,4 +84,48 @@ class EphemeralDBConfig(Config):
         "connect_args": {"check_same_thread": False},
         "poolclass": StaticPool,
     }
-    
+
+class SQLiteWALConfig(Config):
+    """
+    File-backed SQLite in WAL mode: data survives restarts, readers don't
+    block the writer, and each request thread checks out its own connection.
+    """
+    SQLITE_PATH = os.environ.get(
+        'SQLITE_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bookmarkd.db')
+    )
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{SQLITE_PATH}"
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        # Pooled connections are handed to whichever thread checks them out
+        "connect_args": {"check_same_thread": False},
+        "pool_size": 8,
+        "max_overflow": 8,
+    }
+    # Applied to every new connection by database.configure_sqlite
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",        # fsync on checkpoint only; safe with WAL
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,           # negative means KiB, i.e. 64 MB per connection
+        "busy_timeout": 5000,           # ms to wait on a locked database instead of failing
+        "temp_store": "MEMORY",
+    }
+
+class BenchmarkConfig(Config):
+    """Load benchmark configuration (benchmarks/load.py sets DATABASE_URL and seeds its own dataset)"""
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    # Concurrent writers on SQLite wait for the lock instead of failing fast
+    SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30}}
+    SEED_DATABASE = False
+    RATELIMIT_ENABLED = False
+
+config = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+    'ephemeral': EphemeralDBConfig,
+    'sqlite_wal': SQLiteWALConfig,
+    'benchmark': BenchmarkConfig,
+    'default': DevelopmentConfig
+}
+
@@ -1,13 +1,16 @@
+from sqlalchemy import event
 from extensions import db
 from models import User, Book, Club, UserBook, UserClub, BookGoal, PageGoal
+from services.trending import TrendingRanker
 from .seed import seed_db
 
 _INIT_GUARD_KEY = "_DB_INITIALIZED"
 
-def init_db(app, seed: bool = True):
+def init_db(app, seed: bool = True, timer=None):
     """
     Create all tables and optionally seed.
     Safe to call multiple times (protected from dev reloader).
+    Pass create_app's StartupTimer to record each step.
     """
     with app.app_context():
         if app.config.get(_INIT_GUARD_KEY):
@@ -15,9 +18,37 @@ def init_db(app, seed: bool = True):
 
         print("Creating in-memory database tables...")
         db.create_all()
+        if timer:
+            timer.mark('create tables')
 
         if seed:
             seed_db()
+            TrendingRanker.refresh()
+            if timer:
+                timer.mark('seed')
 
         app.config[_INIT_GUARD_KEY] = True
         print("✓ Database initialized successfully.")
+
+
+def configure_sqlite(app):
+    """
+    Apply SQLITE_PRAGMAS to every new connection of a SQLite engine.
+    No-op for other databases or when no pragmas are configured.
+    """
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    if not pragmas:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return
+
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine, "connect", _apply_pragmas)
@@ -5,6 +5,7 @@ from typing import List, Tuple
 
 from extensions import db
 from models import User, Book, Club, UserBook, UserClub, BookGoal, PageGoal, HourGoal
+from services.ratings import rebuild_rating_aggregates
 
 # ---------------------------
 # Configurable “big seed” knobs
@@ -281,6 +282,9 @@ def seed_db() -> None:
     # Optional: ensure every user has at least one relation for nicer demos
     _ensure_minimum_links(users, books, clubs)
 
+    # Ratings were inserted directly; derive the per-book aggregates once.
+    rebuild_rating_aggregates()
+
 def _ensure_minimum_links(users: List[User], books: List[Book], clubs: List[Club]) -> None:
     """Soft pass to give isolated users a book or a club."""
     # users without any books
@@ -1,6 +1,34 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from services.events import EventHub
+from services.rate_limit import RateLimiter
+from services.metrics import Metrics
+from services.replica import ReplicaRouter, RoutingSession
+from services.imports import Importer
+from services.idempotency import Idempotency
+from services.catalog_gc import CatalogCollector
+from services.trending import TrendingRanker
+from services.revocation import RevocationStore
+from services.progress_buffer import ProgressBuffer
+from services.profiler import RequestProfiler
+from services.slow_queries import SlowQueryLog
+from services.response_cache import ResponseCache
+from services.suggestions import FriendSuggestions
 
 # Declaring here avoids circular imports
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 jwt = JWTManager()
+event_hub = EventHub()
+rate_limiter = RateLimiter()
+metrics = Metrics()
+replica_router = ReplicaRouter()
+importer = Importer()
+idempotency = Idempotency()
+catalog_gc = CatalogCollector()
+trending = TrendingRanker()
+revocation_store = RevocationStore()
+progress_buffer = ProgressBuffer()
+profiler = RequestProfiler()
+slow_queries = SlowQueryLog()
+response_cache = ResponseCache()
+friend_suggestions = FriendSuggestions()
@@ -0,0 +1,102 @@
+"""
+Gunicorn settings for the production server.
+
+    gunicorn -c gunicorn.conf.py
+
+Worker and thread counts come from the selected Flask config class
+(SERVER_WORKERS / SERVER_THREADS, i.e. WEB_CONCURRENCY / SERVER_THREADS).
+
+Note: the SSE event hub, rate limiter and other in-process stores are per
+worker; events published in one worker only reach streams held by it. With
+WEB_CONCURRENCY > 1, the event stream and other features whose state would silently diverge between
+workers are refused, and the remaining per-process stores are logged as a
+warning at startup.
+"""
+import os
+
+# Module-level names are read as gunicorn settings, hence the private alias.
+from config import config as _configs
+
+_app_config = _configs[os.environ.get('FLASK_CONFIG', 'production')]
+
+wsgi_app = 'wsgi:app'
+bind = _app_config.SERVER_BIND
+workers = _app_config.SERVER_WORKERS
+# Per-process state that only degrades with several workers; see on_starting
+_per_process_stores = []
+if workers > 1:
+    if getattr(_app_config, 'PROGRESS_WRITE_BEHIND', False):
+        # Each worker would buffer its own progress: reads served by another
+        # worker would not see it (see services/progress_buffer.py).
+        raise RuntimeError('PROGRESS_WRITE_BEHIND requires a single worker (WEB_CONCURRENCY=1)')
+    if getattr(_app_config, 'RESPONSE_CACHE_ENABLED', False) \
+            and not getattr(_app_config, 'RESPONSE_CACHE_BACKEND', None):
+        # A mutation only invalidates the worker that handled it; the others
+        # would keep serving the old response until it expires.
+        raise RuntimeError(
+            'RESPONSE_CACHE_ENABLED with several workers requires a shared RESPONSE_CACHE_BACKEND'
+        )
+    if getattr(_app_config, 'EVENTS_ENABLED', True):
+        # Events published in one worker never reach streams held by another
+        # (see services/events.py).
+        raise RuntimeError('EVENTS_ENABLED requires a single worker (WEB_CONCURRENCY=1); '
+                           'set EVENTS_ENABLED=0 to run several')
+    if not getattr(_app_config, 'IDEMPOTENCY_BACKEND', None):
+        _per_process_stores.append('Idempotency-Key replays (a retry on another worker runs again)')
+    _per_process_stores.append('friend suggestions (other workers refresh after SUGGESTIONS_TTL_SECONDS)')
+threads = _app_config.SERVER_THREADS
+if _app_config.EVENTS_MAX_STREAMS >= threads:
+    # Open SSE streams would take every thread and starve other requests
+    raise RuntimeError('EVENTS_MAX_STREAMS must be below SERVER_THREADS')
+worker_class = 'gthread'
+
+# Import the app (create tables, seed) once in the master, then fork.
+preload_app = True
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+
+
+def _dispose_engines(close):
+    from wsgi import app
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def on_starting(server):
+    for store in _per_process_stores:
+        server.log.warning('WEB_CONCURRENCY=%s: per-process state is not shared between workers: %s',
+                           workers, store)
+
+
+def when_ready(server):
+    # The master used connections for init; don't let children inherit them.
+    _dispose_engines(close=True)
+
+
+def post_fork(server, worker):
+    # Drop any pooled connections copied from the master without closing the
+    # parent's sockets; the worker opens its own on first use.
+    _dispose_engines(close=False)
+
+
+def post_worker_init(worker):
+    from wsgi import app
+    from app import start_background_jobs
+    from extensions import revocation_store
+    from services.scheduler import acquire_lock
+
+    # Every worker keeps its own revocation list in sync.
+    revocation_store.start(app)
+
+    # Periodic jobs run in exactly one worker, never in the forking master:
+    # the first to take the lock runs them, and a replacement worker takes
+    # over if it exits. Each host running the app has its own lock file.
+    if acquire_lock(app.config['SCHEDULER_LOCK_FILE']):
+        start_background_jobs(app)
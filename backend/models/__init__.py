@@ -6,6 +6,13 @@ from .user_club import UserClub
 from .book_goal import BookGoal
 from .page_goal import PageGoal
 from .hour_goal import HourGoal
+from .import_job import ImportJob
+from .archived_book import ArchivedBook
+from .trending_book import TrendingBook
+from .revoked_token import RevokedToken
+from .reading_session import ReadingSession
+from .reading_activity import ReadingActivity
+from .follow import Follow
 
 __all__ = [
     "User",
@@ -16,4 +23,11 @@ __all__ = [
     "BookGoal",
     "PageGoal",
     "HourGoal",
+    "ImportJob",
+    "ArchivedBook",
+    "TrendingBook",
+    "RevokedToken",
+    "ReadingSession",
+    "ReadingActivity",
+    "Follow",
 ]
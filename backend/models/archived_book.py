@@ -0,0 +1,17 @@
+from datetime import datetime
+from extensions import db
+
+class ArchivedBook(db.Model):
+    __tablename__ = "archived_book"
+
+    archive_id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    author = db.Column(db.String(120), nullable=False)
+    page_count = db.Column(db.Integer)
+    open_library_id = db.Column(db.String(100))
+    genre = db.Column(db.String(50))
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ArchivedBook {self.title}>"
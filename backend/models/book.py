@@ -2,6 +2,7 @@ from extensions import db
 
 class Book(db.Model):
     __tablename__ = "book"
+    __table_args__ = (db.Index("ix_book_title_author", "title", "author"),)
 
     book_id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -10,6 +11,16 @@ class Book(db.Model):
     open_library_id = db.Column(db.String(100), unique=True)
     genre = db.Column(db.String(50))
 
+    # Community rating aggregates, maintained by services.ratings
+    rating_sum = db.Column(db.Float, default=0.0, nullable=False)
+    rating_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_hist_0 = db.Column(db.Integer, default=0, nullable=False)
+    rating_hist_1 = db.Column(db.Integer, default=0, nullable=False)
+    rating_hist_2 = db.Column(db.Integer, default=0, nullable=False)
+    rating_hist_3 = db.Column(db.Integer, default=0, nullable=False)
+    rating_hist_4 = db.Column(db.Integer, default=0, nullable=False)
+    rating_hist_5 = db.Column(db.Integer, default=0, nullable=False)
+
     user_books = db.relationship("UserBook", back_populates="book", cascade="all, delete-orphan")
 
     def __repr__(self):
@@ -0,0 +1,22 @@
+from datetime import datetime
+from extensions import db
+
+class Follow(db.Model):
+    """follower_id follows followee_id; indexed from both ends, newest first."""
+    __tablename__ = "follow"
+
+    follower_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), primary_key=True)
+    followee_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    follower = db.relationship("User", foreign_keys=[follower_id], back_populates="following")
+    followee = db.relationship("User", foreign_keys=[followee_id], back_populates="followers")
+
+    __table_args__ = (
+        db.CheckConstraint("follower_id != followee_id", name="ck_follow_not_self"),
+        db.Index("ix_follow_follower_created", "follower_id", "created_at"),
+        db.Index("ix_follow_followee_created", "followee_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<Follow {self.follower_id} -> {self.followee_id}>"
@@ -4,12 +4,15 @@ class HourGoal(db.Model):
     __tablename__ = "hour_goal"
 
     goal_id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False, index=True)
     description = db.Column(db.String(255))
     num_hours = db.Column(db.Integer)
     progress = db.Column(db.Float, default=0.0, nullable=False)
+    version = db.Column(db.Integer, default=1, nullable=False)
 
     user = db.relationship("User", back_populates="hour_goals")
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<HourGoal {self.description}>"
@@ -0,0 +1,19 @@
+from datetime import datetime
+from extensions import db
+
+class ImportJob(db.Model):
+    __tablename__ = "import_job"
+
+    job_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False, index=True)
+    source = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)
+    books_imported = db.Column(db.Integer, nullable=False, default=0)
+    rows_skipped = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<ImportJob {self.job_id} {self.status}>"
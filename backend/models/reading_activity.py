@@ -0,0 +1,15 @@
+from extensions import db
+
+# One bit per day of the year, leap day included
+DAYS_BYTES = 46
+
+class ReadingActivity(db.Model):
+    __tablename__ = "reading_activity"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    # Little-endian bitmap: bit n is set if the user read on day n + 1 of the year
+    days = db.Column(db.LargeBinary(DAYS_BYTES), nullable=False)
+
+    def __repr__(self):
+        return f"<ReadingActivity user={self.user_id}, year={self.year}>"
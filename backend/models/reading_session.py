@@ -0,0 +1,19 @@
+from extensions import db
+
+class ReadingSession(db.Model):
+    __tablename__ = "reading_session"
+
+    session_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False)
+    book_id = db.Column(db.Integer, db.ForeignKey("book.book_id"), nullable=False, index=True)
+    # UTC
+    started_at = db.Column(db.DateTime, nullable=False)
+    ended_at = db.Column(db.DateTime, nullable=False)
+    pages_read = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_reading_session_user_started", "user_id", "started_at"),
+    )
+
+    def __repr__(self):
+        return f"<ReadingSession user={self.user_id}, book={self.book_id}>"
@@ -0,0 +1,15 @@
+from datetime import datetime
+from extensions import db
+
+class RevokedToken(db.Model):
+    __tablename__ = "revoked_token"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False)
+    # When the token would have expired anyway; NULL for non-expiring tokens
+    expires_at = db.Column(db.DateTime, index=True)
+    # Scanned by every process's sync (see services/revocation.py)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti}>"
@@ -0,0 +1,16 @@
+from extensions import db
+
+class TrendingBook(db.Model):
+    __tablename__ = "trending_book"
+
+    # "" holds the overall ranking; other values are Book.genre
+    genre = db.Column(db.String(50), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    # No foreign key: the snapshot is rebuilt wholesale and must not block
+    # catalog garbage collection. Readers inner-join to book.
+    book_id = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TrendingBook {self.genre or 'all'} #{self.rank}>"
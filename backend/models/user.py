@@ -15,6 +15,10 @@ class User(db.Model):
     hour_goals = db.relationship("HourGoal", back_populates="user", cascade="all, delete-orphan")
     user_books = db.relationship("UserBook", back_populates="user", cascade="all, delete-orphan")
     user_clubs = db.relationship("UserClub", back_populates="user", cascade="all, delete-orphan")
+    following = db.relationship("Follow", foreign_keys="Follow.follower_id", back_populates="follower",
+                                cascade="all, delete-orphan")
+    followers = db.relationship("Follow", foreign_keys="Follow.followee_id", back_populates="followee",
+                                cascade="all, delete-orphan")
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password, method="pbkdf2:sha256")
@@ -5,14 +5,21 @@ class UserBook(db.Model):
     __tablename__ = "user_book"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False)
-    book_id = db.Column(db.Integer, db.ForeignKey("book.book_id"), nullable=False)
-    add_date = db.Column(db.Date, default=datetime.today)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False, index=True)
+    book_id = db.Column(db.Integer, db.ForeignKey("book.book_id"), nullable=False, index=True)
+    add_date = db.Column(db.Date, default=datetime.today, index=True)
     page_progress = db.Column(db.Integer, default=0, nullable=False)
     user_rating = db.Column(db.Float, nullable=True)
+    # Marked read regardless of page_progress, e.g. an imported finished book
+    # whose page count is unknown; cleared by the next progress update
+    finished = db.Column(db.Boolean, default=False, nullable=False)
+    # Bumped by every ORM update, which only applies if the row is unchanged
+    version = db.Column(db.Integer, default=1, nullable=False)
 
     user = db.relationship("User", back_populates="user_books")
     book = db.relationship("Book", back_populates="user_books")
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<UserBook user={self.user_id}, book={self.book_id}>"
@@ -4,8 +4,8 @@ class UserClub(db.Model):
     __tablename__ = "user_club"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False)
-    club_id = db.Column(db.Integer, db.ForeignKey("club.club_id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False, index=True)
+    club_id = db.Column(db.Integer, db.ForeignKey("club.club_id"), nullable=False, index=True)
 
     user = db.relationship("User", back_populates="user_clubs")
     club = db.relationship("Club", back_populates="user_clubs")
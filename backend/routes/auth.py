@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from models import User
-from extensions import db
+from extensions import db, rate_limiter, replica_router, revocation_store
 import re
 from sqlalchemy import or_
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -38,6 +39,9 @@ def register():
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to create user'}), 500
+
+    # The new account may not have reached the replica yet
+    replica_router.mark_write(user.user_id)
     
     # Store JWT subject as string to satisfy PyJWT's strict subject validation.
     token = create_access_token(identity=str(user.user_id))
@@ -53,6 +57,7 @@ def register():
     }), 201
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limiter.limit('10/minute')
 def login():
     data = request.get_json(silent=True) or {}
     email = (data.get('email') or '').strip().lower()
@@ -79,12 +84,23 @@ def login():
 
 
 @auth_bp.route('/logout', methods=['POST'])
+@jwt_required(optional=True)
 def logout():
-    # For JWT, logout is handled client-side by deleting the token
+    # Revoke the presented token so it is rejected even before it expires.
+    # Without a token there is nothing to revoke; the client just drops it.
+    claims = get_jwt()
+    if claims:
+        revocation_store.revoke(claims['jti'], claims.get('exp'))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Already revoked by another process that this one has not synced yet
+            db.session.rollback()
     return jsonify({'message': 'Logged out successfully'}), 200
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
+@replica_router.read_only
 def get_current_user():
     # Get user ID from the JWT token
     user_id = get_jwt_identity()
@@ -1,8 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from extensions import db
+from sqlalchemy import and_, case, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm.exc import StaleDataError
+from extensions import db, rate_limiter, replica_router, idempotency, event_hub, progress_buffer, response_cache
 from models.book import Book
 from models.user_book import UserBook
+from models.trending_book import TrendingBook
+from services.events import publish_on_commit
+from services.ratings import rating_summary, record_rating_change
+from services.trending import ALL_GENRES
+from services import versioning
 import os
 import requests
 from typing import List, Dict
@@ -79,14 +87,18 @@ def get_simple_groq_recommendations(survey: Dict) -> List[Dict]:
     ]
 
 
-def calculate_status(page_progress, total_pages):
+def calculate_status(page_progress, total_pages, finished=False):
     """
     Calculate book status based on page progress.
     Returns:
+        - "read" if the entry is marked finished
         - "wishlist" if page_progress is 0
-        - "reading" if 0 < page_progress < total_pages
+        - "reading" if 0 < page_progress < total_pages (or the page count is unknown)
         - "read" if page_progress >= total_pages
     """
+    if finished:
+        return "read"
+
     if page_progress == 0:
         return "wishlist"
     
@@ -96,8 +108,44 @@ def calculate_status(page_progress, total_pages):
     return "reading"
 
 
+def _user_book_data(user_book):
+    """All book details of a library entry, as returned after an update."""
+    book = user_book.book
+    return {
+        "id": book.book_id,
+        "title": book.title,
+        "author": book.author,
+        "status": calculate_status(user_book.page_progress, book.page_count, user_book.finished),
+        "open_library_id": book.open_library_id,
+        "page_progress": user_book.page_progress,
+        "total_pages": book.page_count,
+        "rating": user_book.user_rating,
+        "version": user_book.version,
+        "community_rating": rating_summary(book)
+    }
+
+
+def _version_conflict(user_book, stale=False):
+    """
+    409 response with the entry's current state. stale means our write lost
+    a race, so the transaction is rolled back and the row reloaded first.
+    """
+    if stale:
+        db.session.rollback()
+        try:
+            db.session.refresh(user_book)
+        except InvalidRequestError:
+            return jsonify({"error": "Book not found in your library"}), 404
+    return jsonify({
+        "error": "Book was modified by another request",
+        "book": _user_book_data(user_book)
+    }), 409
+
+
 @books_bp.route("/books", methods=["POST"])
 @jwt_required()
+@response_cache.invalidates
+@idempotency.idempotent
 def create_book():
     """
     Create a new book for the authenticated user.
@@ -178,56 +226,181 @@ def create_book():
         page_progress=page_progress
     )
     db.session.add(user_book)
-    db.session.commit()
 
     # Calculate status
     status = calculate_status(page_progress, total_pages)
 
-    return jsonify({
+    book_data = {
         "id": book.book_id,
         "title": book.title,
         "author": book.author,
         "status": status,
         "open_library_id": book.open_library_id,
         "page_progress": user_book.page_progress,
-        "total_pages": book.page_count
-    }), 201
+        "total_pages": book.page_count,
+        "community_rating": rating_summary(book)
+    }
+    publish_on_commit(user_id, "book.created", book_data)
+    db.session.commit()
+
+    return jsonify(book_data), 201
+
+
+# SQL twin of calculate_status, so listings can filter and sort on status
+STATUS_EXPRESSION = case(
+    (UserBook.finished, "read"),
+    (UserBook.page_progress == 0, "wishlist"),
+    (and_(Book.page_count > 0, UserBook.page_progress >= Book.page_count), "read"),
+    else_="reading",
+)
+BOOK_STATUSES = ("wishlist", "reading", "read")
+
+# Response field -> columns it needs (community_rating uses the aggregates)
+BOOK_FIELDS = {
+    "id": [Book.book_id],
+    "title": [Book.title],
+    "author": [Book.author],
+    "status": [STATUS_EXPRESSION.label("status")],
+    "open_library_id": [Book.open_library_id],
+    "page_progress": [UserBook.page_progress],
+    "total_pages": [Book.page_count],
+    "rating": [UserBook.user_rating],
+    "version": [UserBook.version],
+    "community_rating": [
+        Book.rating_sum, Book.rating_count,
+        *(getattr(Book, f"rating_hist_{bucket}") for bucket in range(6)),
+    ],
+}
+
+# sort key -> column; prefix with "-" for descending
+BOOK_SORTS = {
+    "title": Book.title,
+    "author": Book.author,
+    "status": STATUS_EXPRESSION,
+    "progress": UserBook.page_progress,
+    "rating": UserBook.user_rating,
+    "added": UserBook.add_date,
+}
+
+
+def _book_field(row, field):
+    if field == "id":
+        return row.book_id
+    if field == "total_pages":
+        return row.page_count
+    if field == "rating":
+        return row.user_rating
+    if field == "community_rating":
+        return rating_summary(row)
+    return getattr(row, field)
 
 
 @books_bp.route("/books", methods=["GET"])
 @jwt_required()
+@response_cache.cached
+@replica_router.read_only
 def get_books():
     """
-    Get all books in the authenticated user's library.
+    Get the books in the authenticated user's library.
 
+    Params (query, all optional):
+        status: wishlist, reading or read
+        sort: comma separated keys from title, author, status, progress, rating, added;
+              prefix with "-" for descending (default: order added to the library)
+        fields: comma separated subset of the returned fields (default: all)
     Returns: Array of books with title, author, status, open_library_id, page_progress, total_pages, rating
     """
     user_id = get_jwt_identity()
+    # Read your own buffered progress (write-behind mode)
+    progress_buffer.flush(user_id)
+
+    status = request.args.get("status")
+    if status is not None and status not in BOOK_STATUSES:
+        return jsonify({"error": f"status must be one of: {', '.join(BOOK_STATUSES)}"}), 400
+
+    fields = request.args.get("fields")
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(BOOK_FIELDS)
+    unknown = [f for f in fields if f not in BOOK_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+    order_by = []
+    for key in filter(None, (k.strip() for k in request.args.get("sort", "").split(","))):
+        column = BOOK_SORTS.get(key.lstrip("-"))
+        if column is None:
+            return jsonify({"error": f"Cannot sort by '{key}'"}), 400
+        # Unrated books sort last in either direction
+        if key.lstrip("-") == "rating":
+            order_by.append(column.is_(None))
+        order_by.append(column.desc() if key.startswith("-") else column.asc())
+    order_by.append(UserBook.id)
+
+    # Only the requested columns are loaded, in a single query
+    columns = {column.key: column for field in fields for column in BOOK_FIELDS[field]}
+    query = (
+        select(*columns.values())
+        .select_from(UserBook)
+        .join(Book, Book.book_id == UserBook.book_id)
+        .where(UserBook.user_id == user_id)
+        .order_by(*order_by)
+    )
+    if status is not None:
+        query = query.where(STATUS_EXPRESSION == status)
 
-    # Get all user's books with their relationship data
-    user_books = UserBook.query.filter_by(user_id=user_id).all()
+    books_list = [
+        {field: _book_field(row, field) for field in fields}
+        for row in db.session.execute(query)
+    ]
 
-    books_list = []
-    for user_book in user_books:
-        book = user_book.book
-        status = calculate_status(user_book.page_progress, book.page_count)
+    return jsonify(books_list), 200
 
-        books_list.append({
-            "id": book.book_id,
-            "title": book.title,
-            "author": book.author,
-            "status": status,
-            "open_library_id": book.open_library_id,
-            "page_progress": user_book.page_progress,
-            "total_pages": book.page_count,
-            "rating": user_book.user_rating
-        })
 
-    return jsonify(books_list), 200
+@books_bp.route("/books/trending", methods=["GET"])
+@jwt_required()
+def get_trending_books():
+    """
+    Get the most popular books of recent weeks, overall or for one genre.
+    Served from the precomputed snapshot (see services/trending.py).
+
+    Params: genre (query, optional), limit (query, default: 10, max: 50)
+    Returns: computed_at and a ranked list of books with their trending score
+    """
+    genre = request.args.get("genre", ALL_GENRES)
+    try:
+        limit = min(max(int(request.args.get("limit", 10)), 1), 50)
+    except (ValueError, TypeError):
+        return jsonify({"error": "Limit must be a valid number"}), 400
+
+    rows = db.session.execute(
+        select(TrendingBook, Book)
+        .join(Book, Book.book_id == TrendingBook.book_id)
+        .where(TrendingBook.genre == genre)
+        .order_by(TrendingBook.rank)
+        .limit(limit)
+    ).all()
+
+    books_list = [{
+        "rank": trending.rank,
+        "id": book.book_id,
+        "title": book.title,
+        "author": book.author,
+        "genre": book.genre,
+        "open_library_id": book.open_library_id,
+        "total_pages": book.page_count,
+        "score": round(trending.score, 4),
+        "community_rating": rating_summary(book)
+    } for trending, book in rows]
+
+    return jsonify({
+        "genre": genre or None,
+        "computed_at": rows[0][0].computed_at.isoformat() if rows else None,
+        "books": books_list
+    }), 200
 
 
 @books_bp.route("/books/<int:book_id>", methods=["DELETE"])
 @jwt_required()
+@response_cache.invalidates
 def delete_book(book_id):
     """
     Delete a book from the authenticated user's library.
@@ -246,8 +419,16 @@ def delete_book(book_id):
     if not user_book:
         return jsonify({"error": "Book not found in your library"}), 404
 
-    # Delete the user-book relationship
+    # Delete the user-book relationship; the DELETE only applies if the
+    # version is unchanged, so the rating taken off the aggregates is current
+    record_rating_change(book_id, user_book.user_rating, None)
+    progress_buffer.discard(user_id, book_id)
     db.session.delete(user_book)
+    try:
+        db.session.flush()
+    except StaleDataError:
+        return _version_conflict(user_book, stale=True)
+    publish_on_commit(user_id, "book.deleted", {"id": book_id})
     db.session.commit()
 
     return jsonify({"message": "Book removed from library"}), 200
@@ -255,12 +436,14 @@ def delete_book(book_id):
 
 @books_bp.route("/books/<int:book_id>/progress", methods=["PUT"])
 @jwt_required()
+@response_cache.invalidates
 def update_book_progress(book_id):
     """
     Update the reading progress for a book.
 
-    Params: book_id (in URL), page_progress (in body)
-    Returns: All book details with updated status
+    Params: book_id (in URL), page_progress (in body),
+            version (in body, optional: the version last read; 409 if it changed since)
+    Returns: All book details with updated status and version
     """
     user_id = get_jwt_identity()
     data = request.get_json()
@@ -276,6 +459,12 @@ def update_book_progress(book_id):
             return jsonify({"error": "Page progress must be non-negative"}), 400
     except (ValueError, TypeError):
         return jsonify({"error": "Page progress must be a valid number"}), 400
+    try:
+        expected_version = versioning.expected_version(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if progress_buffer.enabled:
+        return _buffer_book_progress(user_id, book_id, page_progress)
     # Find the user's book relationship
     user_book = UserBook.query.filter_by(
         user_id=user_id,
@@ -284,39 +473,80 @@ def update_book_progress(book_id):
 
     if not user_book:
         return jsonify({"error": "Book not found in your library"}), 404
+    if expected_version is not None and user_book.version != expected_version:
+        return _version_conflict(user_book)
 
-    # Validate that page_progress does not exceed total pages
+    # Validate that page_progress does not exceed total pages, when known
     book = user_book.book
-    if page_progress > book.page_count:
+    if book.page_count is not None and page_progress > book.page_count:
         return jsonify({"error": "Page progress cannot exceed total pages"}), 400
 
-    # Update progress
+    # Update progress; the UPDATE only applies if the version is unchanged
     user_book.page_progress = page_progress
+    user_book.finished = False
+    try:
+        db.session.flush()
+    except StaleDataError:
+        return _version_conflict(user_book, stale=True)
+
+    book_data = _user_book_data(user_book)
+    publish_on_commit(user_id, "book.progress", book_data)
     db.session.commit()
 
-    # Get book details and calculate status
-    status = calculate_status(user_book.page_progress, book.page_count)
+    return jsonify(book_data), 200
 
-    return jsonify({
-        "id": book.book_id,
-        "title": book.title,
-        "author": book.author,
-        "status": status,
-        "open_library_id": book.open_library_id,
-        "page_progress": user_book.page_progress,
-        "total_pages": book.page_count,
-        "rating": user_book.user_rating
-    }), 200
+
+def _buffer_book_progress(user_id, book_id, page_progress):
+    """
+    Write-behind variant of update_book_progress: the update is acknowledged
+    from services/progress_buffer.py and reaches the database on its next
+    flush. Repeat updates for a book are answered from cached book details
+    (community_rating may lag behind by the time of the cache). Buffered
+    updates are last-writer-wins: versions are neither checked nor returned.
+    """
+    book_data = progress_buffer.cached_book(user_id, book_id)
+    if book_data is None:
+        user_book = UserBook.query.filter_by(
+            user_id=user_id,
+            book_id=book_id
+        ).first()
+        if not user_book:
+            return jsonify({"error": "Book not found in your library"}), 404
+        book = user_book.book
+        book_data = {
+            "id": book.book_id,
+            "title": book.title,
+            "author": book.author,
+            "open_library_id": book.open_library_id,
+            "total_pages": book.page_count,
+            "rating": user_book.user_rating,
+            "community_rating": rating_summary(book)
+        }
+        progress_buffer.cache_book(user_id, book_id, book_data)
+
+    if book_data["total_pages"] is not None and page_progress > book_data["total_pages"]:
+        return jsonify({"error": "Page progress cannot exceed total pages"}), 400
+
+    progress_buffer.put(user_id, book_id, page_progress)
+    book_data = {
+        **book_data,
+        "status": calculate_status(page_progress, book_data["total_pages"]),
+        "page_progress": page_progress,
+    }
+    event_hub.publish(int(user_id), "book.progress", book_data)
+    return jsonify(book_data), 200
 
 
 @books_bp.route("/books/<int:book_id>/rating", methods=["PUT"])
 @jwt_required()
+@response_cache.invalidates
 def update_book_rating(book_id):
     """
     Update the rating for a completed book.
 
-    Params: book_id (in URL), rating (in body, 0-5)
-    Returns: All book details with updated rating
+    Params: book_id (in URL), rating (in body, 0-5),
+            version (in body, optional: the version last read; 409 if it changed since)
+    Returns: All book details with updated rating and version
     """
     user_id = get_jwt_identity()
     data = request.get_json()
@@ -336,7 +566,14 @@ def update_book_rating(book_id):
             return jsonify({"error": "Rating must be between 0 and 5"}), 400
     except (ValueError, TypeError):
         return jsonify({"error": "Rating must be a valid number"}), 400
+    try:
+        expected_version = versioning.expected_version(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    # The status check needs any buffered progress; cached details go stale
+    progress_buffer.flush(user_id)
+    progress_buffer.discard(user_id, book_id)
     # Find the user's book relationship
     user_book = UserBook.query.filter_by(
         user_id=user_id,
@@ -344,28 +581,30 @@ def update_book_rating(book_id):
     ).first()
     if not user_book:
         return jsonify({"error": "Book not found in your library"}), 404
+    if expected_version is not None and user_book.version != expected_version:
+        return _version_conflict(user_book)
     # Get book details and check if book is completed
     book = user_book.book
-    status = calculate_status(user_book.page_progress, book.page_count)
+    status = calculate_status(user_book.page_progress, book.page_count, user_book.finished)
     if status != "read":
         return jsonify({"error": "Can only rate books with 'read' status"}), 400
-    # Update rating
+    # Update rating and the book's community aggregates in one transaction
+    record_rating_change(book.book_id, user_book.user_rating, rating, book=book)
     user_book.user_rating = rating
+    try:
+        db.session.flush()
+    except StaleDataError:
+        # Also undoes the aggregate change
+        return _version_conflict(user_book, stale=True)
+    book_data = _user_book_data(user_book)
+    publish_on_commit(user_id, "book.rating", book_data)
     db.session.commit()
-    return jsonify({
-        "id": book.book_id,
-        "title": book.title,
-        "author": book.author,
-        "status": status,
-        "open_library_id": book.open_library_id,
-        "page_progress": user_book.page_progress,
-        "total_pages": book.page_count,
-        "rating": user_book.user_rating
-    }), 200
+    return jsonify(book_data), 200
 
 
 @books_bp.route("/recommendations", methods=["POST"])
 @jwt_required()
+@rate_limiter.limit("5/minute")
 def get_book_recommendations():
     """
     Get AI-powered book recommendations based on user preferences.
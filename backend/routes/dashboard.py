@@ -0,0 +1,117 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+from extensions import db, replica_router, progress_buffer, response_cache
+from models import Book, User, UserBook, UserClub
+from routes.books import BOOK_STATUSES, STATUS_EXPRESSION
+from routes.goals import calculate_due_date, extract_duration_from_description
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+# Books listed under "currently_reading"
+CURRENTLY_READING_LIMIT = 5
+
+# User relationship -> (goal type, column holding the goal's total)
+GOAL_COLLECTIONS = (
+    ("book_goals", "books read", "num_books"),
+    ("page_goals", "pages read", "num_pages"),
+    ("hour_goals", "hours read", "num_hours"),
+)
+
+
+def _library_summary(user_id):
+    """Book counts per status and pages read, in one aggregate query."""
+    counts = dict.fromkeys(BOOK_STATUSES, 0)
+    pages_read = 0
+    rows = db.session.execute(
+        select(STATUS_EXPRESSION, func.count(), func.coalesce(func.sum(UserBook.page_progress), 0))
+        .select_from(UserBook)
+        .join(Book, Book.book_id == UserBook.book_id)
+        .where(UserBook.user_id == user_id)
+        .group_by(STATUS_EXPRESSION)
+    )
+    for status, count, pages in rows:
+        counts[status] = count
+        pages_read += pages
+    return {"total_books": sum(counts.values()), "by_status": counts, "pages_read": pages_read}
+
+
+def _currently_reading(user_id):
+    rows = db.session.execute(
+        select(Book.book_id, Book.title, Book.author, Book.open_library_id, Book.page_count,
+               UserBook.page_progress)
+        .join(UserBook, UserBook.book_id == Book.book_id)
+        .where(UserBook.user_id == user_id, STATUS_EXPRESSION == "reading")
+        .order_by(UserBook.add_date.desc(), UserBook.id.desc())
+        .limit(CURRENTLY_READING_LIMIT)
+    )
+    return [{
+        "id": row.book_id,
+        "title": row.title,
+        "author": row.author,
+        "open_library_id": row.open_library_id,
+        "page_progress": row.page_progress,
+        "total_pages": row.page_count,
+    } for row in rows]
+
+
+@dashboard_bp.route("/dashboard", methods=["GET"])
+@jwt_required()
+@response_cache.cached
+@replica_router.read_only
+def get_dashboard():
+    """
+    Everything the dashboard shows, in one response and a fixed number of
+    queries: the user and their goals and clubs are batch loaded from User
+    (one SELECT per relationship), the library is summarized in SQL.
+
+    Returns: user, library (counts per status, pages read, currently reading),
+             active goals (progress below total) and clubs
+    """
+    try:
+        user_id = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid token subject"}), 422
+
+    # Read your own buffered progress (write-behind mode)
+    progress_buffer.flush(user_id)
+
+    user = db.session.get(User, user_id, options=[
+        *(selectinload(getattr(User, collection)) for collection, _, _ in GOAL_COLLECTIONS),
+        selectinload(User.user_clubs).joinedload(UserClub.club),
+    ])
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    goals = []
+    for collection, goal_type, total_column in GOAL_COLLECTIONS:
+        for goal in getattr(user, collection):
+            total = getattr(goal, total_column)
+            if total is not None and goal.progress >= total:
+                continue
+            duration = extract_duration_from_description(goal.description)
+            due_date = calculate_due_date(duration) if duration else None
+            goals.append({
+                "id": goal.goal_id,
+                "description": goal.description,
+                "progress": goal.progress,
+                "total": total,
+                "duration": duration or "unknown",
+                "due_date": due_date.isoformat() if due_date else None,
+                "type": goal_type,
+                "version": goal.version,
+            })
+
+    clubs = [{
+        "id": membership.club.club_id,
+        "name": membership.club.club_name,
+        "genre": membership.club.club_genre,
+    } for membership in user.user_clubs]
+
+    return jsonify({
+        "user": {"id": user.user_id, "username": user.username, "email": user.email},
+        "library": {**_library_summary(user_id), "currently_reading": _currently_reading(user_id)},
+        "goals": goals,
+        "clubs": clubs,
+    }), 200
@@ -0,0 +1,54 @@
+from flask import Blueprint, Response, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from extensions import event_hub
+
+events_bp = Blueprint("events", __name__)
+
+
+@events_bp.route("/events", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_events():
+    """
+    Server-Sent Events stream of the authenticated user's changes.
+
+    Browsers' EventSource cannot set headers, so the token may also be passed
+    as ?jwt=<token>.
+
+    Returns 404 when EVENTS_ENABLED is off, 429 when the user or this worker
+    already holds its maximum of open streams.
+
+    Events: book.created, book.deleted, book.progress, book.rating,
+            goal.created, goal.updated, goal.deleted,
+            import.completed, import.failed, resync
+    """
+    if not current_app.config["EVENTS_ENABLED"]:
+        return jsonify({"error": "Event stream is disabled"}), 404
+    try:
+        user_id = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid token subject"}), 422
+
+    subscription = event_hub.subscribe(user_id)
+    if subscription is None:
+        return jsonify({"error": "Too many open event streams"}), 429
+
+    heartbeat = current_app.config["EVENTS_HEARTBEAT_SECONDS"]
+
+    def generate():
+        try:
+            yield f"retry: {heartbeat * 1000}\n: connected\n\n"
+            while True:
+                message = subscription.get(timeout=heartbeat)
+                if subscription.lagged:
+                    # We dropped events for this slow consumer; tell it to refetch.
+                    subscription.lagged = False
+                    yield "event: resync\ndata: {}\n\n"
+                yield message if message is not None else ": keep-alive\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    response.call_on_close(lambda: event_hub.unsubscribe(subscription))
+    return response
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
+from extensions import db, progress_buffer
+from models import Book, UserBook, BookGoal, PageGoal, HourGoal
+from routes.books import calculate_status
+
+export_bp = Blueprint("export", __name__)
+
+# Rows fetched per round trip from the server-side cursor
+YIELD_PER = 500
+# Bytes buffered before a chunk is flushed to the client
+CHUNK_SIZE = 64 * 1024
+
+CSV_FIELDS = [
+    "record_type", "id", "title", "author", "open_library_id", "status",
+    "page_progress", "total_pages", "rating", "add_date",
+    "goal_type", "description", "progress", "total",
+]
+
+GOAL_SOURCES = [
+    (BookGoal, BookGoal.num_books, "books read"),
+    (PageGoal, PageGoal.num_pages, "pages read"),
+    (HourGoal, HourGoal.num_hours, "hours read"),
+]
+
+
+def iter_export_records(user_id):
+    """
+    Yield one dict per library entry and goal for user_id. Rows are read
+    through a server-side cursor in batches of YIELD_PER, so only one batch
+    is held in memory at a time.
+    """
+    books = (
+        select(
+            Book.book_id, Book.title, Book.author, Book.open_library_id, Book.page_count,
+            UserBook.page_progress, UserBook.finished, UserBook.user_rating, UserBook.add_date,
+        )
+        .join(UserBook, UserBook.book_id == Book.book_id)
+        .where(UserBook.user_id == user_id)
+        .order_by(UserBook.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for row in db.session.execute(books):
+        yield {
+            "record_type": "book",
+            "id": row.book_id,
+            "title": row.title,
+            "author": row.author,
+            "open_library_id": row.open_library_id,
+            "status": calculate_status(row.page_progress, row.page_count, row.finished),
+            "page_progress": row.page_progress,
+            "total_pages": row.page_count,
+            "rating": row.user_rating,
+            "add_date": row.add_date.isoformat() if row.add_date else None,
+        }
+
+    for model, total_column, goal_type in GOAL_SOURCES:
+        goals = (
+            select(model.goal_id, model.description, model.progress, total_column.label("total"))
+            .where(model.user_id == user_id)
+            .order_by(model.goal_id)
+            .execution_options(yield_per=YIELD_PER)
+        )
+        for row in db.session.execute(goals):
+            yield {
+                "record_type": "goal",
+                "id": row.goal_id,
+                "goal_type": goal_type,
+                "description": row.description,
+                "progress": row.progress,
+                "total": row.total,
+            }
+
+
+def _ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def _csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _chunked(lines):
+    """Coalesce small lines into CHUNK_SIZE writes."""
+    parts, size = [], 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts)
+
+
+EXPORT_FORMATS = {
+    "ndjson": (_ndjson_lines, "application/x-ndjson"),
+    "csv": (_csv_lines, "text/csv"),
+}
+
+
+@export_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_library():
+    """
+    Stream the authenticated user's library and goals.
+
+    Params: format (query, "ndjson" or "csv", default: ndjson)
+    Returns: One record per book and goal, with a record_type of "book" or "goal"
+    """
+    user_id = get_jwt_identity()
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    progress_buffer.flush(user_id)
+    serialize, mimetype = EXPORT_FORMATS[export_format]
+    body = stream_with_context(_chunked(serialize(iter_export_records(user_id))))
+
+    response = Response(body, mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=bookmarkd-export.{export_format}"
+    return response
@@ -0,0 +1,164 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from extensions import db, replica_router, friend_suggestions
+from models import Follow, User
+
+follows_bp = Blueprint("follows", __name__)
+
+# Default and largest page of the follower and following lists
+LIST_LIMIT = 50
+MAX_LIST_LIMIT = 200
+
+
+def _user_id():
+    try:
+        return int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return None
+
+
+def _page():
+    """limit and offset query parameters; raises ValueError."""
+    try:
+        limit = int(request.args.get("limit", LIST_LIMIT))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        raise ValueError("limit and offset must be numbers") from None
+    if not 1 <= limit <= MAX_LIST_LIMIT or offset < 0:
+        raise ValueError(f"limit must be between 1 and {MAX_LIST_LIMIT} and offset non-negative")
+    return limit, offset
+
+
+def _list_edges(user_id, own_column, other_column):
+    """
+    One page of the users on the other end of user_id's edges, newest
+    first; own_column is the indexed end (follower_id or followee_id).
+    """
+    try:
+        limit, offset = _page()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if db.session.get(User, user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+
+    rows = db.session.execute(
+        select(User.user_id, User.username, Follow.created_at)
+        .join(Follow, other_column == User.user_id)
+        .where(own_column == user_id)
+        .order_by(Follow.created_at.desc(), other_column.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    users = [{
+        "id": row.user_id,
+        "username": row.username,
+        "followed_at": row.created_at.isoformat() + "Z",
+    } for row in rows]
+    total = db.session.scalar(select(func.count()).select_from(Follow).where(own_column == user_id))
+    return jsonify({"users": users, "total": total}), 200
+
+
+@follows_bp.route("/users/<int:user_id>/follow", methods=["POST"])
+@jwt_required()
+def follow_user(user_id):
+    """
+    Follow a user.
+
+    Params: user_id (in URL)
+    Returns: 201 when the follow is new, 200 if already following
+    """
+    follower_id = _user_id()
+    if follower_id is None:
+        return jsonify({"error": "Invalid token subject"}), 422
+    if follower_id == user_id:
+        return jsonify({"error": "You cannot follow yourself"}), 400
+    if db.session.get(User, user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    if db.session.get(Follow, (follower_id, user_id)) is not None:
+        return jsonify({"message": "Already following"}), 200
+
+    db.session.add(Follow(follower_id=follower_id, followee_id=user_id))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request created the same follow
+        db.session.rollback()
+        return jsonify({"message": "Already following"}), 200
+    friend_suggestions.invalidate(follower_id)
+
+    return jsonify({"message": "Followed"}), 201
+
+
+@follows_bp.route("/users/<int:user_id>/follow", methods=["DELETE"])
+@jwt_required()
+def unfollow_user(user_id):
+    """
+    Stop following a user.
+
+    Params: user_id (in URL)
+    Returns: Success message, 404 if not following
+    """
+    follower_id = _user_id()
+    if follower_id is None:
+        return jsonify({"error": "Invalid token subject"}), 422
+    follow = db.session.get(Follow, (follower_id, user_id))
+    if follow is None:
+        return jsonify({"error": "Not following this user"}), 404
+
+    db.session.delete(follow)
+    db.session.commit()
+    friend_suggestions.invalidate(follower_id)
+
+    return jsonify({"message": "Unfollowed"}), 200
+
+
+@follows_bp.route("/users/<int:user_id>/followers", methods=["GET"])
+@jwt_required()
+@replica_router.read_only
+def get_followers(user_id):
+    """
+    Users following user_id, most recent first.
+
+    Params: user_id (in URL), limit (query, default 50, at most 200), offset (query)
+    Returns: users (id, username, followed_at) and total
+    """
+    return _list_edges(user_id, Follow.followee_id, Follow.follower_id)
+
+
+@follows_bp.route("/users/<int:user_id>/following", methods=["GET"])
+@jwt_required()
+@replica_router.read_only
+def get_following(user_id):
+    """
+    Users user_id follows, most recently followed first.
+
+    Params: user_id (in URL), limit (query, default 50, at most 200), offset (query)
+    Returns: users (id, username, followed_at) and total
+    """
+    return _list_edges(user_id, Follow.follower_id, Follow.followee_id)
+
+
+@follows_bp.route("/users/suggestions", methods=["GET"])
+@jwt_required()
+@replica_router.read_only
+def get_suggestions():
+    """
+    Friend suggestions: people followed by the people you follow, weighted
+    by shared books and clubs (see services/suggestions.py).
+
+    Params: limit (query, optional, default 10, at most SUGGESTIONS_MAX)
+    Returns: Array of users with id, username, mutual_follows, shared_books, shared_clubs, score
+    """
+    user_id = _user_id()
+    if user_id is None:
+        return jsonify({"error": "Invalid token subject"}), 422
+    try:
+        limit = int(request.args.get("limit", 10))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "limit must be a positive number"}), 400
+
+    return jsonify(friend_suggestions.for_user(user_id, limit)), 200
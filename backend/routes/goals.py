@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from models import BookGoal, PageGoal, HourGoal, User
-from extensions import db
+from extensions import db, replica_router, idempotency, response_cache
+from services import versioning
+from services.events import publish_on_commit
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime, timedelta
 from calendar import monthrange
 
@@ -69,6 +73,8 @@ def calculate_duration_description(duration):
 
 @goals_bp.route('/goals', methods=['POST'])
 @jwt_required()
+@response_cache.invalidates
+@idempotency.idempotent
 def create_goal():
     """Create a new goal for the authenticated user"""
     user_id = get_jwt_identity()
@@ -144,7 +150,7 @@ def create_goal():
             )
         
         db.session.add(goal)
-        db.session.commit()
+        db.session.flush()
         
         # Calculate due date
         due_date = calculate_due_date(duration)
@@ -158,8 +164,11 @@ def create_goal():
             'duration': duration,
             'due_date': due_date.isoformat() if due_date else None,
             'progress': 0,
-            'total': amount
+            'total': amount,
+            'version': goal.version
         }
+        publish_on_commit(user_id, 'goal.created', goal_data)
+        db.session.commit()
         
         return jsonify({
             'message': 'Goal created successfully',
@@ -172,6 +181,8 @@ def create_goal():
 
 @goals_bp.route('/goals', methods=['GET'])
 @jwt_required()
+@response_cache.cached
+@replica_router.read_only
 def get_goals():
     """Get all goals for the authenticated user"""
     user_id = get_jwt_identity()
@@ -206,7 +217,8 @@ def get_goals():
                 'total': goal.num_books,
                 'duration': duration or 'unknown',
                 'due_date': due_date.isoformat() if due_date else None,
-                'type': 'books read'
+                'type': 'books read',
+                'version': goal.version
             })
         
         # Process page goals
@@ -221,7 +233,8 @@ def get_goals():
                 'total': goal.num_pages,
                 'duration': duration or 'unknown',
                 'due_date': due_date.isoformat() if due_date else None,
-                'type': 'pages read'
+                'type': 'pages read',
+                'version': goal.version
             })
         
         # Process hour goals
@@ -236,7 +249,8 @@ def get_goals():
                 'total': goal.num_hours,
                 'duration': duration or 'unknown',
                 'due_date': due_date.isoformat() if due_date else None,
-                'type': 'hours read'
+                'type': 'hours read',
+                'version': goal.version
             })
         
         return jsonify({
@@ -249,6 +263,7 @@ def get_goals():
 
 @goals_bp.route('/goals/<int:goal_id>', methods=['DELETE'])
 @jwt_required()
+@response_cache.invalidates
 def delete_goal(goal_id):
     """Delete a specific goal for the authenticated user"""
     user_id = get_jwt_identity()
@@ -266,12 +281,14 @@ def delete_goal(goal_id):
         # Try to find the goal in all three goal types
         goal = None
         goal_type = None
+        total = None
         
         # Check BookGoal
         book_goal = BookGoal.query.filter_by(goal_id=goal_id, user_id=user_id).first()
         if book_goal:
             goal = book_goal
             goal_type = 'books read'
+            total = book_goal.num_books
         
         # Check PageGoal
         if not goal:
@@ -279,6 +296,7 @@ def delete_goal(goal_id):
             if page_goal:
                 goal = page_goal
                 goal_type = 'pages read'
+                total = page_goal.num_pages
         
         # Check HourGoal
         if not goal:
@@ -286,13 +304,19 @@ def delete_goal(goal_id):
             if hour_goal:
                 goal = hour_goal
                 goal_type = 'hours read'
+                total = hour_goal.num_hours
         
         # If goal not found or doesn't belong to user
         if not goal:
             return jsonify({'error': 'Goal not found'}), 404
         
-        # Delete the goal
+        # Delete the goal; the DELETE only applies if the version is unchanged
         db.session.delete(goal)
+        try:
+            db.session.flush()
+        except StaleDataError:
+            return goal_conflict(goal, goal_type, total, stale=True)
+        publish_on_commit(user_id, 'goal.deleted', {'id': goal_id, 'type': goal_type})
         db.session.commit()
         
         return jsonify({
@@ -309,8 +333,13 @@ def delete_goal(goal_id):
 
 @goals_bp.route('/goals/<int:goal_id>', methods=['PUT'])
 @jwt_required()
+@response_cache.invalidates
 def update_goal(goal_id):
-    """Update a goal's progress for the authenticated user"""
+    """
+    Update a goal's progress for the authenticated user.
+    An optional version (the one last read) makes the update conditional:
+    if the goal changed since, 409 is returned with its current state.
+    """
     user_id = get_jwt_identity()
     try:
         user_id = int(user_id)
@@ -338,6 +367,11 @@ def update_goal(goal_id):
     except (TypeError, ValueError):
         return jsonify({'error': 'progress must be a valid number'}), 400
     
+    try:
+        expected_version = versioning.expected_version(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     try:
         # Try to find the goal in all three goal types
         goal = None
@@ -371,24 +405,21 @@ def update_goal(goal_id):
         if not goal:
             return jsonify({'error': 'Goal not found'}), 404
         
-        # Update the progress in the database
-        goal.progress = progress
-        db.session.commit()
+        if expected_version is not None and goal.version != expected_version:
+            return goal_conflict(goal, goal_type, total)
         
-        # Extract duration for due_date calculation
-        duration = extract_duration_from_description(goal.description)
-        due_date = calculate_due_date(duration) if duration else None
+        # Update the progress in the database; the UPDATE only applies if
+        # the version is unchanged
+        goal.progress = progress
+        try:
+            db.session.flush()
+        except StaleDataError:
+            return goal_conflict(goal, goal_type, total, stale=True)
         
         # Return updated goal data
-        goal_data = {
-            'id': goal.goal_id,
-            'description': goal.description,
-            'progress': goal.progress,
-            'total': total,
-            'duration': duration or 'unknown',
-            'due_date': due_date.isoformat() if due_date else None,
-            'type': goal_type
-        }
+        goal_data = goal_details(goal, goal_type, total)
+        publish_on_commit(user_id, 'goal.updated', goal_data)
+        db.session.commit()
         
         return jsonify({
             'message': 'Goal progress updated successfully',
@@ -398,6 +429,39 @@ def update_goal(goal_id):
     except Exception as e:
         return jsonify({'error': f'Failed to update goal: {str(e)}'}), 500
 
+def goal_details(goal, goal_type, total):
+    """Goal data returned after an update"""
+    # Extract duration for due_date calculation
+    duration = extract_duration_from_description(goal.description)
+    due_date = calculate_due_date(duration) if duration else None
+    
+    return {
+        'id': goal.goal_id,
+        'description': goal.description,
+        'progress': goal.progress,
+        'total': total,
+        'duration': duration or 'unknown',
+        'due_date': due_date.isoformat() if due_date else None,
+        'type': goal_type,
+        'version': goal.version
+    }
+
+def goal_conflict(goal, goal_type, total, stale=False):
+    """
+    409 response carrying the goal's current state. stale means our write
+    lost a race, so the transaction is rolled back and the goal reloaded first.
+    """
+    if stale:
+        db.session.rollback()
+        try:
+            db.session.refresh(goal)
+        except InvalidRequestError:
+            return jsonify({'error': 'Goal not found'}), 404
+    return jsonify({
+        'error': 'Goal was modified by another request',
+        'goal': goal_details(goal, goal_type, total)
+    }), 409
+
 def extract_duration_from_description(description):
     """Extract duration from goal description"""
     if not description:
@@ -1,4 +1,6 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify, request
+from extensions import metrics, slow_queries, response_cache, friend_suggestions
+from services.profiler import HEADER as ADMIN_TOKEN_HEADER, RequestProfiler, verify_token
 
 health_bp = Blueprint('health', __name__)
 
@@ -7,4 +9,31 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'BookMarkd API is running'
-    })
\ No newline at end of file
+    })
+
+@health_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Per-route latency, response size, SQL statement, response cache and suggestions cache metrics in Prometheus text format."""
+    return Response(metrics.render() + response_cache.render_metrics() + friend_suggestions.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@health_bp.route('/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """
+    Worst statements over SLOW_QUERY_THRESHOLD_MS seen by this process, with
+    their routes and query plans. 404 unless SLOW_QUERY_ENDPOINT_ENABLED and
+    the slow-query log are on; requires the admin token printed by
+    `flask profile-token` in the X-Profile-Token header.
+    Params: sort (query: total, max, mean or count; default total), limit (query, default 20)
+    """
+    if not (current_app.config['SLOW_QUERY_ENDPOINT_ENABLED'] and slow_queries.enabled):
+        return jsonify({'error': 'Not found'}), 404
+    if not verify_token(RequestProfiler.secret(), request.headers.get(ADMIN_TOKEN_HEADER)):
+        return jsonify({'error': 'A valid admin token is required'}), 401
+    sort = request.args.get('sort', 'total')
+    if sort not in ('total', 'max', 'mean', 'count'):
+        return jsonify({'error': 'sort must be one of: total, max, mean, count'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be a valid number'}), 400
+    return jsonify({'statements': slow_queries.summary(limit=limit, sort=sort)})
@@ -0,0 +1,83 @@
+import os
+from flask import Blueprint, request, jsonify, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from extensions import db, importer, rate_limiter
+from models import ImportJob
+from services.imports import ImportFormatError
+
+imports_bp = Blueprint("imports", __name__)
+
+
+def _job_data(job):
+    return {
+        "id": job.job_id,
+        "source": job.source,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "books_imported": job.books_imported,
+        "rows_skipped": job.rows_skipped,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+@imports_bp.route("/imports", methods=["POST"])
+@jwt_required()
+@rate_limiter.limit("10/hour")
+def create_import():
+    """
+    Import a Goodreads or StoryGraph CSV export into the authenticated user's library.
+
+    Required params: file (multipart upload)
+    Returns: The import job (202); poll its Location until status is completed or failed
+    """
+    try:
+        user_id = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid token subject"}), 422
+
+    upload = request.files.get("file")
+    if upload is None:
+        return jsonify({"error": "A CSV file is required"}), 400
+
+    path = importer.spool(upload.stream)
+    if path is None:
+        return jsonify({"error": "File is too large"}), 413
+    try:
+        source = importer.sniff(path)
+    except ImportFormatError as exc:
+        os.unlink(path)
+        return jsonify({"error": str(exc)}), 400
+
+    job = ImportJob(user_id=user_id, source=source, status="pending")
+    db.session.add(job)
+    db.session.commit()
+    job_data = _job_data(job)
+
+    importer.submit(job.job_id, path)
+
+    response = jsonify(job_data)
+    response.headers["Location"] = url_for("imports.get_import", job_id=job.job_id)
+    return response, 202
+
+
+@imports_bp.route("/imports/<int:job_id>", methods=["GET"])
+@jwt_required()
+def get_import(job_id):
+    """
+    Get the progress of one of the authenticated user's import jobs.
+
+    Params: job_id (in URL)
+    Returns: status (pending, running, completed, failed) and row counts
+    """
+    try:
+        user_id = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid token subject"}), 422
+
+    job = ImportJob.query.filter_by(job_id=job_id, user_id=user_id).first()
+    if not job:
+        return jsonify({"error": "Import not found"}), 404
+
+    return jsonify(_job_data(job)), 200
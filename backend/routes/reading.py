@@ -0,0 +1,212 @@
+from datetime import date, datetime, timedelta, timezone
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
+from extensions import db, replica_router, response_cache
+from models import Book, ReadingSession, UserBook
+from routes.goals import goal_details
+from services.events import publish_on_commit
+from services.reading_activity import active_days, add_goal_hours, record_activity, streaks
+
+reading_bp = Blueprint("reading", __name__)
+
+# Longest session accepted
+MAX_SESSION = timedelta(hours=24)
+
+# Default and largest page of GET /reading/sessions
+SESSIONS_LIMIT = 20
+MAX_SESSIONS_LIMIT = 100
+
+
+def _user_id():
+    try:
+        return int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_timestamp(data, field):
+    """ISO 8601 timestamp from the body; naive timestamps are taken as UTC."""
+    value = data.get(field)
+    if not isinstance(value, str):
+        raise ValueError(f"{field} is required (ISO 8601 timestamp)")
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO 8601 timestamp") from None
+
+
+def _utc(timestamp):
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _today():
+    """The `today` query parameter (the client's local date), else today in UTC."""
+    value = request.args.get("today")
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    return date.fromisoformat(value)
+
+
+def _session_data(session):
+    return {
+        "id": session.session_id,
+        "book_id": session.book_id,
+        "started_at": session.started_at.isoformat() + "Z",
+        "ended_at": session.ended_at.isoformat() + "Z",
+        "minutes": round((session.ended_at - session.started_at).total_seconds() / 60),
+        "pages_read": session.pages_read,
+    }
+
+
+@reading_bp.route("/reading/sessions", methods=["POST"])
+@jwt_required()
+@response_cache.invalidates
+def create_session():
+    """
+    Log a reading session, mark the days it covers as active and add its
+    hours to the user's unfinished hour goals.
+
+    Params: book_id, started_at, ended_at (in body; ISO 8601 with the reader's
+            UTC offset, whose local dates are the ones marked), pages_read (in body, optional)
+    Returns: The session, with its length in minutes
+    """
+    user_id = _user_id()
+    if user_id is None:
+        return jsonify({"error": "Invalid token subject"}), 422
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "Request body is required"}), 400
+
+    try:
+        started_at = _parse_timestamp(data, "started_at")
+        ended_at = _parse_timestamp(data, "ended_at")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if (started_at.tzinfo is None) != (ended_at.tzinfo is None):
+        return jsonify({"error": "started_at and ended_at must both have a UTC offset or neither"}), 400
+    if ended_at < started_at:
+        return jsonify({"error": "ended_at must not be before started_at"}), 400
+    if ended_at - started_at > MAX_SESSION:
+        return jsonify({"error": "A session cannot be longer than 24 hours"}), 400
+
+    book_id = data.get("book_id")
+    if not isinstance(book_id, int) or isinstance(book_id, bool):
+        return jsonify({"error": "book_id must be an integer"}), 400
+    try:
+        pages_read = int(data.get("pages_read", 0))
+        if pages_read < 0:
+            return jsonify({"error": "Pages read must be non-negative"}), 400
+    except (ValueError, TypeError):
+        return jsonify({"error": "Pages read must be a valid number"}), 400
+
+    in_library = db.session.scalar(
+        select(UserBook.id).where(UserBook.user_id == user_id, UserBook.book_id == book_id)
+    )
+    if in_library is None:
+        return jsonify({"error": "Book not found in your library"}), 404
+
+    session = ReadingSession(
+        user_id=user_id,
+        book_id=book_id,
+        started_at=_utc(started_at),
+        ended_at=_utc(ended_at),
+        pages_read=pages_read,
+    )
+    db.session.add(session)
+    record_activity(user_id, started_at.date(), ended_at.date())
+    hours = round((ended_at - started_at).total_seconds() / 3600, 2)
+    for goal in add_goal_hours(user_id, hours):
+        publish_on_commit(user_id, "goal.updated", goal_details(goal, "hours read", goal.num_hours))
+    db.session.flush()
+    session_data = _session_data(session)
+    db.session.commit()
+
+    return jsonify(session_data), 201
+
+
+@reading_bp.route("/reading/sessions", methods=["GET"])
+@jwt_required()
+@replica_router.read_only
+def get_sessions():
+    """
+    The user's most recent reading sessions.
+
+    Params (query, all optional): limit (default 20, at most 100), book_id
+    Returns: Array of sessions, newest first, with book titles
+    """
+    user_id = _user_id()
+    if user_id is None:
+        return jsonify({"error": "Invalid token subject"}), 422
+    try:
+        limit = int(request.args.get("limit", SESSIONS_LIMIT))
+        book_id = request.args.get("book_id", type=int)
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+    if not 1 <= limit <= MAX_SESSIONS_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SESSIONS_LIMIT}"}), 400
+
+    conditions = [ReadingSession.user_id == user_id]
+    if book_id is not None:
+        conditions.append(ReadingSession.book_id == book_id)
+
+    rows = db.session.execute(
+        select(ReadingSession, Book.title)
+        .join(Book, Book.book_id == ReadingSession.book_id)
+        .where(*conditions)
+        .order_by(ReadingSession.started_at.desc(), ReadingSession.session_id.desc())
+        .limit(limit)
+    )
+    sessions = [{**_session_data(session), "title": title} for session, title in rows]
+    return jsonify(sessions), 200
+
+
+@reading_bp.route("/reading/streak", methods=["GET"])
+@jwt_required()
+@replica_router.read_only
+def get_streak():
+    """
+    Reading streaks, computed from the yearly activity bitmaps.
+
+    Params (query, optional): today (ISO date; the reader's local date, default today in UTC)
+    Returns: current (consecutive days up to today, or yesterday while today has no session yet),
+             longest, active_days, last_active
+    """
+    user_id = _user_id()
+    if user_id is None:
+        return jsonify({"error": "Invalid token subject"}), 422
+    try:
+        today = _today()
+    except ValueError:
+        return jsonify({"error": "today must be an ISO date (YYYY-MM-DD)"}), 400
+
+    return jsonify(streaks(user_id, today)), 200
+
+
+@reading_bp.route("/reading/heatmap", methods=["GET"])
+@jwt_required()
+@replica_router.read_only
+def get_heatmap():
+    """
+    The days of a year on which the user read, for a calendar heatmap.
+
+    Params (query, optional): year (default: the current year in UTC)
+    Returns: year, active_days, dates (ISO dates in order)
+    """
+    user_id = _user_id()
+    if user_id is None:
+        return jsonify({"error": "Invalid token subject"}), 422
+    try:
+        year = int(request.args.get("year", datetime.now(timezone.utc).year))
+        date(year, 1, 1)
+    except ValueError:
+        return jsonify({"error": "year must be a valid year"}), 400
+
+    dates = active_days(user_id, year)
+    return jsonify({
+        "year": year,
+        "active_days": len(dates),
+        "dates": [day.isoformat() for day in dates],
+    }), 200
@@ -0,0 +1,15 @@
+from .events import EventHub, publish_on_commit
+from .metrics import Metrics
+from .rate_limit import RateLimiter, RateLimitBackend, MemoryBackend
+from .replica import ReplicaRouter, RoutingSession
+
+__all__ = [
+    "EventHub",
+    "publish_on_commit",
+    "Metrics",
+    "RateLimiter",
+    "RateLimitBackend",
+    "MemoryBackend",
+    "ReplicaRouter",
+    "RoutingSession",
+]
@@ -0,0 +1,159 @@
+import time
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import and_, delete, exists, func, insert, select, text
+
+from services.scheduler import PeriodicJob
+
+
+def _orphaned(book_table):
+    """Anti-join condition: no row references the book."""
+    from models import UserBook, ReadingSession
+
+    return and_(
+        ~exists().where(UserBook.book_id == book_table.book_id),
+        ~exists().where(ReadingSession.book_id == book_table.book_id),
+    )
+
+
+def collect_orphaned_books(batch_size=500, archive=False, dry_run=False, pause=0.0):
+    """
+    Delete (or archive, then delete) Book rows no user references.
+
+    The catalog is walked in primary-key windows of batch_size rows, each in
+    its own short transaction: orphans in the window are found with an
+    anti-join, locked and re-checked (so a book linked in the meantime is
+    kept), copied to archived_book if requested, then deleted. pause seconds
+    are slept between batches to leave room for other writers.
+
+    Returns a report dict: batches, scanned, reclaimed, archived, seconds.
+    """
+    from extensions import db
+    from models import Book, ArchivedBook
+
+    started = time.perf_counter()
+    report = {"batches": 0, "scanned": 0, "reclaimed": 0, "archived": 0}
+    last_id = 0
+    while True:
+        window = db.session.scalars(
+            select(Book.book_id).where(Book.book_id > last_id).order_by(Book.book_id).limit(batch_size)
+        ).all()
+        if not window:
+            break
+        lower, last_id = window[0], window[-1]
+
+        in_window = (Book.book_id >= lower, Book.book_id <= last_id, _orphaned(Book))
+        if dry_run:
+            reclaimed = db.session.scalar(select(func.count()).select_from(Book).where(*in_window))
+            db.session.rollback()
+        else:
+            rows = db.session.execute(
+                select(Book.book_id, Book.title, Book.author, Book.page_count,
+                       Book.open_library_id, Book.genre)
+                .where(*in_window)
+                .with_for_update()
+            ).mappings().all()
+            if rows and archive:
+                db.session.execute(insert(ArchivedBook), [dict(row) for row in rows])
+                report["archived"] += len(rows)
+            if rows:
+                db.session.execute(
+                    delete(Book).where(Book.book_id.in_([row["book_id"] for row in rows])),
+                    execution_options={"synchronize_session": False},
+                )
+            db.session.commit()
+            reclaimed = len(rows)
+
+        report["batches"] += 1
+        report["scanned"] += len(window)
+        report["reclaimed"] += reclaimed
+        if pause:
+            time.sleep(pause)
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+# Statements that return freed pages to the OS / rebuild the table.
+_COMPACT_STATEMENTS = {
+    "sqlite": ["VACUUM"],
+    "mysql": ["OPTIMIZE TABLE book", "OPTIMIZE TABLE user_book"],
+    "postgresql": ["VACUUM ANALYZE book", "VACUUM ANALYZE user_book"],
+}
+
+
+def compact_tables():
+    """Run the dialect's table compaction outside a transaction."""
+    from extensions import db
+
+    statements = _COMPACT_STATEMENTS.get(db.engine.dialect.name, [])
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    return statements
+
+
+class CatalogCollector:
+    """
+    Schedules collect_orphaned_books every CATALOG_GC_INTERVAL_SECONDS
+    (0 disables it) once start() is called, and provides the
+    `flask gc-books` command.
+    """
+
+    def __init__(self, app=None):
+        self._job = PeriodicJob("catalog-gc", self._collect)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CATALOG_GC_INTERVAL_SECONDS", 0)
+        app.config.setdefault("CATALOG_GC_BATCH_SIZE", 500)
+        app.config.setdefault("CATALOG_GC_ARCHIVE", False)
+        app.config.setdefault("CATALOG_GC_PAUSE_SECONDS", 0.05)
+        app.extensions["catalog_gc"] = self
+        app.cli.add_command(gc_books_command)
+
+    def start(self, app):
+        self._job.start(app, app.config["CATALOG_GC_INTERVAL_SECONDS"])
+
+    def stop(self):
+        self._job.stop()
+
+    @staticmethod
+    def _collect():
+        from flask import current_app
+
+        config = current_app.config
+        return collect_orphaned_books(
+            batch_size=config["CATALOG_GC_BATCH_SIZE"],
+            archive=config["CATALOG_GC_ARCHIVE"],
+            pause=config["CATALOG_GC_PAUSE_SECONDS"],
+        )
+
+
+@click.command("gc-books")
+@click.option("--batch-size", type=int, default=None, help="Books examined per transaction.")
+@click.option("--archive/--no-archive", default=None, help="Copy reclaimed rows to archived_book.")
+@click.option("--dry-run", is_flag=True, help="Only count orphaned books.")
+@click.option("--compact", is_flag=True, help="Compact the book tables afterwards.")
+@with_appcontext
+def gc_books_command(batch_size, archive, dry_run, compact):
+    """Delete catalog books that no user has in their library."""
+    from flask import current_app
+
+    config = current_app.config
+    report = collect_orphaned_books(
+        batch_size=batch_size or config["CATALOG_GC_BATCH_SIZE"],
+        archive=config["CATALOG_GC_ARCHIVE"] if archive is None else archive,
+        dry_run=dry_run,
+        pause=config["CATALOG_GC_PAUSE_SECONDS"],
+    )
+    verb = "Would reclaim" if dry_run else "Reclaimed"
+    click.echo(
+        f"{verb} {report['reclaimed']} of {report['scanned']} books "
+        f"({report['archived']} archived) in {report['batches']} batches, {report['seconds']}s"
+    )
+    if compact and not dry_run:
+        for statement in compact_tables():
+            click.echo(f"Ran {statement}")
@@ -0,0 +1,145 @@
+import json
+import queue
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event
+
+_PENDING_KEY = "pending_events"
+
+
+class Subscription:
+    """A single SSE connection's bounded mailbox."""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.lagged = False
+
+    def offer(self, message):
+        """
+        Enqueue without blocking the publisher. When the consumer has fallen
+        behind, the oldest message is discarded and the subscription is marked
+        as lagged so the client can be told to resync.
+        """
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                self.dropped += 1
+                self.lagged = True
+
+    def get(self, timeout=None):
+        """Return the next message, or None if nothing arrived within timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    """
+    In-process pub/sub hub that fans committed changes out to each user's
+    open event streams. Events only reach streams held by the publishing
+    process, so gunicorn.conf.py refuses EVENTS_ENABLED with several workers.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._session_hooked = False
+        self.queue_size = 100
+        self.max_streams_per_user = 5
+        self.max_streams = 100
+        self._stream_count = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("EVENTS_QUEUE_SIZE", 100)
+        app.config.setdefault("EVENTS_MAX_STREAMS_PER_USER", 5)
+        app.config.setdefault("EVENTS_MAX_STREAMS", 100)
+        app.config.setdefault("EVENTS_ENABLED", True)
+        app.config.setdefault("EVENTS_HEARTBEAT_SECONDS", 15)
+        self.queue_size = app.config["EVENTS_QUEUE_SIZE"]
+        self.max_streams_per_user = app.config["EVENTS_MAX_STREAMS_PER_USER"]
+        self.max_streams = app.config["EVENTS_MAX_STREAMS"]
+        app.extensions["event_hub"] = self
+
+        if not self._session_hooked:
+            from extensions import db
+            event.listen(db.session, "after_commit", self._flush_pending)
+            event.listen(db.session, "after_soft_rollback", self._discard_pending)
+            self._session_hooked = True
+
+    def subscribe(self, user_id):
+        """
+        Open a stream for user_id, or return None if the user or this process
+        is at its cap. Each open stream holds a server thread.
+        """
+        with self._lock:
+            if self._stream_count >= self.max_streams:
+                return None
+            streams = self._subscribers[user_id]
+            if len(streams) >= self.max_streams_per_user:
+                return None
+            sub = Subscription(user_id, self.queue_size)
+            streams.add(sub)
+            self._stream_count += 1
+            return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            streams = self._subscribers.get(sub.user_id)
+            if streams is None or sub not in streams:
+                return
+            streams.discard(sub)
+            self._stream_count -= 1
+            if not streams:
+                del self._subscribers[sub.user_id]
+
+    def publish(self, user_id, event_type, data):
+        """Deliver an event to every open stream of user_id immediately."""
+        message = format_sse(event_type, data)
+        with self._lock:
+            streams = list(self._subscribers.get(user_id, ()))
+        for sub in streams:
+            sub.offer(message)
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def _flush_pending(self, session):
+        pending = session.info.pop(_PENDING_KEY, None)
+        for user_id, event_type, data in pending or ():
+            self.publish(user_id, event_type, data)
+
+    def _discard_pending(self, session, previous_transaction):
+        session.info.pop(_PENDING_KEY, None)
+
+
+def publish_on_commit(user_id, event_type, data):
+    """
+    Queue an event on the current session; it is only published once the
+    surrounding transaction commits and is dropped on rollback.
+    """
+    from extensions import db
+    session = db.session()
+    if not session.in_transaction():
+        # Rollback hooks only fire for a begun transaction.
+        session.begin()
+    session.info.setdefault(_PENDING_KEY, []).append((int(user_id), event_type, data))
+
+
+def format_sse(event_type, data):
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"event: {event_type}\ndata: {payload}\n\n"
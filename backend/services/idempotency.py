@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.utils import import_string
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# Response headers worth replaying alongside the body
+_REPLAYED_HEADERS = ("Content-Type", "Location")
+
+
+class IdempotencyBackend:
+    """
+    Storage interface for idempotent responses. A shared backend (e.g. Redis)
+    can implement this so retries are recognised across worker processes.
+    """
+
+    def reserve(self, key, fingerprint, ttl):
+        """
+        Claim key for a new request.
+        Returns ("new", None) if the caller should run the request,
+        ("pending", None) while the first request is still running,
+        ("mismatch", None) if key was first used with a different request, or
+        ("done", response) with the stored (status, body, headers).
+        """
+        raise NotImplementedError
+
+    def complete(self, key, response):
+        """Store the response for a key claimed with reserve()."""
+        raise NotImplementedError
+
+    def release(self, key):
+        """Forget a claimed key so the request can be retried."""
+        raise NotImplementedError
+
+
+class MemoryBackend(IdempotencyBackend):
+    """
+    In-process response store. Entries expire ttl seconds after they were
+    reserved; since the TTL is fixed, insertion order is expiry order and
+    expired entries are pruned from the front. Beyond max_keys the oldest
+    entries are evicted, so memory stays bounded.
+    """
+
+    def __init__(self, max_keys=10000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reserve(self, key, fingerprint, ttl):
+        now = self._clock()
+        with self._lock:
+            self._prune(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [now + ttl, fingerprint, None]
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+                return "new", None
+
+            _, stored_fingerprint, response = entry
+            if stored_fingerprint != fingerprint:
+                return "mismatch", None
+            if response is None:
+                return "pending", None
+            return "done", response
+
+    def complete(self, key, response):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = response
+
+    def release(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _prune(self, now):
+        while self._entries:
+            key, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now:
+                return
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Idempotency:
+    """
+    Replays the first response to a request carrying an Idempotency-Key
+    header, per (user, endpoint, key), for IDEMPOTENCY_TTL_SECONDS. Retries
+    never reach the view, so they cannot create duplicates.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("IDEMPOTENCY_TTL_SECONDS", 24 * 3600)
+        app.config.setdefault("IDEMPOTENCY_MAX_KEYS", 10000)
+        app.config.setdefault("IDEMPOTENCY_BACKEND", None)
+
+        backend_path = app.config["IDEMPOTENCY_BACKEND"]
+        if backend_path:
+            backend = import_string(backend_path)()
+        else:
+            backend = MemoryBackend(max_keys=app.config["IDEMPOTENCY_MAX_KEYS"])
+        app.extensions["idempotency"] = backend
+
+    @property
+    def backend(self):
+        return current_app.extensions["idempotency"]
+
+    def idempotent(self, view):
+        """Honour Idempotency-Key on the decorated view; place it below @jwt_required()."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            client_key = request.headers.get(HEADER)
+            if client_key is None:
+                return view(*args, **kwargs)
+            if not client_key or len(client_key) > MAX_KEY_LENGTH:
+                return jsonify({"error": f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters"}), 400
+
+            key = f"{get_jwt_identity()}:{request.endpoint}:{client_key}"
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+            ttl = current_app.config["IDEMPOTENCY_TTL_SECONDS"]
+
+            state, stored = self.backend.reserve(key, fingerprint, ttl)
+            if state == "mismatch":
+                return jsonify({"error": f"{HEADER} was already used for a different request"}), 422
+            if state == "pending":
+                return jsonify({"error": "A request with this Idempotency-Key is still in progress"}), 409
+            if state == "done":
+                status, body, headers = stored
+                response = current_app.response_class(body, status=status, headers=headers)
+                response.headers["Idempotent-Replayed"] = "true"
+                return response
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                self.backend.release(key)
+                raise
+            if response.status_code >= 500:
+                # Server errors are worth retrying for real.
+                self.backend.release(key)
+            else:
+                headers = {name: response.headers[name] for name in _REPLAYED_HEADERS if name in response.headers}
+                self.backend.complete(key, (response.status_code, response.get_data(), headers))
+            return response
+        return wrapper
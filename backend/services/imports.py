@@ -0,0 +1,270 @@
+import csv
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from flask import current_app
+from sqlalchemy import insert, select
+
+logger = logging.getLogger(__name__)
+
+# Shelf / read-status values mapped to page progress. Finished books are
+# stored at their full page count (0 when unknown) and marked finished.
+SHELF_PROGRESS = {
+    "to-read": 0,
+    "currently-reading": 1,
+    "did-not-finish": 1,
+}
+FINISHED_SHELVES = {"read"}
+
+# Column names per export format: title, author, rating, pages, shelf
+SOURCES = {
+    "goodreads": {
+        "title": "Title", "author": "Author", "rating": "My Rating",
+        "pages": "Number of Pages", "shelf": "Exclusive Shelf",
+    },
+    "storygraph": {
+        "title": "Title", "author": "Authors", "rating": "Star Rating",
+        "pages": None, "shelf": "Read Status",
+    },
+}
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file is not a recognised library export."""
+
+
+def detect_source(fieldnames):
+    """Return the SOURCES key whose columns match a CSV header."""
+    header = set(fieldnames or ())
+    for source, columns in SOURCES.items():
+        if {columns["title"], columns["author"], columns["shelf"]} <= header:
+            return source
+    raise ImportFormatError("Unrecognised CSV: expected a Goodreads or StoryGraph export")
+
+
+def _number(value, cast):
+    try:
+        return cast(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_row(row, columns):
+    """
+    Map one export row to a dict of title, author, page_count, page_progress,
+    finished and user_rating, or None if the row has no title or author.
+    """
+    title = (row.get(columns["title"]) or "").strip()[:200]
+    # StoryGraph lists co-authors comma separated; keep the first.
+    author = (row.get(columns["author"]) or "").split(",")[0].strip()[:120]
+    if not title or not author:
+        return None
+
+    page_count = _number(row.get(columns["pages"]), int) if columns["pages"] else None
+    if page_count is not None and page_count <= 0:
+        page_count = None
+
+    shelf = (row.get(columns["shelf"]) or "").strip().lower()
+
+    rating = _number(row.get(columns["rating"]), float)
+    if not rating or not 0 < rating <= 5:
+        rating = None  # Goodreads writes 0 for unrated books
+
+    return {
+        "title": title,
+        "author": author,
+        "page_count": page_count,
+        "page_progress": SHELF_PROGRESS.get(shelf, 0),
+        "finished": shelf in FINISHED_SHELVES,
+        "user_rating": rating,
+    }
+
+
+class Importer:
+    """
+    Runs library imports in a background thread pool. An upload is spooled to
+    disk, then read as a stream and written IMPORT_BATCH_SIZE rows per
+    transaction, with progress recorded on the ImportJob row.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("IMPORT_WORKERS", 2)
+        app.config.setdefault("IMPORT_BATCH_SIZE", 500)
+        app.config.setdefault("IMPORT_MAX_BYTES", 20 * 1024 * 1024)
+        # Run jobs on the request thread (tests, single-connection SQLite).
+        app.config.setdefault("IMPORT_ASYNC", True)
+        app.extensions["importer"] = self
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=current_app.config["IMPORT_WORKERS"],
+                thread_name_prefix="import",
+            )
+        return self._executor
+
+    def spool(self, stream):
+        """
+        Copy an upload to a temporary file and return its path, or None if it
+        exceeds IMPORT_MAX_BYTES.
+        """
+        limit = current_app.config["IMPORT_MAX_BYTES"]
+        fd, path = tempfile.mkstemp(prefix="bookmarkd-import-", suffix=".csv")
+        size = 0
+        with os.fdopen(fd, "wb") as spooled:
+            while size <= limit:
+                chunk = stream.read(64 * 1024)
+                if not chunk:
+                    return path
+                spooled.write(chunk)
+                size += len(chunk)
+        os.unlink(path)
+        return None
+
+    @staticmethod
+    def sniff(path):
+        """Return the export format of a spooled file from its header row."""
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as handle:
+                return detect_source(next(csv.reader(handle), None))
+        except UnicodeDecodeError:
+            raise ImportFormatError("CSV must be UTF-8 encoded")
+
+    def submit(self, job_id, path):
+        """Schedule the import of a spooled file; the file is removed afterwards."""
+        app = current_app._get_current_object()
+        if app.config["IMPORT_ASYNC"]:
+            self._pool().submit(self._run, app, job_id, path)
+        else:
+            self._run(app, job_id, path)
+
+    def _run(self, app, job_id, path):
+        from extensions import db
+        from models import ImportJob
+
+        with app.app_context():
+            job = db.session.get(ImportJob, job_id)
+            try:
+                job.status = "running"
+                db.session.commit()
+                with open(path, newline="", encoding="utf-8-sig") as handle:
+                    self._import(job, csv.DictReader(handle), app.config["IMPORT_BATCH_SIZE"])
+                job.status = "completed"
+            except Exception as exc:
+                logger.exception("Import job %s failed", job_id)
+                db.session.rollback()
+                job = db.session.get(ImportJob, job_id)
+                job.status = "failed"
+                job.error = str(exc)[:255]
+            finally:
+                os.unlink(path)
+            job.finished_at = datetime.utcnow()
+            _publish_job(job)
+            db.session.commit()
+            db.session.remove()
+
+    def _import(self, job, reader, batch_size):
+        from extensions import db, response_cache
+
+        columns = SOURCES[job.source]
+        while True:
+            rows = list(islice(reader, batch_size))
+            if not rows:
+                return
+            parsed = [parse_row(row, columns) for row in rows]
+            entries = [entry for entry in parsed if entry is not None]
+            imported = import_batch(job.user_id, entries)
+
+            job.rows_processed += len(rows)
+            job.books_imported += imported
+            job.rows_skipped += len(rows) - imported
+            db.session.commit()
+            response_cache.invalidate(job.user_id)
+
+
+def import_batch(user_id, entries):
+    """
+    Add one chunk of parsed rows to user_id's library without committing.
+    Books are matched against the catalog by exact title and author in a
+    single query; missing ones are bulk-inserted. Rows already in the user's
+    library (or repeated within the chunk) are skipped.
+
+    Returns the number of library entries created.
+    """
+    from extensions import db
+    from models import Book, UserBook
+    from services.ratings import record_new_ratings
+
+    by_key = {}
+    for entry in entries:
+        by_key.setdefault((entry["title"], entry["author"]), entry)
+    if not by_key:
+        return 0
+
+    titles = {title for title, _ in by_key}
+    catalog = {}
+    for book_id, title, author, page_count in db.session.execute(
+        select(Book.book_id, Book.title, Book.author, Book.page_count).where(Book.title.in_(titles))
+    ):
+        if (title, author) in by_key:
+            catalog.setdefault((title, author), (book_id, page_count))
+
+    missing = [key for key in by_key if key not in catalog]
+    if missing:
+        new_books = [
+            Book(title=title, author=author, page_count=by_key[(title, author)]["page_count"])
+            for title, author in missing
+        ]
+        db.session.add_all(new_books)
+        db.session.flush()
+        for book in new_books:
+            catalog[(book.title, book.author)] = (book.book_id, book.page_count)
+
+    owned = set(db.session.scalars(
+        select(UserBook.book_id).where(
+            UserBook.user_id == user_id,
+            UserBook.book_id.in_([book_id for book_id, _ in catalog.values()]),
+        )
+    ))
+
+    rows = []
+    for key, entry in by_key.items():
+        book_id, page_count = catalog[key]
+        if book_id in owned:
+            continue
+        if entry["finished"]:
+            # StoryGraph exports have no page counts; the finished flag keeps
+            # such books read.
+            progress = page_count or 0
+        else:
+            progress = min(entry["page_progress"], page_count or entry["page_progress"])
+        rows.append({
+            "user_id": user_id,
+            "book_id": book_id,
+            "page_progress": progress,
+            "finished": entry["finished"],
+            # Only read books can be rated
+            "user_rating": entry["user_rating"] if entry["finished"] else None,
+        })
+    if rows:
+        db.session.execute(insert(UserBook), rows)
+        record_new_ratings((row["book_id"], row["user_rating"]) for row in rows)
+    return len(rows)
+
+
+def _publish_job(job):
+    from services.events import publish_on_commit
+
+    publish_on_commit(job.user_id, f"import.{job.status}", {
+        "id": job.job_id,
+        "books_imported": job.books_imported,
+    })
@@ -0,0 +1,155 @@
+import bisect
+import threading
+import time
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram with fixed upper bounds."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """Yield (le, cumulative_count) pairs including +Inf."""
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            yield _format_value(bound), running
+        yield "+Inf", self.count
+
+
+class Metrics:
+    """
+    Per-route request metrics: latency, response size and the number and
+    time of SQL statements each request issued. Rendered in Prometheus text
+    format by render().
+    """
+
+    HISTOGRAMS = {
+        "bookmarkd_http_request_duration_seconds": ("Request latency.", LATENCY_BUCKETS),
+        "bookmarkd_http_response_size_bytes": ("Response body size.", SIZE_BUCKETS),
+        "bookmarkd_sql_queries_per_request": ("SQL statements issued per request.", QUERY_COUNT_BUCKETS),
+        "bookmarkd_sql_duration_seconds_per_request": ("Time spent in SQL per request.", LATENCY_BUCKETS),
+    }
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in self.HISTOGRAMS}
+        self._requests_total = {}
+        self._engine_hooked = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.extensions["metrics"] = self
+        if not app.config["METRICS_ENABLED"]:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._record_request)
+
+        if not self._engine_hooked:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            self._engine_hooked = True
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {name: {} for name in self.HISTOGRAMS}
+            self._requests_total = {}
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def _start_request(self):
+        g._metrics_start = time.perf_counter()
+        g._sql_count = 0
+        g._sql_time = 0.0
+
+    def _record_request(self, response):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return response
+
+        rule = request.url_rule.rule if request.url_rule else "unmatched"
+        labels = (("route", rule), ("method", request.method))
+        self.observe("bookmarkd_http_request_duration_seconds", labels, time.perf_counter() - start)
+        self.observe("bookmarkd_sql_queries_per_request", labels, g.pop("_sql_count", 0))
+        self.observe("bookmarkd_sql_duration_seconds_per_request", labels, g.pop("_sql_time", 0.0))
+        # Streaming responses have no length up front.
+        if not response.is_streamed:
+            self.observe("bookmarkd_http_response_size_bytes", labels, response.calculate_content_length() or 0)
+
+        counter_labels = labels + (("status", str(response.status_code)),)
+        with self._lock:
+            self._requests_total[counter_labels] = self._requests_total.get(counter_labels, 0) + 1
+        return response
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP bookmarkd_http_requests_total Requests served.",
+            "# TYPE bookmarkd_http_requests_total counter",
+        ]
+        with self._lock:
+            for labels, value in sorted(self._requests_total.items()):
+                lines.append(f"bookmarkd_http_requests_total{_format_labels(labels)} {value}")
+
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    for le, count in histogram.samples():
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_query_start")
+    if not stack:
+        return
+    started = stack.pop()
+    # Statements outside a request (startup, seeding, CLI) are not attributed.
+    if has_app_context() and "_sql_count" in g:
+        g._sql_count += 1
+        g._sql_time += time.perf_counter() - started
+
+
+def _format_labels(labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,169 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import secrets
+import tempfile
+import time
+from datetime import datetime
+
+import click
+from flask import current_app, g, has_app_context, request
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+HEADER = "X-Profile-Token"
+DUMP_HEADER = "X-Profile-Id"
+# Functions listed in a dump's summary, by cumulative time
+SUMMARY_LINES = 40
+
+
+def sign_token(secret, expires):
+    """Header value allowing profiled requests until expires (epoch seconds)."""
+    signature = hmac.new(secret.encode(), f"profile:{expires}".encode(), "sha256").hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_token(secret, token, now=None):
+    expires, _, _ = (token or "").partition(".")
+    if not expires.isdigit() or int(expires) < (now or time.time()):
+        return False
+    return hmac.compare_digest(sign_token(secret, int(expires)), token)
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of single requests (PROFILING_ENABLED). A request
+    carrying a valid X-Profile-Token header, signed with PROFILING_SECRET
+    (default: SECRET_KEY) by `flask profile-token`, runs under cProfile.
+    Its stats and the SQL statements it issued, with their timings, are
+    written to PROFILING_DIR and the dump id is returned in X-Profile-Id.
+    Only the newest PROFILING_MAX_DUMPS dumps are kept.
+
+    When disabled no hooks are installed. Streamed responses are profiled
+    up to the point their body starts streaming.
+    """
+
+    def __init__(self, app=None):
+        self._engine_hooked = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PROFILING_ENABLED", False)
+        app.config.setdefault("PROFILING_SECRET", None)
+        app.config.setdefault("PROFILING_DIR", os.path.join(tempfile.gettempdir(), "bookmarkd-profiles"))
+        app.config.setdefault("PROFILING_MAX_DUMPS", 20)
+        app.extensions["profiler"] = self
+        app.cli.add_command(profile_token_command)
+        if not app.config["PROFILING_ENABLED"]:
+            return
+
+        app.before_request(self._start_profile)
+        app.after_request(self._finish_profile)
+        app.teardown_request(self._abandon_profile)
+        if not self._engine_hooked:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            self._engine_hooked = True
+
+    @staticmethod
+    def secret():
+        config = current_app.config
+        return config["PROFILING_SECRET"] or config["SECRET_KEY"]
+
+    def _start_profile(self):
+        token = request.headers.get(HEADER)
+        if token is None or not verify_token(self.secret(), token):
+            return
+        g._profile_sql = []
+        g._profile_started = time.perf_counter()
+        g._profiler = cProfile.Profile()
+        g._profiler.enable()
+
+    def _finish_profile(self, response):
+        profiler = g.pop("_profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        duration = time.perf_counter() - g.pop("_profile_started")
+        dump_id = self.write_dump(profiler, g.pop("_profile_sql"), {
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "seconds": round(duration, 6),
+        })
+        response.headers[DUMP_HEADER] = dump_id
+        return response
+
+    def _abandon_profile(self, exc):
+        # after_request is skipped when the view raised
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+
+    def write_dump(self, profiler, statements, info):
+        """
+        Write <id>.prof (pstats format, e.g. for `python -m pstats`) and
+        <id>.json (request info, SQL timings and a summary), then prune the
+        oldest dumps beyond PROFILING_MAX_DUMPS. Returns the dump id.
+        """
+        config = current_app.config
+        directory = config["PROFILING_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        dump_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}-{secrets.token_hex(4)}"
+
+        profiler.dump_stats(os.path.join(directory, f"{dump_id}.prof"))
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(SUMMARY_LINES)
+        with open(os.path.join(directory, f"{dump_id}.json"), "w") as f:
+            json.dump({
+                "id": dump_id,
+                **info,
+                "sql": {
+                    "count": len(statements),
+                    "seconds": round(sum(seconds for _, seconds in statements), 6),
+                    "statements": [{"statement": s, "seconds": round(t, 6)} for s, t in statements],
+                },
+                "profile": summary.getvalue(),
+            }, f, indent=2)
+
+        self._prune(directory, config["PROFILING_MAX_DUMPS"])
+        return dump_id
+
+    @staticmethod
+    def _prune(directory, max_dumps):
+        # Dump ids start with their UTC timestamp, so names sort by age
+        dumps = sorted(name[:-len(".json")] for name in os.listdir(directory) if name.endswith(".json"))
+        for dump_id in dumps[:max(len(dumps) - max_dumps, 0)]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(directory, dump_id + suffix))
+                except FileNotFoundError:
+                    pass  # pruned concurrently by another worker
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_profile_query_start")
+    if not stack:
+        return
+    started = stack.pop()
+    if has_app_context() and "_profile_sql" in g:
+        g._profile_sql.append((statement, time.perf_counter() - started))
+
+
+@click.command("profile-token")
+@click.option("--minutes", type=int, default=15, help="How long the token stays valid.")
+@with_appcontext
+def profile_token_command(minutes):
+    """Print an X-Profile-Token header value for profiling requests."""
+    expires = int(time.time()) + minutes * 60
+    click.echo(f"{HEADER}: {sign_token(RequestProfiler.secret(), expires)}")
@@ -0,0 +1,166 @@
+import atexit
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import bindparam
+
+from services.scheduler import PeriodicJob
+
+
+class ProgressBuffer:
+    """
+    Optional write-behind for page progress (PROGRESS_WRITE_BEHIND).
+
+    Progress updates are acknowledged from an in-process buffer holding the
+    latest page per (user, book), so a reader paging through a book turns
+    into one UPDATE per flush instead of a lookup and commit per page. The
+    buffer is written in a single executemany transaction every
+    PROGRESS_FLUSH_SECONDS, as soon as PROGRESS_FLUSH_SIZE entries are
+    pending, when the process exits, and before a user's own reads of
+    their library (see flush(user_id)).
+
+    Book details needed to validate and answer an update are cached per
+    (user, book) for up to PROGRESS_CACHE_SIZE entries. Updates buffered in
+    the last flush interval are lost if the process is killed, so keep
+    PROGRESS_FLUSH_SECONDS short, and below REPLICA_STICKY_SECONDS when a
+    replica is configured.
+
+    Reads only see buffered progress from the process that buffered it, so
+    write-behind needs a single server process; gunicorn.conf.py refuses to
+    start more than one worker with it enabled.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        # Held from taking entries through the commit, so an older value can
+        # never be committed after a newer one by an overlapping flush
+        self._flush_lock = threading.Lock()
+        self._job = None
+        self._job_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PROGRESS_WRITE_BEHIND", False)
+        app.config.setdefault("PROGRESS_FLUSH_SECONDS", 2)
+        app.config.setdefault("PROGRESS_FLUSH_SIZE", 500)
+        app.config.setdefault("PROGRESS_CACHE_SIZE", 10000)
+        self._pending = {}
+        self._books = OrderedDict()
+        self.stats = {"updates": 0, "flushes": 0, "rows_written": 0}
+        app.extensions["progress_buffer"] = self
+        if app.config["PROGRESS_WRITE_BEHIND"]:
+            atexit.register(self._flush_at_exit, app)
+
+    @property
+    def enabled(self):
+        return current_app.config["PROGRESS_WRITE_BEHIND"]
+
+    def cached_book(self, user_id, book_id):
+        """The cached details of a library entry, or None."""
+        with self._lock:
+            book_data = self._books.get((int(user_id), book_id))
+            if book_data is not None:
+                self._books.move_to_end((int(user_id), book_id))
+            return book_data
+
+    def cache_book(self, user_id, book_id, book_data):
+        with self._lock:
+            self._books[(int(user_id), book_id)] = book_data
+            while len(self._books) > current_app.config["PROGRESS_CACHE_SIZE"]:
+                self._books.popitem(last=False)
+
+    def put(self, user_id, book_id, page_progress):
+        """Buffer page_progress as the latest value for (user_id, book_id)."""
+        self._ensure_flusher()
+        with self._lock:
+            self._pending.setdefault(int(user_id), {})[book_id] = page_progress
+            self.stats["updates"] += 1
+            pending = sum(len(books) for books in self._pending.values())
+        if pending >= current_app.config["PROGRESS_FLUSH_SIZE"]:
+            self.flush()
+
+    def pending(self, user_id=None):
+        """Buffered {book_id: page_progress} for user_id, or the total count."""
+        with self._lock:
+            if user_id is not None:
+                return dict(self._pending.get(int(user_id), {}))
+            return sum(len(books) for books in self._pending.values())
+
+    def discard(self, user_id, book_id):
+        """Forget buffered progress and cached details for a removed entry."""
+        with self._lock:
+            self._pending.get(int(user_id), {}).pop(book_id, None)
+            self._books.pop((int(user_id), book_id), None)
+
+    def flush(self, user_id=None):
+        """
+        Write buffered progress (all of it, or only user_id's) and commit.
+        Returns the number of rows written; nothing is queried when the
+        buffer is empty. Flushes (periodic, size-triggered and per user) run
+        one at a time.
+        """
+        with self._flush_lock:
+            return self._flush(user_id)
+
+    def _flush(self, user_id):
+        from extensions import db
+        from models import UserBook
+
+        with self._lock:
+            if user_id is None:
+                taken, self._pending = self._pending, {}
+            else:
+                books = self._pending.pop(int(user_id), None)
+                taken = {int(user_id): books} if books else {}
+        params = [
+            {"b_user_id": uid, "b_book_id": book_id, "b_progress": progress}
+            for uid, books in taken.items()
+            for book_id, progress in books.items()
+        ]
+        if not params:
+            return 0
+
+        table = UserBook.__table__
+        statement = (
+            table.update()
+            .where(table.c.user_id == bindparam("b_user_id"), table.c.book_id == bindparam("b_book_id"))
+            .values(page_progress=bindparam("b_progress"), finished=False, version=table.c.version + 1)
+        )
+        try:
+            db.session.execute(statement, params)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self._restore(taken)
+            raise
+        with self._lock:
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += len(params)
+        return len(params)
+
+    def _restore(self, taken):
+        """Put back entries of a failed flush that were not superseded since."""
+        with self._lock:
+            for uid, books in taken.items():
+                current = self._pending.setdefault(uid, {})
+                for book_id, progress in books.items():
+                    current.setdefault(book_id, progress)
+
+    def _ensure_flusher(self):
+        # Buffers are per process, so each (forked) worker runs its own timer.
+        if self._job_pid == os.getpid():
+            return
+        self._job_pid = os.getpid()
+        self._job = PeriodicJob("progress-flush", self.flush)
+        self._job.start(current_app._get_current_object(), current_app.config["PROGRESS_FLUSH_SECONDS"])
+
+    def _flush_at_exit(self, app):
+        with app.app_context():
+            self.flush()
+
+    def stop(self):
+        if self._job is not None:
+            self._job.stop()
@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.utils import import_string
+
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+def parse_limit(spec):
+    """Parse '10/minute' or '10 per minute' into (limit, window_seconds)."""
+    normalized = spec.replace(" per ", "/").replace(" ", "")
+    try:
+        count, period = normalized.split("/", 1)
+        limit = int(count)
+        window = _PERIODS[period.rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit '{spec}'")
+    if limit <= 0:
+        raise ValueError(f"Invalid rate limit '{spec}'")
+    return limit, window
+
+
+class RateLimitBackend:
+    """
+    Storage interface for rate limit state. A shared backend (e.g. Redis) can
+    implement this to enforce limits across worker processes.
+    """
+
+    def hit(self, key, limit, window):
+        """
+        Consume one request for key.
+        Returns (allowed, remaining, retry_after_seconds).
+        """
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    In-process token buckets. Each key costs a fixed two floats, and the
+    least recently used keys are evicted once max_keys is reached, so memory
+    stays bounded however many clients show up.
+    """
+
+    def __init__(self, max_keys=10000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        rate = limit / window
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(limit)
+            else:
+                tokens, last = bucket
+                tokens = min(float(limit), tokens + (now - last) * rate)
+                self._buckets.move_to_end(key)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        retry_after = 0 if allowed else math.ceil((1 - tokens) / rate)
+        return allowed, int(tokens), retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """
+    Per-route request throttling keyed by user id (for authenticated routes)
+    or client IP. Limits are declared with @limit and can be overridden per
+    endpoint through RATELIMIT_LIMITS, e.g. {'auth.login': '5/minute'}.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RATELIMIT_ENABLED", True)
+        app.config.setdefault("RATELIMIT_LIMITS", {})
+        app.config.setdefault("RATELIMIT_MAX_KEYS", 10000)
+        app.config.setdefault("RATELIMIT_BACKEND", None)
+
+        backend_path = app.config["RATELIMIT_BACKEND"]
+        if backend_path:
+            backend = import_string(backend_path)()
+        else:
+            backend = MemoryBackend(max_keys=app.config["RATELIMIT_MAX_KEYS"])
+        app.extensions["rate_limiter"] = backend
+
+        # Fail at startup rather than on the first throttled request.
+        for spec in app.config["RATELIMIT_LIMITS"].values():
+            parse_limit(spec)
+
+    @property
+    def backend(self):
+        return current_app.extensions["rate_limiter"]
+
+    def limit(self, default):
+        """Throttle the decorated view; place it below @jwt_required()."""
+        parse_limit(default)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not current_app.config["RATELIMIT_ENABLED"]:
+                    return view(*args, **kwargs)
+
+                endpoint = request.endpoint
+                spec = current_app.config["RATELIMIT_LIMITS"].get(endpoint, default)
+                limit, window = parse_limit(spec)
+                key = f"{endpoint}:{_client_key()}"
+
+                allowed, remaining, retry_after = self.backend.hit(key, limit, window)
+                if not allowed:
+                    response = jsonify({"error": "Too many requests, please try again later"})
+                    response.status_code = 429
+                    response.headers["Retry-After"] = str(retry_after)
+                    response.headers["X-RateLimit-Limit"] = str(limit)
+                    response.headers["X-RateLimit-Remaining"] = "0"
+                    return response
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def _client_key():
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+    if identity is not None:
+        return f"user:{identity}"
+    return f"ip:{request.remote_addr}"
@@ -0,0 +1,175 @@
+from collections import defaultdict
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import and_, bindparam, case, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Histogram buckets are whole stars: 4.5 counts towards bucket 4.
+BUCKETS = range(6)
+# Stored sums are floats; drift below this is not reported by verify.
+_SUM_TOLERANCE = 1e-6
+
+
+def rating_bucket(rating):
+    return min(int(rating), BUCKETS[-1])
+
+
+def _hist_column(table, bucket):
+    return table.c[f"rating_hist_{bucket}"]
+
+
+def record_rating_change(book_id, old_rating, new_rating, book=None):
+    """
+    Apply one user's rating change (None meaning unrated) to the book's
+    aggregates with a single relative UPDATE in the current transaction, so
+    concurrent raters cannot overwrite each other's increments. A loaded
+    `book` is updated in memory too, without reloading it.
+    """
+    from extensions import db
+    from models import Book
+
+    if old_rating == new_rating:
+        return
+    deltas = {
+        "rating_sum": (new_rating or 0.0) - (old_rating or 0.0),
+        "rating_count": int(new_rating is not None) - int(old_rating is not None),
+    }
+    if old_rating is not None:
+        deltas[f"rating_hist_{rating_bucket(old_rating)}"] = -1
+    if new_rating is not None:
+        name = f"rating_hist_{rating_bucket(new_rating)}"
+        deltas[name] = deltas.get(name, 0) + 1
+
+    db.session.execute(
+        update(Book)
+        .where(Book.book_id == book_id)
+        .values(**{name: getattr(Book, name) + delta for name, delta in deltas.items()}),
+        execution_options={"synchronize_session": False},
+    )
+    if book is not None:
+        for name, delta in deltas.items():
+            set_committed_value(book, name, (getattr(book, name) or 0) + delta)
+
+
+def record_new_ratings(ratings):
+    """
+    Add many first-time ratings, given as (book_id, rating) pairs, using one
+    executemany UPDATE per histogram bucket.
+    """
+    from extensions import db
+    from models import Book
+
+    by_bucket = defaultdict(list)
+    for book_id, rating in ratings:
+        if rating is not None:
+            by_bucket[rating_bucket(rating)].append({"b_book_id": book_id, "b_rating": rating})
+
+    table = Book.__table__
+    for bucket, params in by_bucket.items():
+        column = _hist_column(table, bucket)
+        statement = table.update().where(table.c.book_id == bindparam("b_book_id")).values({
+            "rating_sum": table.c.rating_sum + bindparam("b_rating"),
+            "rating_count": table.c.rating_count + 1,
+            column.name: column + 1,
+        })
+        db.session.execute(statement, params)
+
+
+def rating_summary(book):
+    """The community rating fields included in book responses."""
+    count = book.rating_count or 0
+    return {
+        "average": round(book.rating_sum / count, 2) if count else None,
+        "count": count,
+        "histogram": [getattr(book, f"rating_hist_{bucket}") or 0 for bucket in BUCKETS],
+    }
+
+
+def _actual_aggregates(book_ids):
+    """Recompute aggregates for book_ids from user_book."""
+    from extensions import db
+    from models import UserBook
+
+    rating = UserBook.user_rating
+    bucket_counts = []
+    for bucket in BUCKETS:
+        in_bucket = rating >= bucket if bucket == BUCKETS[-1] else and_(rating >= bucket, rating < bucket + 1)
+        bucket_counts.append(func.sum(case((in_bucket, 1), else_=0)))
+
+    rows = db.session.execute(
+        select(UserBook.book_id, func.sum(rating), func.count(rating), *bucket_counts)
+        .where(UserBook.book_id.in_(book_ids), rating.isnot(None))
+        .group_by(UserBook.book_id)
+    )
+    return {row[0]: (float(row[1]), row[2], [int(n) for n in row[3:]]) for row in rows}
+
+
+def rebuild_rating_aggregates(batch_size=500, verify_only=False):
+    """
+    Compare every book's stored aggregates with user_book, one window of
+    batch_size books per transaction, and fix the ones that drifted unless
+    verify_only is set.
+
+    Returns a report dict: checked, mismatched, fixed.
+    """
+    from extensions import db
+    from models import Book
+
+    report = {"checked": 0, "mismatched": 0, "fixed": 0}
+    hist_columns = [getattr(Book, f"rating_hist_{bucket}") for bucket in BUCKETS]
+    last_id = 0
+    while True:
+        window = (
+            select(Book.book_id, Book.rating_sum, Book.rating_count, *hist_columns)
+            .where(Book.book_id > last_id)
+            .order_by(Book.book_id)
+            .limit(batch_size)
+        )
+        if not verify_only:
+            # Hold concurrent rating changes on these books until the fix commits.
+            window = window.with_for_update()
+        stored = db.session.execute(window).all()
+        if not stored:
+            break
+        last_id = stored[-1][0]
+        actual = _actual_aggregates([row[0] for row in stored])
+
+        fixes = []
+        for book_id, rating_sum, rating_count, *histogram in stored:
+            expected_sum, expected_count, expected_hist = actual.get(book_id, (0.0, 0, [0] * len(BUCKETS)))
+            if (abs(rating_sum - expected_sum) > _SUM_TOLERANCE or rating_count != expected_count
+                    or histogram != expected_hist):
+                fixes.append({
+                    "b_book_id": book_id,
+                    "rating_sum": expected_sum,
+                    "rating_count": expected_count,
+                    **{f"rating_hist_{bucket}": n for bucket, n in zip(BUCKETS, expected_hist)},
+                })
+
+        report["checked"] += len(stored)
+        report["mismatched"] += len(fixes)
+        if fixes and not verify_only:
+            table = Book.__table__
+            db.session.execute(
+                table.update().where(table.c.book_id == bindparam("b_book_id")),
+                fixes,
+            )
+            report["fixed"] += len(fixes)
+        db.session.commit()
+    return report
+
+
+@click.command("rebuild-ratings")
+@click.option("--verify", is_flag=True, help="Only report drift; exit 1 if any is found.")
+@click.option("--batch-size", type=int, default=500, help="Books checked per transaction.")
+@with_appcontext
+def rebuild_ratings_command(verify, batch_size):
+    """Rebuild (or verify) the per-book rating aggregates from user ratings."""
+    report = rebuild_rating_aggregates(batch_size=batch_size, verify_only=verify)
+    click.echo(
+        f"Checked {report['checked']} books: {report['mismatched']} out of date, "
+        f"{report['fixed']} fixed"
+    )
+    if verify and report["mismatched"]:
+        raise SystemExit(1)
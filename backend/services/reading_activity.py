@@ -0,0 +1,170 @@
+from datetime import date, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from models.reading_activity import DAYS_BYTES
+
+
+def day_index(day):
+    """Bit position of day within its year's bitmap."""
+    return day.timetuple().tm_yday - 1
+
+
+def _days_in_year(year):
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days
+
+
+def _to_bits(days):
+    return int.from_bytes(days, "little")
+
+
+def _to_bytes(bits):
+    return bits.to_bytes(DAYS_BYTES, "little")
+
+
+def _locked_row(user_id, year):
+    from extensions import db
+    from models import ReadingActivity
+
+    return db.session.execute(
+        select(ReadingActivity)
+        .where(ReadingActivity.user_id == user_id, ReadingActivity.year == year)
+        .with_for_update()
+    ).scalar_one_or_none()
+
+
+def record_activity(user_id, first_day, last_day):
+    """
+    Set the bits for first_day..last_day (inclusive) in user_id's yearly
+    bitmaps, in the current transaction; one row per year spanned.
+    """
+    from extensions import db
+    from models import ReadingActivity
+
+    for year in range(first_day.year, last_day.year + 1):
+        start = day_index(max(first_day, date(year, 1, 1)))
+        end = day_index(min(last_day, date(year, 12, 31)))
+        # Bits start..end set
+        mask = ((1 << (end - start + 1)) - 1) << start
+
+        row = _locked_row(user_id, year)
+        if row is None:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(ReadingActivity(user_id=user_id, year=year, days=_to_bytes(mask)))
+                continue
+            except IntegrityError:
+                # A concurrent first session of the year created the row
+                row = _locked_row(user_id, year)
+        if _to_bits(row.days) | mask != _to_bits(row.days):
+            row.days = _to_bytes(_to_bits(row.days) | mask)
+
+
+def add_goal_hours(user_id, hours):
+    """
+    Add hours to the progress of user_id's unfinished hour goals, in one
+    UPDATE in the current transaction. Returns the goals that changed.
+    """
+    from extensions import db
+    from models import HourGoal
+
+    unfinished = [
+        HourGoal.user_id == user_id,
+        (HourGoal.num_hours.is_(None)) | (HourGoal.progress < HourGoal.num_hours),
+    ]
+    changed = db.session.scalars(select(HourGoal.goal_id).where(*unfinished)).all() if hours else []
+    if not changed:
+        return []
+    db.session.execute(
+        update(HourGoal)
+        .where(HourGoal.goal_id.in_(changed))
+        .values(progress=HourGoal.progress + hours, version=HourGoal.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.scalars(
+        select(HourGoal).where(HourGoal.goal_id.in_(changed)).execution_options(populate_existing=True)
+    ).all()
+
+
+def load_history(user_id, until_year):
+    """
+    All of user_id's bitmaps up to until_year joined into one integer, bit 0
+    being January 1 of the first year with activity, with years that have no
+    row filled in as empty. Returns (bits, first_day); first_day is None
+    without any activity.
+    """
+    from extensions import db
+    from models import ReadingActivity
+
+    rows = db.session.execute(
+        select(ReadingActivity.year, ReadingActivity.days)
+        .where(ReadingActivity.user_id == user_id, ReadingActivity.year <= until_year)
+        .order_by(ReadingActivity.year)
+    ).all()
+    if not rows:
+        return 0, None
+
+    by_year = dict(rows)
+    bits, offset = 0, 0
+    for year in range(rows[0].year, until_year + 1):
+        if year in by_year:
+            bits |= _to_bits(by_year[year]) << offset
+        offset += _days_in_year(year)
+    return bits, date(rows[0].year, 1, 1)
+
+
+def trailing_run(bits, position):
+    """Length of the run of set bits ending at position (0 if it is unset)."""
+    below = ~bits & ((1 << (position + 1)) - 1)
+    return position + 1 - below.bit_length()
+
+
+def longest_run(bits):
+    """Length of the longest run of set bits: each x & (x >> 1) shortens every run by one."""
+    length = 0
+    while bits:
+        bits &= bits >> 1
+        length += 1
+    return length
+
+
+def streaks(user_id, today):
+    """
+    current (consecutive days up to today, or up to yesterday if the user
+    has not read yet today), longest, active_days and last_active.
+    """
+    bits, first_day = load_history(user_id, today.year)
+    if first_day is None:
+        return {"current": 0, "longest": 0, "active_days": 0, "last_active": None}
+
+    position = (today - first_day).days
+    bits &= (1 << (position + 1)) - 1  # Ignore days after today
+    current = trailing_run(bits, position)
+    if current == 0 and position > 0:
+        current = trailing_run(bits, position - 1)
+    return {
+        "current": current,
+        "longest": longest_run(bits),
+        "active_days": bits.bit_count(),
+        "last_active": (first_day + timedelta(days=bits.bit_length() - 1)).isoformat() if bits else None,
+    }
+
+
+def active_days(user_id, year):
+    """The dates in year on which user_id read, in order."""
+    from extensions import db
+    from models import ReadingActivity
+
+    days = db.session.scalar(
+        select(ReadingActivity.days)
+        .where(ReadingActivity.user_id == user_id, ReadingActivity.year == year)
+    )
+    bits = _to_bits(days) if days else 0
+    first = date(year, 1, 1)
+    result = []
+    while bits:
+        lowest = bits & -bits
+        result.append(first + timedelta(days=lowest.bit_length() - 1))
+        bits ^= lowest
+    return result
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeSerializer
+
+REPLICA_BIND_KEY = "replica"
+_USE_REPLICA = "use_replica"
+# Signed {user, until} of the caller's last write, readable by every worker
+STICKY_COOKIE = "replica_sticky"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the 'replica' bind while a request is marked
+    read-only. Flushes and DML always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(_USE_REPLICA) and not self._flushing:
+            if not isinstance(clause, sa.sql.dml.UpdateBase):
+                engine = self._db.engines.get(REPLICA_BIND_KEY)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """
+    Routes @read_only endpoints to the replica bind (SQLALCHEMY_BINDS['replica'])
+    when one is configured. After a user's own mutation, that user's reads stay
+    on the primary for REPLICA_STICKY_SECONDS so they never see stale data
+    because of replication lag.
+
+    The deadline is kept in this process and sent back in a signed cookie, so
+    a read served by another worker stays on the primary too. Clients without
+    a cookie jar only get the guarantee from the worker that took the write.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._recent_writes = OrderedDict()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("REPLICA_STICKY_SECONDS", 5)
+        app.config.setdefault("REPLICA_STICKY_MAX_USERS", 10000)
+        app.extensions["replica_router"] = self
+        app.after_request(self._after_request)
+
+    def mark_write(self, user_id):
+        """Pin user_id's reads to the primary for the sticky window."""
+        config = current_app.config
+        with self._lock:
+            self._recent_writes[str(user_id)] = time.monotonic() + config["REPLICA_STICKY_SECONDS"]
+            self._recent_writes.move_to_end(str(user_id))
+            while len(self._recent_writes) > config["REPLICA_STICKY_MAX_USERS"]:
+                self._recent_writes.popitem(last=False)
+        # Written to the response by _after_request
+        g.replica_sticky_user = str(user_id)
+
+    def is_sticky(self, user_id):
+        if self._cookie_is_sticky(user_id):
+            return True
+        with self._lock:
+            expires = self._recent_writes.get(str(user_id))
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._recent_writes[str(user_id)]
+                return False
+            return True
+
+    def _cookie_is_sticky(self, user_id):
+        value = request.cookies.get(STICKY_COOKIE)
+        if not value:
+            return False
+        try:
+            data = _serializer().loads(value)
+        except BadSignature:
+            return False
+        return data.get("user") == str(user_id) and data.get("until", 0) > time.time()
+
+    def read_only(self, view):
+        """Serve the decorated view from the replica; place it below @jwt_required()."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from extensions import db
+
+            user_id = _current_identity()
+            if REPLICA_BIND_KEY not in current_app.config.get("SQLALCHEMY_BINDS", {}) \
+                    or (user_id is not None and self.is_sticky(user_id)):
+                return view(*args, **kwargs)
+
+            session = db.session()
+            session.info[_USE_REPLICA] = True
+            try:
+                return view(*args, **kwargs)
+            finally:
+                session.info.pop(_USE_REPLICA, None)
+        return wrapper
+
+    def _after_request(self, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            user_id = _current_identity()
+            if user_id is not None:
+                self.mark_write(user_id)
+        user_id = g.pop("replica_sticky_user", None)
+        if user_id is not None and REPLICA_BIND_KEY in current_app.config.get("SQLALCHEMY_BINDS", {}):
+            seconds = current_app.config["REPLICA_STICKY_SECONDS"]
+            response.set_cookie(
+                STICKY_COOKIE,
+                _serializer().dumps({"user": user_id, "until": time.time() + seconds}),
+                max_age=seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt="replica-sticky")
+
+
+def _current_identity():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
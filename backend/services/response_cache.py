@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.utils import import_string
+
+# Rough per-entry bookkeeping cost counted against the byte budget
+ENTRY_OVERHEAD = 200
+
+
+class ResponseCacheBackend:
+    """
+    Storage interface for cached per-user responses. A shared backend (e.g.
+    Redis, with an INCR'd generation per user) can implement this so workers
+    see each other's invalidations.
+    """
+
+    def generation(self, user_id):
+        """A token that changes whenever user_id's responses are invalidated."""
+        raise NotImplementedError
+
+    def get(self, user_id, key):
+        """The stored (body, mimetype) for key, or None."""
+        raise NotImplementedError
+
+    def set(self, user_id, key, value, generation):
+        """Store value unless user_id was invalidated since generation was read."""
+        raise NotImplementedError
+
+    def invalidate(self, user_id):
+        """Drop all of user_id's responses."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Counters for metrics: hits, misses, evictions, invalidations, entries, bytes."""
+        raise NotImplementedError
+
+
+class MemoryBackend(ResponseCacheBackend):
+    """
+    In-process LRU cache bounded by max_bytes of response bodies (plus a
+    fixed per-entry overhead); least recently used entries are evicted to
+    make room, and bodies larger than a tenth of the budget are not stored.
+    Entries also expire ttl seconds after they were stored.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=300, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._generations = {}
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id, key):
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is not None and entry[1] <= self._clock():
+                self._remove((user_id, key))
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self._counters["hits"] += 1
+            return entry[0]
+
+    def set(self, user_id, key, value, generation):
+        size = len(value[0]) + len(key) + ENTRY_OVERHEAD
+        if size > self.max_bytes // 10:
+            return
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._remove((user_id, key))
+            self._entries[(user_id, key)] = (value, self._clock() + self.ttl, size)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._remove((user_id, key), forget_key=False)
+            self._counters["invalidations"] += 1
+
+    def _remove(self, entry_key, forget_key=True):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[2]
+        if forget_key:
+            user_id, key = entry_key
+            keys = self._keys_by_user.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[user_id]
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "bytes": self._bytes}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Caches the serialized responses of per-user read endpoints
+    (RESPONSE_CACHE_ENABLED). Views marked @invalidates drop the user's
+    cached responses once they succeed, and a response computed while the
+    user was being invalidated is not stored, so users always read their
+    own writes from the process that served them.
+
+    With the in-memory backend each worker process has its own cache and
+    does not see other workers' invalidations (nor other users' rating
+    changes in community_rating) for up to RESPONSE_CACHE_TTL_SECONDS; set
+    RESPONSE_CACHE_BACKEND to a shared implementation when running several
+    workers.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RESPONSE_CACHE_ENABLED", False)
+        app.config.setdefault("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+        app.config.setdefault("RESPONSE_CACHE_TTL_SECONDS", 300)
+        app.config.setdefault("RESPONSE_CACHE_BACKEND", None)
+
+        backend_path = app.config["RESPONSE_CACHE_BACKEND"]
+        if backend_path:
+            backend = import_string(backend_path)()
+        else:
+            backend = MemoryBackend(
+                max_bytes=app.config["RESPONSE_CACHE_MAX_BYTES"],
+                ttl=app.config["RESPONSE_CACHE_TTL_SECONDS"],
+            )
+        app.extensions["response_cache"] = backend
+
+    @property
+    def backend(self):
+        return current_app.extensions["response_cache"]
+
+    def cached(self, view):
+        """Serve the decorated view from the cache; place it below @jwt_required()."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config["RESPONSE_CACHE_ENABLED"]:
+                return view(*args, **kwargs)
+
+            user_id = str(get_jwt_identity())
+            key = f"{request.endpoint}?{_canonical_query()}"
+            stored = self.backend.get(user_id, key)
+            if stored is not None:
+                body, mimetype = stored
+                response = current_app.response_class(body, mimetype=mimetype)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            generation = self.backend.generation(user_id)
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                self.backend.set(user_id, key, (response.get_data(), response.mimetype), generation)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+
+    def invalidates(self, view):
+        """Invalidate the user's cached responses after the decorated view succeeds."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code < 400:
+                self.invalidate(get_jwt_identity())
+            return response
+        return wrapper
+
+    def invalidate(self, user_id):
+        self.backend.invalidate(str(user_id))
+
+    def render_metrics(self):
+        """Cache counters and hit ratio in the Prometheus text format."""
+        stats = self.backend.stats()
+        lookups = stats["hits"] + stats["misses"]
+        lines = []
+        for name in ("hits", "misses", "evictions", "invalidations"):
+            lines += [
+                f"# TYPE bookmarkd_response_cache_{name}_total counter",
+                f"bookmarkd_response_cache_{name}_total {stats[name]}",
+            ]
+        for name, value in (("entries", stats["entries"]), ("bytes", stats["bytes"]),
+                            ("hit_ratio", round(stats["hits"] / lookups, 6) if lookups else 0)):
+            lines += [
+                f"# TYPE bookmarkd_response_cache_{name} gauge",
+                f"bookmarkd_response_cache_{name} {value}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _canonical_query():
+    return "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
@@ -0,0 +1,178 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from services.scheduler import PeriodicJob
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives. Sized for `capacity`
+    items at `error_rate` false positives; items cannot be removed, so the
+    owner rebuilds it when compacting.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationStore:
+    """
+    Revoked JWT ids (jti). Lookups go through a Bloom filter first, so the
+    common case of a token that was never revoked costs a few hashes and no
+    I/O; Bloom hits are confirmed against an exact jti -> expiry map.
+
+    Revocations are persisted in revoked_token. Each process picks up other
+    processes' revocations on a background thread that polls for recent rows
+    every REVOCATION_SYNC_SECONDS (0 disables polling for single-process
+    setups), so token checks never touch the database. The same thread
+    compacts away entries whose token has expired, from memory and the
+    table, every REVOCATION_COMPACT_SECONDS. gunicorn.conf.py calls start()
+    in each worker to load the table before serving; otherwise the thread
+    starts on the process's first token check.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._job = None
+        self._job_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("REVOCATION_SYNC_SECONDS", 5)
+        app.config.setdefault("REVOCATION_COMPACT_SECONDS", 300)
+        app.config.setdefault("REVOCATION_BLOOM_CAPACITY", 100000)
+        app.config.setdefault("REVOCATION_SYNC_OVERLAP_SECONDS", 60)
+        self._capacity = app.config["REVOCATION_BLOOM_CAPACITY"]
+        self._bloom = BloomFilter(self._capacity)
+        self._revoked = {}
+        self._synced_at = None
+        self._next_compact = time.monotonic() + app.config["REVOCATION_COMPACT_SECONDS"]
+        if self._job is not None:
+            self._job.stop()
+        self._job = self._job_pid = None
+        app.extensions["revocation_store"] = self
+
+        from extensions import jwt
+        jwt.token_in_blocklist_loader(self._is_revoked_callback)
+
+    def _is_revoked_callback(self, jwt_header, jwt_payload):
+        return self.is_revoked(jwt_payload["jti"])
+
+    def is_revoked(self, jti):
+        if self._job_pid != os.getpid() and current_app.config["REVOCATION_SYNC_SECONDS"]:
+            self._start_syncer(current_app._get_current_object(), run_immediately=True)
+        if jti not in self._bloom:
+            return False
+        expires = self._revoked.get(jti, 0)
+        return expires is None or expires > time.time()
+
+    def revoke(self, jti, expires):
+        """
+        Revoke jti until expires (epoch seconds, or None for never) and
+        persist it in the current transaction; the caller commits.
+        """
+        from extensions import db
+        from models import RevokedToken
+
+        expires_at = datetime.fromtimestamp(expires, timezone.utc).replace(tzinfo=None) if expires else None
+        db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+        self._remember(jti, expires)
+
+    def _remember(self, jti, expires):
+        with self._lock:
+            self._revoked[jti] = expires
+            self._bloom.add(jti)
+
+    def start(self, app):
+        """
+        Load the persisted revocations, then keep syncing in the background.
+        Call in each serving process, after forking and once the schema exists.
+        """
+        if not app.config["REVOCATION_SYNC_SECONDS"]:
+            return
+        with app.app_context():
+            self.sync()
+        self._start_syncer(app, run_immediately=False)
+
+    def _start_syncer(self, app, run_immediately):
+        # The revocation list is per process, so each (forked) worker runs its own thread.
+        with self._lock:
+            if self._job_pid == os.getpid():
+                return
+            self._job_pid = os.getpid()
+            self._job = PeriodicJob("revocation-sync", self._sync_and_compact, run_immediately=run_immediately)
+        self._job.start(app, app.config["REVOCATION_SYNC_SECONDS"])
+
+    def _sync_and_compact(self):
+        self.sync()
+        now = time.monotonic()
+        if now >= self._next_compact:
+            self._next_compact = now + current_app.config["REVOCATION_COMPACT_SECONDS"]
+            self.compact()
+
+    def sync(self):
+        """
+        Load revocations persisted since the last sync, by any process.
+
+        Concurrent logouts commit in any order, so neither ids nor revoked_at
+        times arrive in sequence: each sync re-reads the rows revoked within
+        REVOCATION_SYNC_OVERLAP_SECONDS before the previous one started.
+        """
+        from extensions import db
+        from models import RevokedToken
+
+        started = datetime.utcnow()
+        query = select(RevokedToken.jti, RevokedToken.expires_at)
+        if self._synced_at is not None:
+            overlap = timedelta(seconds=current_app.config["REVOCATION_SYNC_OVERLAP_SECONDS"])
+            query = query.where(RevokedToken.revoked_at >= self._synced_at - overlap)
+        for jti, expires_at in db.session.execute(query):
+            if jti not in self._revoked:
+                expires = expires_at.replace(tzinfo=timezone.utc).timestamp() if expires_at else None
+                self._remember(jti, expires)
+        self._synced_at = started
+
+    def compact(self):
+        """Drop expired revocations and rebuild the Bloom filter from the rest."""
+        from extensions import db
+        from models import RevokedToken
+
+        now = time.time()
+        with self._lock:
+            self._revoked = {
+                jti: expires for jti, expires in self._revoked.items()
+                if expires is None or expires > now
+            }
+            bloom = BloomFilter(max(self._capacity, len(self._revoked)))
+            for jti in self._revoked:
+                bloom.add(jti)
+            self._bloom = bloom
+
+        with db.engine.begin() as conn:
+            conn.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+
+    def __len__(self):
+        return len(self._revoked)
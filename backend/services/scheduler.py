@@ -0,0 +1,73 @@
+import fcntl
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Lock files held by this process, kept open for its lifetime
+_held_locks = {}
+
+
+def acquire_lock(path):
+    """
+    Take an exclusive, non-blocking lock on path for the rest of this
+    process's life. True if this process holds it; the lock is released
+    when the process exits, so another process can take over.
+    """
+    if path in _held_locks:
+        return True
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _held_locks[path] = lock_file
+    return True
+
+
+class PeriodicJob:
+    """
+    Runs job() inside an app context every interval seconds on a daemon
+    thread. Errors are logged and the session is cleaned up after each run.
+
+    Start jobs once the schema exists and in a single process (see
+    app.start_background_jobs); never in a process that will fork.
+    """
+
+    def __init__(self, name, job, run_immediately=False):
+        self.name = name
+        self.job = job
+        self.run_immediately = run_immediately
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, app, interval):
+        if self._thread is not None or interval <= 0:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(app, interval), name=self.name, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, app, interval):
+        from extensions import db
+
+        if self.run_immediately:
+            self._run_once(app, db)
+        while not self._stop.wait(interval):
+            self._run_once(app, db)
+
+    def _run_once(self, app, db):
+        with app.app_context():
+            try:
+                result = self.job()
+                logger.info("%s: %s", self.name, result)
+            except Exception:
+                logger.exception("%s failed", self.name)
+                db.session.rollback()
+            finally:
+                db.session.remove()
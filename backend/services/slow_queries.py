@@ -0,0 +1,170 @@
+import json
+import logging
+import threading
+import time
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("bookmarkd.slow_query")
+
+# Per dialect; statements on other databases are logged without a plan
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+}
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+# Logged parameters (SLOW_QUERY_LOG_PARAMETERS) are cut to this many characters
+MAX_PARAMETERS_LENGTH = 500
+
+
+class SlowQueryLog:
+    """
+    Logs every SQL statement slower than SLOW_QUERY_THRESHOLD_MS (0 disables
+    it) as one JSON line on the "bookmarkd.slow_query" logger: statement,
+    parameters, duration, the route that issued it and, for reads, updates
+    and deletes, the database's EXPLAIN (EXPLAIN QUERY PLAN on SQLite).
+    Parameter values can hold password hashes, emails and token ids, so only
+    their count and types are logged unless SLOW_QUERY_LOG_PARAMETERS is set
+    for debugging.
+
+    Slow statements are also aggregated per statement text, for up to
+    SLOW_QUERY_MAX_STATEMENTS statements per process, and reported worst
+    first by summary(); parameters are left out of the summary. The summary
+    is served at GET /api/slow-queries only with SLOW_QUERY_ENDPOINT_ENABLED,
+    to holders of the signed admin token (see services/profiler.py).
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._engine_hooked = False
+        self._threshold = 0.0
+        self._statements = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SLOW_QUERY_THRESHOLD_MS", 0)
+        app.config.setdefault("SLOW_QUERY_EXPLAIN", True)
+        app.config.setdefault("SLOW_QUERY_MAX_STATEMENTS", 200)
+        app.config.setdefault("SLOW_QUERY_ENDPOINT_ENABLED", False)
+        app.config.setdefault("SLOW_QUERY_LOG_PARAMETERS", False)
+        self._threshold = app.config["SLOW_QUERY_THRESHOLD_MS"] / 1000
+        self._explain = app.config["SLOW_QUERY_EXPLAIN"]
+        self._max_statements = app.config["SLOW_QUERY_MAX_STATEMENTS"]
+        self._log_parameters = app.config["SLOW_QUERY_LOG_PARAMETERS"]
+        self._statements = {}
+        app.extensions["slow_queries"] = self
+        if self._threshold and not self._engine_hooked:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._engine_hooked = True
+
+    @property
+    def enabled(self):
+        return self._threshold > 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_slow_query_start")
+        if not stack:
+            return
+        duration = time.perf_counter() - stack.pop()
+        if self._threshold and duration >= self._threshold:
+            self.record(conn, statement, parameters, executemany, duration)
+
+    def record(self, conn, statement, parameters, executemany, duration):
+        route = None
+        if has_request_context():
+            rule = request.url_rule.rule if request.url_rule else request.path
+            route = f"{request.method} {rule}"
+        # executemany batches have no single set of parameters to plan with
+        plan = _explain(conn, statement, parameters) if self._explain and not executemany else None
+
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(duration * 1000, 3),
+            "route": route,
+            "statement": statement,
+            "parameters": (repr(parameters)[:MAX_PARAMETERS_LENGTH] if self._log_parameters
+                           else _describe_parameters(parameters, executemany)),
+            "executemany": executemany,
+            "plan": plan,
+        }))
+
+        with self._lock:
+            entry = self._statements.get(statement)
+            if entry is None:
+                if len(self._statements) >= self._max_statements:
+                    # Make room by forgetting the statement with the least total time
+                    del self._statements[min(self._statements, key=lambda s: self._statements[s]["total_seconds"])]
+                entry = self._statements[statement] = {
+                    "statement": statement, "count": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                    "routes": {}, "plan": None,
+                }
+            entry["count"] += 1
+            entry["total_seconds"] += duration
+            entry["max_seconds"] = max(entry["max_seconds"], duration)
+            route_key = route or "(outside a request)"
+            entry["routes"][route_key] = entry["routes"].get(route_key, 0) + 1
+            if plan is not None:
+                entry["plan"] = plan
+
+    def summary(self, limit=20, sort="total"):
+        """The worst statements by total, max or mean time, or by count."""
+        keys = {
+            "total": lambda e: e["total_seconds"],
+            "max": lambda e: e["max_seconds"],
+            "mean": lambda e: e["total_seconds"] / e["count"],
+            "count": lambda e: e["count"],
+        }
+        with self._lock:
+            entries = sorted(self._statements.values(), key=keys[sort], reverse=True)[:limit]
+            return [{
+                "statement": e["statement"],
+                "count": e["count"],
+                "total_ms": round(e["total_seconds"] * 1000, 3),
+                "max_ms": round(e["max_seconds"] * 1000, 3),
+                "mean_ms": round(e["total_seconds"] * 1000 / e["count"], 3),
+                "routes": dict(e["routes"]),
+                "plan": e["plan"],
+            } for e in entries]
+
+    def reset(self):
+        with self._lock:
+            self._statements = {}
+
+
+def _describe_parameters(parameters, executemany):
+    """The number and types of the parameters, without their values."""
+    def types(values):
+        if isinstance(values, dict):
+            return {name: type(value).__name__ for name, value in values.items()}
+        return [type(value).__name__ for value in values or ()]
+
+    if executemany:
+        return {"rows": len(parameters), "types": types(parameters[0]) if parameters else []}
+    return {"count": len(parameters or ()), "types": types(parameters)}
+
+
+def _explain(conn, statement, parameters):
+    """
+    The plan rows for statement, one string per row. Runs on a raw cursor of
+    the same connection, so it sees the same transaction and does not go
+    through the engine events again.
+    """
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" | ".join(str(value) for value in row) for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        cursor.close()
@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import exists, func, select, union_all
+
+# Score = weighted sum of the overlaps between the user and a candidate
+MUTUAL_WEIGHT = 3
+SHARED_CLUB_WEIGHT = 2
+SHARED_BOOK_WEIGHT = 1
+
+
+class FriendSuggestions:
+    """
+    "People you may know": users followed by the people a user follows,
+    ranked by how many of them do so and by shared books and clubs.
+
+    The two-hop traversal is bounded so its cost does not grow with the
+    graph: only the SUGGESTIONS_FANOUT most recent follows of the user are
+    expanded, each by at most SUGGESTIONS_PER_FOLLOWEE of their own most
+    recent follows, and only the SUGGESTIONS_CANDIDATES most mutual
+    candidates are scored for overlap. Results are cached per user for
+    SUGGESTIONS_TTL_SECONDS (up to SUGGESTIONS_CACHE_SIZE users, least
+    recently used first out); a user's own follows and unfollows drop
+    their entry (and a result computed meanwhile is not stored), other
+    users' changes show up once it expires. Hits, misses and the number of
+    cached users are exported on /api/metrics.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._clock = time.monotonic
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SUGGESTIONS_TTL_SECONDS", 900)
+        app.config.setdefault("SUGGESTIONS_CACHE_SIZE", 10000)
+        app.config.setdefault("SUGGESTIONS_FANOUT", 100)
+        app.config.setdefault("SUGGESTIONS_PER_FOLLOWEE", 50)
+        app.config.setdefault("SUGGESTIONS_CANDIDATES", 200)
+        app.config.setdefault("SUGGESTIONS_MAX", 50)
+        self._cache = OrderedDict()
+        self._generations = {}
+        self.stats = {"hits": 0, "misses": 0}
+        app.extensions["friend_suggestions"] = self
+
+    def for_user(self, user_id, limit=None):
+        """Up to limit (default SUGGESTIONS_MAX) suggestions for user_id, best first."""
+        user_id = int(user_id)
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is not None and entry[1] <= self._clock():
+                del self._cache[user_id]
+                entry = None
+            if entry is not None:
+                self._cache.move_to_end(user_id)
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                generation = self._generations.get(user_id, 0)
+
+        if entry is None:
+            suggestions = self.compute(user_id)
+            with self._lock:
+                # Not stored if the user was invalidated while it was computed
+                if self._generations.get(user_id, 0) == generation:
+                    self._cache[user_id] = (suggestions, self._clock() + current_app.config["SUGGESTIONS_TTL_SECONDS"])
+                    while len(self._cache) > current_app.config["SUGGESTIONS_CACHE_SIZE"]:
+                        self._cache.popitem(last=False)
+        else:
+            suggestions = entry[0]
+        return suggestions[:limit]
+
+    def invalidate(self, user_id):
+        with self._lock:
+            user_id = int(user_id)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._cache.pop(user_id, None)
+
+    def render_metrics(self):
+        """Cache counters and size in the Prometheus text format."""
+        with self._lock:
+            stats = {**self.stats, "entries": len(self._cache)}
+        lines = []
+        for name in ("hits", "misses"):
+            lines += [
+                f"# TYPE bookmarkd_suggestions_cache_{name}_total counter",
+                f"bookmarkd_suggestions_cache_{name}_total {stats[name]}",
+            ]
+        lines += [
+            "# TYPE bookmarkd_suggestions_cache_entries gauge",
+            f"bookmarkd_suggestions_cache_entries {stats['entries']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def compute(self, user_id):
+        """Suggestions for user_id in a fixed number of queries, uncached."""
+        from extensions import db
+        from models import Follow, User, UserBook, UserClub
+
+        config = current_app.config
+
+        # Hop 1: the user's most recent follows
+        first_hop = db.session.scalars(
+            select(Follow.followee_id)
+            .where(Follow.follower_id == user_id)
+            .order_by(Follow.created_at.desc())
+            .limit(config["SUGGESTIONS_FANOUT"])
+        ).all()
+        if not first_hop:
+            return []
+
+        # Hop 2: each followee's most recent follows, one LIMITed index range
+        # scan on (follower_id, created_at) per followee, so a followee who
+        # follows thousands costs no more than one who follows a few
+        second_hop = union_all(*(
+            select(
+                select(Follow.followee_id)
+                .where(Follow.follower_id == followee_id)
+                .order_by(Follow.created_at.desc())
+                .limit(config["SUGGESTIONS_PER_FOLLOWEE"])
+                .subquery()
+                .c.followee_id
+            )
+            for followee_id in first_hop
+        )).subquery()
+        already_following = exists().where(
+            Follow.follower_id == user_id, Follow.followee_id == second_hop.c.followee_id
+        )
+        mutuals = dict(db.session.execute(
+            select(second_hop.c.followee_id, func.count())
+            .where(second_hop.c.followee_id != user_id, ~already_following)
+            .group_by(second_hop.c.followee_id)
+            .order_by(func.count().desc(), second_hop.c.followee_id)
+            .limit(config["SUGGESTIONS_CANDIDATES"])
+        ).all())
+        if not mutuals:
+            return []
+
+        own_books = select(UserBook.book_id).where(UserBook.user_id == user_id)
+        shared_books = dict(db.session.execute(
+            select(UserBook.user_id, func.count())
+            .where(UserBook.user_id.in_(mutuals), UserBook.book_id.in_(own_books))
+            .group_by(UserBook.user_id)
+        ).all())
+        own_clubs = select(UserClub.club_id).where(UserClub.user_id == user_id)
+        shared_clubs = dict(db.session.execute(
+            select(UserClub.user_id, func.count())
+            .where(UserClub.user_id.in_(mutuals), UserClub.club_id.in_(own_clubs))
+            .group_by(UserClub.user_id)
+        ).all())
+
+        def score(candidate):
+            return (MUTUAL_WEIGHT * mutuals[candidate]
+                    + SHARED_CLUB_WEIGHT * shared_clubs.get(candidate, 0)
+                    + SHARED_BOOK_WEIGHT * shared_books.get(candidate, 0))
+
+        ranked = sorted(mutuals, key=lambda candidate: (-score(candidate), candidate))[:config["SUGGESTIONS_MAX"]]
+        usernames = dict(db.session.execute(
+            select(User.user_id, User.username).where(User.user_id.in_(ranked))
+        ).all())
+        return [{
+            "id": candidate,
+            "username": usernames[candidate],
+            "mutual_follows": mutuals[candidate],
+            "shared_books": shared_books.get(candidate, 0),
+            "shared_clubs": shared_clubs.get(candidate, 0),
+            "score": score(candidate),
+        } for candidate in ranked if candidate in usernames]
@@ -0,0 +1,125 @@
+import heapq
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func, insert, select
+
+from services.scheduler import PeriodicJob
+
+ALL_GENRES = ""
+
+
+def compute_trending(top_n=50, half_life_days=7.0, window_days=90, today=None):
+    """
+    Score every book added to a library in the last window_days and store
+    the top_n overall and per genre in trending_book.
+
+    A book's score is the sum over its library additions of
+    0.5 ** (age_days / half_life_days), with a rated addition counting up to
+    double (rating / 5 extra). The database returns one row per book and day
+    (served by the user_book.add_date index); decay weights are computed once
+    per day of age. The snapshot is replaced in a single transaction, so
+    readers always see a complete ranking.
+
+    Returns a report dict: books_scored, genres, computed_at.
+    """
+    from extensions import db
+    from models import Book, UserBook, TrendingBook
+
+    today = today or date.today()
+    cutoff = today - timedelta(days=window_days)
+    decay = [0.5 ** (age / half_life_days) for age in range(window_days + 1)]
+
+    daily = (
+        select(
+            UserBook.book_id,
+            Book.genre,
+            UserBook.add_date,
+            func.count(),
+            func.coalesce(func.sum(UserBook.user_rating), 0.0),
+        )
+        .join(Book, Book.book_id == UserBook.book_id)
+        .where(UserBook.add_date >= cutoff)
+        .group_by(UserBook.book_id, Book.genre, UserBook.add_date)
+        .execution_options(yield_per=1000)
+    )
+    scores = defaultdict(float)
+    genres = {}
+    for book_id, genre, added, additions, rating_total in db.session.execute(daily):
+        age = min(max((today - added).days, 0), window_days)
+        scores[book_id] += decay[age] * (additions + rating_total / 5)
+        genres[book_id] = genre
+
+    by_genre = defaultdict(list)
+    for book_id, score in scores.items():
+        by_genre[ALL_GENRES].append((score, book_id))
+        if genres[book_id]:
+            by_genre[genres[book_id]].append((score, book_id))
+
+    computed_at = datetime.utcnow()
+    rows = []
+    for genre, candidates in by_genre.items():
+        # Ties go to the lower book_id so rankings are stable between runs.
+        top = heapq.nsmallest(top_n, candidates, key=lambda item: (-item[0], item[1]))
+        rows.extend(
+            {"genre": genre, "rank": rank, "book_id": book_id, "score": score, "computed_at": computed_at}
+            for rank, (score, book_id) in enumerate(top, start=1)
+        )
+
+    db.session.execute(delete(TrendingBook))
+    if rows:
+        db.session.execute(insert(TrendingBook), rows)
+    db.session.commit()
+    return {
+        "books_scored": len(scores),
+        "genres": len(by_genre) - (ALL_GENRES in by_genre),
+        "computed_at": computed_at.isoformat(),
+    }
+
+
+class TrendingRanker:
+    """
+    Recomputes the trending snapshot every TRENDING_INTERVAL_SECONDS
+    (0 disables the schedule) once start() is called, and provides
+    `flask compute-trending`.
+    """
+
+    def __init__(self, app=None):
+        self._job = PeriodicJob("trending", self.refresh, run_immediately=True)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("TRENDING_INTERVAL_SECONDS", 0)
+        app.config.setdefault("TRENDING_TOP_N", 50)
+        app.config.setdefault("TRENDING_HALF_LIFE_DAYS", 7.0)
+        app.config.setdefault("TRENDING_WINDOW_DAYS", 90)
+        app.extensions["trending"] = self
+        app.cli.add_command(compute_trending_command)
+
+    def start(self, app):
+        self._job.start(app, app.config["TRENDING_INTERVAL_SECONDS"])
+
+    def stop(self):
+        self._job.stop()
+
+    @staticmethod
+    def refresh():
+        """Recompute the snapshot with the app's TRENDING_* settings."""
+        config = current_app.config
+        return compute_trending(
+            top_n=config["TRENDING_TOP_N"],
+            half_life_days=config["TRENDING_HALF_LIFE_DAYS"],
+            window_days=config["TRENDING_WINDOW_DAYS"],
+        )
+
+
+@click.command("compute-trending")
+@with_appcontext
+def compute_trending_command():
+    """Recompute the trending books snapshot."""
+    report = TrendingRanker.refresh()
+    click.echo(f"Scored {report['books_scored']} books across {report['genres']} genres")
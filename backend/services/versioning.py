@@ -0,0 +1,11 @@
+def expected_version(data):
+    """
+    The optional "version" a client last read from a versioned row (one
+    mapped with version_id_col), or raise ValueError if it is not an integer.
+    """
+    version = data.get("version")
+    if version is None:
+        return None
+    if isinstance(version, bool) or not isinstance(version, int):
+        raise ValueError("Version must be an integer")
+    return version
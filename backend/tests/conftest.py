@@ -1,7 +1,11 @@
 import os
+import sqlite3
 import sys
+from collections import namedtuple
+from contextlib import contextmanager
 from pathlib import Path
 import pytest
+from sqlalchemy import event
 
 # Add the backend directory to sys.path so we can import modules
 TESTS_DIR = Path(__file__).resolve().parent  # tests/
@@ -11,12 +15,45 @@ if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
 from app import create_app
+from database.seed import seed_db
 from extensions import db
 from models import User
+from services.trending import TrendingRanker
+
+
+def _copy_database(app, source=None, target=None):
+    """
+    Copy an SQLite database with the backup API. Either side defaults to
+    the app's in-memory database (its single StaticPool connection).
+    """
+    raw = db.engine.raw_connection()
+    try:
+        (source or raw.driver_connection).backup(target or raw.driver_connection)
+    finally:
+        raw.close()
+
+
+@pytest.fixture(scope='session')
+def template_db():
+    """
+    Schema plus seed data, built once per test process and kept in a
+    private in-memory database. Every process (e.g. each pytest-xdist
+    worker) builds its own template, so parallel workers share no files.
+    """
+    app = create_app('testing')
+    template = sqlite3.connect(':memory:', check_same_thread=False)
+    with app.app_context():
+        seed_db()
+        TrendingRanker.refresh()
+        db.session.remove()
+        _copy_database(app, target=template)
+        db.engine.dispose()
+    yield template
+    template.close()
 
 @pytest.fixture
-def app():
-    """Create application for testing"""
+def app(template_db):
+    """Create application for testing, on a fresh copy of the template database"""
     app = create_app('testing')
     
     # Use in-memory SQLite for tests (no real database needed!)
@@ -25,10 +62,10 @@ def app():
     app.config['JWT_SECRET_KEY'] = 'test-secret-key'
     
     with app.app_context():
-        db.create_all()  # Create tables
+        _copy_database(app, source=template_db)
         yield app
         db.session.remove()
-        db.drop_all()  # Clean up after tests
+        db.engine.dispose()  # Drops the in-memory database
 
 @pytest.fixture
 def client(app):
@@ -49,3 +86,64 @@ def sample_user(app):
         db.session.add(user)
         db.session.commit()
         return user
+
+
+Registered = namedtuple('Registered', 'user_id token headers')
+
+
+@pytest.fixture
+def register(request):
+    """
+    Factory registering a user through the API, e.g.
+
+        user_id, token, headers = register('ann')
+
+    Uses the `client` fixture unless another test client is passed.
+    """
+    def _register(username='reader', client=None):
+        client = client or request.getfixturevalue('client')
+        data = client.post('/api/auth/register', json={
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': 'password123'
+        }).get_json()
+        return Registered(data['user']['id'], data['token'], {'Authorization': f"Bearer {data['token']}"})
+
+    return _register
+
+
+@pytest.fixture
+def auth_headers(register):
+    """Authorization headers for a freshly registered user"""
+    return register().headers
+
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Context manager asserting the wrapped block issues at most max_queries
+    SQL statements, e.g.
+
+        with query_budget(2):
+            client.get('/api/books', headers=headers)
+    """
+    @contextmanager
+    def _budget(max_queries):
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+
+        assert len(statements) <= max_queries, (
+            f'{len(statements)} SQL statements issued, budget is {max_queries}:\n'
+            + '\n'.join(statements)
+        )
+
+    return _budget
@@ -0,0 +1,39 @@
+from benchmarks.load import compare, merge_rounds, percentile
+
+
+def _row(p95_ms=10.0, throughput_rps=100.0, errors=0):
+    return {'count': 10, 'errors': errors, 'throughput_rps': throughput_rps,
+            'p50_ms': 5.0, 'p95_ms': p95_ms, 'p99_ms': p95_ms}
+
+
+class TestBenchmarkStats:
+    """Tests for the load benchmark's reporting helpers"""
+
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 50) == 0.0
+
+    def test_merge_takes_median(self):
+        merged = merge_rounds([
+            {'GET /api/books': _row(p95_ms=10.0)},
+            {'GET /api/books': _row(p95_ms=90.0)},
+            {'GET /api/books': _row(p95_ms=12.0)},
+        ])
+
+        assert merged['GET /api/books']['p95_ms'] == 12.0
+        assert merged['GET /api/books']['count'] == 30
+
+    def test_compare_flags_regressions(self):
+        baseline = {'GET /api/books': _row(), 'GET /api/goals': _row()}
+        report = {'GET /api/books': _row(p95_ms=20.0, throughput_rps=40.0)}
+
+        regressions = compare(report, baseline, tolerance=0.25)
+
+        assert any('p95' in r for r in regressions)
+        assert any('throughput' in r for r in regressions)
+        assert any('GET /api/goals: missing' in r for r in regressions)
+        assert compare(baseline, baseline, tolerance=0.25) == []
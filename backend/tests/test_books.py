@@ -0,0 +1,66 @@
+from extensions import db
+from models import Book, UserBook
+from routes.books import calculate_status
+
+
+def _library(client, headers):
+    for title, progress, rating in [('Bravo', 100, 3), ('Alpha', 0, None), ('Charlie', 40, None), ('Delta', 100, 5)]:
+        book = client.post('/api/books', json={
+            'title': title, 'author': 'Author', 'total_pages': 100, 'page_progress': progress
+        }, headers=headers).get_json()
+        if rating:
+            client.put(f"/api/books/{book['id']}/rating", json={'rating': rating}, headers=headers)
+    return headers
+
+
+class TestBookListing:
+    """Tests for filtering, sorting and projecting GET /api/books"""
+
+    def test_status_filter(self, client, auth_headers):
+        """Status is filtered in SQL with the same rules as calculate_status"""
+        headers = _library(client, auth_headers)
+
+        read = client.get('/api/books?status=read', headers=headers).get_json()
+        wishlist = client.get('/api/books?status=wishlist', headers=headers).get_json()
+
+        assert sorted(b['title'] for b in read) == ['Bravo', 'Delta']
+        assert [b['title'] for b in wishlist] == ['Alpha']
+
+    def test_sql_status_matches_python(self, client, auth_headers):
+        """The SQL expression agrees with calculate_status, including unknown page counts and finished entries"""
+        headers = _library(client, auth_headers)
+        user_book = UserBook.query.join(Book).filter(Book.title == 'Charlie').one()
+        user_book.book.page_count = None
+        UserBook.query.join(Book).filter(Book.title == 'Alpha').one().finished = True
+        db.session.commit()
+
+        books = client.get('/api/books', headers=headers).get_json()
+        for book in books:
+            finished = book['title'] == 'Alpha'
+            assert book['status'] == calculate_status(book['page_progress'], book['total_pages'], finished)
+        assert {b['title']: b['status'] for b in books}['Alpha'] == 'read'
+
+    def test_sort(self, client, auth_headers):
+        """Sort keys combine, support descending order and keep unrated books last"""
+        headers = _library(client, auth_headers)
+
+        by_title = client.get('/api/books?sort=title', headers=headers).get_json()
+        by_rating = client.get('/api/books?sort=-rating,title', headers=headers).get_json()
+
+        assert [b['title'] for b in by_title] == ['Alpha', 'Bravo', 'Charlie', 'Delta']
+        assert [b['title'] for b in by_rating] == ['Delta', 'Bravo', 'Alpha', 'Charlie']
+
+    def test_fields_projection(self, client, auth_headers):
+        """Only the requested fields are returned"""
+        headers = _library(client, auth_headers)
+
+        books = client.get('/api/books?fields=title,status&sort=title', headers=headers).get_json()
+
+        assert books[0] == {'title': 'Alpha', 'status': 'wishlist'}
+
+    def test_invalid_params(self, client, auth_headers):
+        """Unknown statuses, sort keys and fields are rejected"""
+        headers = _library(client, auth_headers)
+
+        for query in ('status=finished', 'sort=price', 'fields=title,price'):
+            assert client.get(f'/api/books?{query}', headers=headers).status_code == 400
@@ -0,0 +1,77 @@
+from app import create_app, start_background_jobs
+from extensions import catalog_gc, db
+from models import Book, UserBook, User, ArchivedBook
+from services.catalog_gc import collect_orphaned_books
+
+
+def _catalog(owner_titles, orphan_titles):
+    # Start from an empty catalog so seeded rows do not affect the counts.
+    UserBook.query.delete()
+    Book.query.delete()
+    user = User(username='collector', email='collector@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    for title in owner_titles + orphan_titles:
+        db.session.add(Book(title=title, author='Author', page_count=10))
+    db.session.flush()
+    for book in Book.query.filter(Book.title.in_(owner_titles)):
+        db.session.add(UserBook(user_id=user.user_id, book_id=book.book_id))
+    db.session.commit()
+
+
+class TestCatalogGC:
+    """Tests for the orphaned catalog collector"""
+
+    def setup_method(self):
+        self.owned = ['Kept 1', 'Kept 2']
+        self.orphans = [f'Orphan {i}' for i in range(5)]
+
+    def test_deletes_only_unreferenced_books(self, app):
+        """Books with no library entry are removed across several batches"""
+        _catalog(self.owned, self.orphans)
+
+        report = collect_orphaned_books(batch_size=3)
+
+        assert report['reclaimed'] == 5
+        assert report['scanned'] == 7
+        assert report['batches'] == 3
+        assert sorted(b.title for b in Book.query) == self.owned
+
+    def test_archive(self, app):
+        """Archiving keeps a copy of every reclaimed row"""
+        _catalog(self.owned, self.orphans)
+
+        report = collect_orphaned_books(archive=True)
+
+        assert report['archived'] == 5
+        assert sorted(a.title for a in ArchivedBook.query) == self.orphans
+
+    def test_dry_run(self, app):
+        """A dry run counts orphans without removing them"""
+        _catalog(self.owned, self.orphans)
+
+        report = collect_orphaned_books(dry_run=True)
+
+        assert report['reclaimed'] == 5
+        assert Book.query.count() == 7
+
+    def test_cli(self, app, runner):
+        """The gc-books command reports what it reclaimed"""
+        _catalog(self.owned, self.orphans)
+
+        result = runner.invoke(args=['gc-books', '--batch-size', '2'])
+
+        assert result.exit_code == 0, result.output
+        assert 'Reclaimed 5 of 7 books' in result.output
+        assert Book.query.count() == 2
+
+    def test_schedule_starts_after_create_app(self, app, monkeypatch):
+        """create_app never starts the collector; start_background_jobs does"""
+        started = []
+        monkeypatch.setattr(catalog_gc._job, 'start', lambda app, interval: started.append(interval))
+        app.config['CATALOG_GC_INTERVAL_SECONDS'] = 3600
+        create_app('testing')
+        assert started == []
+
+        start_background_jobs(app)
+        assert started == [3600]
@@ -0,0 +1,41 @@
+from extensions import db
+from models import Club, UserClub
+
+
+class TestDashboard:
+    """Tests for the aggregated dashboard endpoint"""
+
+    def test_dashboard_contents(self, client, register):
+        """Library summary, unfinished goals and clubs come back together"""
+        user_id, _, headers = register('dashing')
+        for title, progress in [('Unread', 0), ('Halfway', 50), ('Finished', 100)]:
+            client.post('/api/books', json={
+                'title': title, 'author': 'Author', 'total_pages': 100, 'page_progress': progress
+            }, headers=headers)
+        open_goal = client.post('/api/goals', json={
+            'amount': 10, 'type': 'pages read', 'duration': 'this month'
+        }, headers=headers).get_json()['goal']
+        done_goal = client.post('/api/goals', json={
+            'amount': 2, 'type': 'books read', 'duration': 'this year'
+        }, headers=headers).get_json()['goal']
+        client.put(f"/api/goals/{done_goal['id']}", json={'progress': 2}, headers=headers)
+
+        club = Club(club_name='Night Readers', club_genre='Mystery')
+        db.session.add(club)
+        db.session.flush()
+        db.session.add(UserClub(user_id=user_id, club_id=club.club_id))
+        db.session.commit()
+
+        data = client.get('/api/dashboard', headers=headers).get_json()
+
+        assert data['user']['username'] == 'dashing'
+        assert data['library']['total_books'] == 3
+        assert data['library']['by_status'] == {'wishlist': 1, 'reading': 1, 'read': 1}
+        assert data['library']['pages_read'] == 150
+        assert [b['title'] for b in data['library']['currently_reading']] == ['Halfway']
+        assert [g['id'] for g in data['goals']] == [open_goal['id']]
+        assert data['clubs'] == [{'id': club.club_id, 'name': 'Night Readers', 'genre': 'Mystery'}]
+
+    def test_requires_auth(self, client):
+        """The dashboard is only served to authenticated users"""
+        assert client.get('/api/dashboard').status_code == 401
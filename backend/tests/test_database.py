@@ -0,0 +1,44 @@
+from app import create_app
+from config import config, SQLiteWALConfig
+from extensions import db
+from models import Book
+
+
+def _wal_app(monkeypatch, path):
+    profile = type('WALTestConfig', (SQLiteWALConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SEED_DATABASE': False,
+    })
+    monkeypatch.setitem(config, 'wal_test', profile)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    return create_app('wal_test')
+
+
+class TestSQLiteWALConfig:
+    """Tests for the file-backed SQLite WAL profile"""
+
+    def test_pragmas_applied(self, monkeypatch, tmp_path):
+        """Test every pooled connection gets the configured pragmas"""
+        app = _wal_app(monkeypatch, tmp_path / 'wal.db')
+
+        with app.app_context():
+            pragma = lambda name: db.session.execute(db.text(f'PRAGMA {name}')).scalar()
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('busy_timeout') == 5000
+            assert pragma('cache_size') == -64000
+            db.session.remove()
+
+    def test_data_survives_restart(self, monkeypatch, tmp_path):
+        """Test a second app on the same file sees previously committed rows"""
+        path = tmp_path / 'wal.db'
+        first = _wal_app(monkeypatch, path)
+        with first.app_context():
+            db.session.add(Book(title='Persistent', author='Author', page_count=10))
+            db.session.commit()
+            db.session.remove()
+            db.engine.dispose()
+
+        second = _wal_app(monkeypatch, path)
+        with second.app_context():
+            assert Book.query.filter_by(title='Persistent').count() == 1
+            db.session.remove()
@@ -0,0 +1,109 @@
+from extensions import db, event_hub
+from services.events import EventHub, Subscription, publish_on_commit
+
+
+class TestSubscription:
+    """Tests for the bounded per-connection queue"""
+
+    def test_drops_oldest_when_full(self):
+        """A slow consumer loses the oldest events and is flagged as lagged"""
+        sub = Subscription(user_id=1, maxsize=2)
+        for i in range(3):
+            sub.offer(f'message-{i}')
+
+        assert sub.lagged is True
+        assert sub.dropped == 1
+        assert sub.get(timeout=0) == 'message-1'
+        assert sub.get(timeout=0) == 'message-2'
+        assert sub.get(timeout=0) is None
+
+
+class TestEventHub:
+    """Tests for the in-process pub/sub hub"""
+
+    def test_publish_only_reaches_owner(self):
+        """Events are delivered to the target user's streams only"""
+        hub = EventHub()
+        mine = hub.subscribe(1)
+        theirs = hub.subscribe(2)
+
+        hub.publish(1, 'book.progress', {'id': 7})
+
+        assert 'event: book.progress' in mine.get(timeout=0)
+        assert theirs.get(timeout=0) is None
+
+    def test_stream_cap_per_user(self):
+        """Subscribing beyond the per-user cap is refused"""
+        hub = EventHub()
+        hub.max_streams_per_user = 1
+        first = hub.subscribe(1)
+
+        assert hub.subscribe(1) is None
+        hub.unsubscribe(first)
+        assert hub.subscribe(1) is not None
+
+    def test_stream_cap_per_process(self):
+        """Streams beyond the process-wide cap are refused, whoever opens them"""
+        hub = EventHub()
+        hub.max_streams = 2
+        first, _ = hub.subscribe(1), hub.subscribe(2)
+
+        assert hub.subscribe(3) is None
+        hub.unsubscribe(first)
+        hub.unsubscribe(first)
+        assert hub.subscribe(3) is not None
+        assert hub.subscribe(4) is None
+
+    def test_rolled_back_events_are_not_published(self, app):
+        """Events queued in a transaction that rolls back are discarded"""
+        sub = event_hub.subscribe(99)
+        try:
+            publish_on_commit(99, 'goal.created', {'id': 1})
+            db.session.rollback()
+            db.session.commit()
+            assert sub.get(timeout=0) is None
+
+            publish_on_commit(99, 'goal.created', {'id': 2})
+            db.session.commit()
+            assert '"id":2' in sub.get(timeout=0)
+        finally:
+            event_hub.unsubscribe(sub)
+
+
+class TestEventStream:
+    """Tests for /api/events endpoint"""
+
+    def test_stream_requires_token(self, client):
+        """Test the stream rejects anonymous clients"""
+        response = client.get('/api/events')
+
+        assert response.status_code == 401
+
+    def test_stream_disabled(self, app, client, register):
+        """With EVENTS_ENABLED off the endpoint is not served"""
+        app.config['EVENTS_ENABLED'] = False
+        token = register('streamer').token
+
+        assert client.get(f'/api/events?jwt={token}').status_code == 404
+
+    def test_stream_receives_goal_updates(self, client, register):
+        """Test a committed goal change is pushed to the open stream"""
+        token = register('streamer').token
+        response = client.get(f'/api/events?jwt={token}', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        chunks = iter(response.response)
+        assert ': connected' in next(chunks).decode()
+
+        client.post('/api/goals',
+            json={'amount': 5, 'type': 'books read', 'duration': 'this year'},
+            headers={'Authorization': f'Bearer {token}'}
+        )
+
+        message = next(chunks).decode()
+        assert message.startswith('event: goal.created')
+        assert '"total":5' in message
+
+        response.close()
+        assert event_hub.subscriber_count() == 0
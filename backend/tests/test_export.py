@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from extensions import db
+from models import Book, UserBook, PageGoal
+
+
+def _seed_library(user_id, count):
+    for i in range(count):
+        book = Book(title=f'Book {i}', author='Author', page_count=100)
+        db.session.add(book)
+        db.session.flush()
+        db.session.add(UserBook(user_id=user_id, book_id=book.book_id, page_progress=i * 50))
+    db.session.add(PageGoal(user_id=user_id, description='Read pages', num_pages=500))
+    db.session.commit()
+
+
+class TestExport:
+    """Tests for the streaming library export"""
+
+    def test_ndjson_export(self, client, register):
+        """Every book and goal is streamed as one JSON object per line"""
+        user_id, _, headers = register('exporter')
+        _seed_library(user_id, 3)
+
+        response = client.get('/api/export?format=ndjson', headers=headers)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        books = [r for r in records if r['record_type'] == 'book']
+        goals = [r for r in records if r['record_type'] == 'goal']
+        assert [b['status'] for b in books] == ['wishlist', 'reading', 'read']
+        assert goals == [{
+            'record_type': 'goal', 'id': goals[0]['id'], 'goal_type': 'pages read',
+            'description': 'Read pages', 'progress': 0.0, 'total': 500,
+        }]
+
+    def test_csv_export(self, client, register):
+        """CSV export has a header row and one row per record"""
+        user_id, _, headers = register('exporter')
+        _seed_library(user_id, 2)
+
+        response = client.get('/api/export?format=csv', headers=headers)
+
+        assert response.status_code == 200
+        assert 'bookmarkd-export.csv' in response.headers['Content-Disposition']
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [r['record_type'] for r in rows] == ['book', 'book', 'goal']
+        assert rows[1]['title'] == 'Book 1'
+
+    def test_invalid_format(self, client, auth_headers):
+        """Unknown formats are rejected"""
+        headers = auth_headers
+
+        response = client.get('/api/export?format=xml', headers=headers)
+
+        assert response.status_code == 400
+
+    def test_requires_auth(self, client):
+        """Export requires a token"""
+        response = client.get('/api/export')
+
+        assert response.status_code == 401
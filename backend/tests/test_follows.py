@@ -0,0 +1,168 @@
+import pytest
+from extensions import db, friend_suggestions
+from models import Club, Follow, User, UserClub
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def users(register):
+    """{name: (user_id, token, headers)} for a few fresh users"""
+    return {name: register(name) for name in ('ann', 'ben', 'cat', 'dan', 'eve', 'fay')}
+
+
+def _follow(client, users, follower, *followees):
+    for followee in followees:
+        client.post(f'/api/users/{users[followee].user_id}/follow', headers=users[follower].headers)
+
+
+class TestFollows:
+    """Tests for following and the follower lists"""
+
+    def test_follow_and_lists(self, client, users):
+        """Edges are listed from both ends, newest first"""
+        ann_id, _, ann = users['ann']
+        assert client.post(f"/api/users/{users['ben'].user_id}/follow", headers=ann).status_code == 201
+        assert client.post(f"/api/users/{users['ben'].user_id}/follow", headers=ann).status_code == 200
+        _follow(client, users, 'ann', 'cat')
+        _follow(client, users, 'dan', 'ben')
+
+        following = client.get(f'/api/users/{ann_id}/following', headers=ann).get_json()
+        assert following['total'] == 2
+        assert [u['username'] for u in following['users']] == ['cat', 'ben']
+        followers = client.get(f"/api/users/{users['ben'].user_id}/followers?limit=1", headers=ann).get_json()
+        assert followers['total'] == 2
+        assert [u['username'] for u in followers['users']] == ['dan']
+
+        assert client.delete(f"/api/users/{users['ben'].user_id}/follow", headers=ann).status_code == 200
+        assert client.delete(f"/api/users/{users['ben'].user_id}/follow", headers=ann).status_code == 404
+        assert client.get(f'/api/users/{ann_id}/following', headers=ann).get_json()['total'] == 1
+
+    def test_validation(self, client, users):
+        """Self follows, unknown users and bad pages are rejected"""
+        ann_id, _, ann = users['ann']
+        assert client.post(f'/api/users/{ann_id}/follow', headers=ann).status_code == 400
+        assert client.post('/api/users/999999/follow', headers=ann).status_code == 404
+        assert client.get('/api/users/999999/followers', headers=ann).status_code == 404
+        assert client.get(f'/api/users/{ann_id}/following?limit=0', headers=ann).status_code == 400
+        assert client.get(f'/api/users/{ann_id}/following?offset=x', headers=ann).status_code == 400
+
+
+class TestSuggestions:
+    """Tests for friend-of-friend suggestions"""
+
+    def test_ranked_by_mutuals_and_overlap(self, client, app, users):
+        """Second-hop users are ranked by mutual follows, shared clubs and books"""
+        # ann -> ben, cat; ben -> dan, eve; cat -> dan, fay
+        _follow(client, users, 'ann', 'ben', 'cat')
+        _follow(client, users, 'ben', 'dan', 'eve', 'ann')
+        _follow(client, users, 'cat', 'dan', 'fay')
+        with app.app_context():
+            club = Club(club_name='Readers')
+            db.session.add(club)
+            db.session.flush()
+            db.session.add_all([UserClub(user_id=users[name].user_id, club_id=club.club_id) for name in ('ann', 'fay')])
+            db.session.commit()
+
+        suggestions = client.get('/api/users/suggestions', headers=users['ann'].headers).get_json()
+        assert [(s['username'], s['mutual_follows'], s['shared_clubs']) for s in suggestions] == [
+            ('dan', 2, 0), ('fay', 1, 1), ('eve', 1, 0)
+        ]
+        assert client.get('/api/users/suggestions?limit=1', headers=users['ann'].headers).get_json()[0]['username'] == 'dan'
+
+    def test_traversal_is_bounded(self, client, app, users):
+        """Only the most recent follows are expanded on either hop"""
+        app.config['SUGGESTIONS_FANOUT'] = 1
+        app.config['SUGGESTIONS_PER_FOLLOWEE'] = 1
+        _follow(client, users, 'ann', 'ben', 'cat')
+        _follow(client, users, 'cat', 'dan', 'eve')
+        _follow(client, users, 'ben', 'fay')
+
+        suggestions = client.get('/api/users/suggestions', headers=users['ann'].headers).get_json()
+        assert [s['username'] for s in suggestions] == ['eve']
+
+    def test_cached_until_expiry_or_own_follow(self, client, users, query_budget, monkeypatch):
+        """Suggestions are cached; the user's own follows refresh them"""
+        clock = FakeClock()
+        monkeypatch.setattr(friend_suggestions, '_clock', clock)
+        _follow(client, users, 'ann', 'ben')
+        _follow(client, users, 'ben', 'cat', 'dan')
+        ann = users['ann'].headers
+        assert len(client.get('/api/users/suggestions', headers=ann).get_json()) == 2
+
+        # Other users' follows show up once the entry expires
+        _follow(client, users, 'ben', 'eve')
+        with query_budget(0):
+            assert len(client.get('/api/users/suggestions', headers=ann).get_json()) == 2
+        clock.now = 900
+        assert len(client.get('/api/users/suggestions', headers=ann).get_json()) == 3
+
+        _follow(client, users, 'ann', 'cat')
+        assert len(client.get('/api/users/suggestions', headers=ann).get_json()) == 2
+
+    def test_result_computed_during_invalidation_is_not_cached(self, app, users, monkeypatch):
+        """A follow that lands while suggestions are computed is not overwritten by the stale result"""
+        ann_id = users['ann'].user_id
+        compute = friend_suggestions.compute
+
+        def compute_then_follow(user_id):
+            suggestions = compute(user_id)
+            friend_suggestions.invalidate(user_id)
+            return suggestions
+
+        monkeypatch.setattr(friend_suggestions, 'compute', compute_then_follow)
+        friend_suggestions.for_user(ann_id)
+        assert ann_id not in friend_suggestions._cache
+
+        monkeypatch.setattr(friend_suggestions, 'compute', compute)
+        friend_suggestions.for_user(ann_id)
+        assert ann_id in friend_suggestions._cache
+
+    def test_cache_counters_in_metrics(self, client, users):
+        """Suggestion cache hits and misses are exported with the other metrics"""
+        def sample(name):
+            text = client.get('/api/metrics').get_data(as_text=True)
+            return next(float(line.split()[1]) for line in text.splitlines() if line.startswith(name + ' '))
+
+        hits, misses = sample('bookmarkd_suggestions_cache_hits_total'), sample('bookmarkd_suggestions_cache_misses_total')
+        client.get('/api/users/suggestions', headers=users['ann'].headers)
+        client.get('/api/users/suggestions', headers=users['ann'].headers)
+
+        assert sample('bookmarkd_suggestions_cache_misses_total') == misses + 1
+        assert sample('bookmarkd_suggestions_cache_hits_total') == hits + 1
+        assert sample('bookmarkd_suggestions_cache_entries') >= 1
+
+    def test_cost_independent_of_followee_out_degree(self, app, users):
+        """A followee who follows many users adds no work to the second hop"""
+        app.config['SUGGESTIONS_PER_FOLLOWEE'] = 5
+        ann_id, ben_id = users['ann'].user_id, users['ben'].user_id
+        db.session.add(Follow(follower_id=ann_id, followee_id=ben_id))
+        others = [User(username=f'hub{i}', email=f'hub{i}@example.com', password_hash='-') for i in range(400)]
+        db.session.add_all(others)
+        db.session.flush()
+        connection = db.session.connection().connection.driver_connection
+
+        def vm_steps(follows):
+            db.session.execute(Follow.__table__.delete().where(Follow.follower_id == ben_id))
+            db.session.add_all([Follow(follower_id=ben_id, followee_id=u.user_id) for u in others[:follows]])
+            db.session.flush()
+            steps = [0]
+
+            def count():
+                steps[0] += 1
+
+            # SQLite calls the handler every virtual machine instruction
+            connection.set_progress_handler(count, 1)
+            try:
+                assert len(friend_suggestions.compute(ann_id)) == 5
+            finally:
+                connection.set_progress_handler(None, 1)
+            return steps[0]
+
+        assert vm_steps(400) <= vm_steps(10) * 1.1
@@ -0,0 +1,66 @@
+import logging
+import os
+import runpy
+import pytest
+from config import ProductionConfig
+
+CONF = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+
+
+class FakeServer:
+    log = logging.getLogger('gunicorn.test')
+
+
+class TestGunicornConf:
+    """Tests for the worker checks in gunicorn.conf.py"""
+
+    def test_single_worker_has_nothing_to_report(self, monkeypatch, caplog):
+        """One worker is the default and shares nothing across processes"""
+        monkeypatch.setenv('FLASK_CONFIG', 'production')
+        conf = runpy.run_path(CONF)
+
+        conf['on_starting'](FakeServer)
+
+        assert conf['workers'] == ProductionConfig.SERVER_WORKERS
+        assert caplog.records == []
+
+    def test_per_process_stores_are_reported(self, monkeypatch, caplog):
+        """Several workers start, with a warning per store that is not shared"""
+        monkeypatch.setenv('FLASK_CONFIG', 'production')
+        monkeypatch.setattr(ProductionConfig, 'SERVER_WORKERS', 3)
+        monkeypatch.setattr(ProductionConfig, 'EVENTS_ENABLED', False)
+
+        runpy.run_path(CONF)['on_starting'](FakeServer)
+
+        messages = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+        assert any('Idempotency-Key' in m for m in messages)
+        assert any('suggestions' in m for m in messages)
+
+        monkeypatch.setattr(ProductionConfig, 'IDEMPOTENCY_BACKEND', 'shared.Backend', raising=False)
+        caplog.clear()
+        runpy.run_path(CONF)['on_starting'](FakeServer)
+        assert not any('Idempotency-Key' in r.getMessage() for r in caplog.records)
+
+    def test_response_cache_needs_a_shared_backend(self, monkeypatch):
+        """A per-process response cache is refused with several workers"""
+        monkeypatch.setenv('FLASK_CONFIG', 'production')
+        monkeypatch.setattr(ProductionConfig, 'SERVER_WORKERS', 3)
+        monkeypatch.setattr(ProductionConfig, 'EVENTS_ENABLED', False)
+        monkeypatch.setattr(ProductionConfig, 'RESPONSE_CACHE_ENABLED', True, raising=False)
+
+        with pytest.raises(RuntimeError, match='RESPONSE_CACHE_BACKEND'):
+            runpy.run_path(CONF)
+        monkeypatch.setattr(ProductionConfig, 'RESPONSE_CACHE_BACKEND', 'shared.Backend', raising=False)
+        assert runpy.run_path(CONF)['workers'] == 3
+
+    def test_event_stream_needs_a_single_worker(self, monkeypatch):
+        """SSE is refused with several workers, and streams must leave threads free"""
+        monkeypatch.setenv('FLASK_CONFIG', 'production')
+        monkeypatch.setattr(ProductionConfig, 'SERVER_WORKERS', 3)
+        with pytest.raises(RuntimeError, match='EVENTS_ENABLED'):
+            runpy.run_path(CONF)
+
+        monkeypatch.setattr(ProductionConfig, 'SERVER_WORKERS', 1)
+        monkeypatch.setattr(ProductionConfig, 'EVENTS_MAX_STREAMS', ProductionConfig.SERVER_THREADS)
+        with pytest.raises(RuntimeError, match='EVENTS_MAX_STREAMS'):
+            runpy.run_path(CONF)
@@ -0,0 +1,92 @@
+from services.idempotency import MemoryBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+BOOK = {'title': 'Retry Book', 'author': 'Author', 'total_pages': 120, 'open_library_id': 'OL-RETRY'}
+
+
+class TestMemoryBackend:
+    """Tests for the in-process response store"""
+
+    def test_entries_expire(self):
+        """A key can be reused once its TTL has passed"""
+        clock = FakeClock()
+        store = MemoryBackend(clock=clock)
+        store.reserve('k', 'fp', ttl=10)
+        store.complete('k', (201, b'{}', {}))
+
+        assert store.reserve('k', 'fp', ttl=10) == ('done', (201, b'{}', {}))
+        clock.now = 11
+        assert store.reserve('k', 'fp', ttl=10) == ('new', None)
+
+    def test_bounded(self):
+        """The oldest keys are evicted beyond max_keys"""
+        store = MemoryBackend(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            store.reserve(key, 'fp', ttl=60)
+
+        assert len(store) == 2
+        assert store.reserve('a', 'fp', ttl=60) == ('new', None)
+
+    def test_in_flight_and_mismatch(self):
+        """A claimed key reports pending, and a different payload is a mismatch"""
+        store = MemoryBackend()
+        store.reserve('k', 'fp', ttl=60)
+
+        assert store.reserve('k', 'fp', ttl=60) == ('pending', None)
+        assert store.reserve('k', 'other', ttl=60) == ('mismatch', None)
+        store.release('k')
+        assert store.reserve('k', 'other', ttl=60) == ('new', None)
+
+
+class TestIdempotentRoutes:
+    """Tests for Idempotency-Key on create endpoints"""
+
+    def test_book_retry_replays_without_queries(self, client, query_budget, auth_headers):
+        """A retried create_book returns the original response and touches no tables"""
+        headers = {**auth_headers, 'Idempotency-Key': 'book-1'}
+        first = client.post('/api/books', json=BOOK, headers=headers)
+
+        with query_budget(0):
+            retry = client.post('/api/books', json=BOOK, headers=headers)
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.get_json() == first.get_json()
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+
+    def test_goal_retry_creates_one_goal(self, client, auth_headers):
+        """Goals are not duplicated by retries"""
+        headers = {**auth_headers, 'Idempotency-Key': 'goal-1'}
+        payload = {'amount': 5, 'type': 'books read', 'duration': 'this year'}
+
+        for _ in range(3):
+            response = client.post('/api/goals', json=payload, headers=headers)
+            assert response.status_code == 201
+
+        assert len(client.get('/api/goals', headers=headers).get_json()['goals']) == 1
+
+    def test_key_reused_with_different_body(self, client, auth_headers):
+        """Reusing a key for another request is rejected"""
+        headers = {**auth_headers, 'Idempotency-Key': 'book-2'}
+        client.post('/api/books', json=BOOK, headers=headers)
+
+        response = client.post('/api/books', json={**BOOK, 'title': 'Other'}, headers=headers)
+
+        assert response.status_code == 422
+        assert len(client.get('/api/books', headers=headers).get_json()) == 1
+
+    def test_without_header(self, client, auth_headers):
+        """Requests without a key behave as before"""
+        headers = auth_headers
+        client.post('/api/books', json=BOOK, headers=headers)
+
+        response = client.post('/api/books', json=BOOK, headers=headers)
+
+        assert response.status_code == 400
@@ -0,0 +1,113 @@
+import io
+from extensions import db
+from models import Book, UserBook, ImportJob
+
+GOODREADS_CSV = (
+    'Book Id,Title,Author,My Rating,Number of Pages,Exclusive Shelf\n'
+    '1,Piranesi,Susanna Clarke,5,412,read\n'
+    '2,Emma,Jane Austen,0,474,currently-reading\n'
+    '3,Piranesi,Susanna Clarke,5,412,read\n'
+    '4,,Nobody,0,100,to-read\n'
+    '5,Beloved,Toni Morrison,0,,to-read\n'
+)
+
+STORYGRAPH_CSV = (
+    'Title,Authors,ISBN/UID,Read Status,Star Rating\n'
+    '"Good Omens","Terry Pratchett, Neil Gaiman",,read,4.5\n'
+)
+
+
+def _upload(client, headers, content):
+    return client.post('/api/imports', headers=headers, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(content.encode()), 'export.csv')})
+
+
+class TestImports:
+    """Tests for the CSV import pipeline"""
+
+    def test_goodreads_import(self, app, client, register):
+        """Rows are mapped, deduped and reported through the job resource"""
+        app.config.update(IMPORT_ASYNC=False, IMPORT_BATCH_SIZE=2)
+        user_id, _, headers = register('importer')
+        db.session.add(Book(title='Piranesi', author='Susanna Clarke', page_count=412))
+        db.session.commit()
+
+        response = _upload(client, headers, GOODREADS_CSV)
+
+        assert response.status_code == 202
+        job = client.get(response.headers['Location'], headers=headers).get_json()
+        assert job['source'] == 'goodreads'
+        assert job['status'] == 'completed'
+        assert (job['rows_processed'], job['books_imported'], job['rows_skipped']) == (5, 3, 2)
+
+        assert Book.query.filter_by(title='Piranesi').count() == 1
+        books = {b['title']: b for b in client.get('/api/books', headers=headers).get_json()}
+        assert books['Piranesi']['status'] == 'read'
+        assert books['Piranesi']['rating'] == 5
+        assert books['Emma']['status'] == 'reading'
+        assert books['Beloved']['status'] == 'wishlist'
+        assert books['Beloved']['rating'] is None
+
+    def test_reimport_skips_owned_books(self, app, client, register):
+        """Importing the same file twice adds nothing the second time"""
+        app.config['IMPORT_ASYNC'] = False
+        user_id, _, headers = register('importer')
+        _upload(client, headers, GOODREADS_CSV)
+
+        job = _upload(client, headers, GOODREADS_CSV).get_json()
+
+        assert db.session.get(ImportJob, job['id']).books_imported == 0
+        assert UserBook.query.filter_by(user_id=user_id).count() == 3
+
+    def test_storygraph_import(self, app, client, auth_headers):
+        """StoryGraph exports keep the first author and half-star ratings"""
+        app.config['IMPORT_ASYNC'] = False
+        headers = auth_headers
+        db.session.add(Book(title='Good Omens', author='Terry Pratchett', page_count=400))
+        db.session.commit()
+
+        _upload(client, headers, STORYGRAPH_CSV)
+
+        [book] = client.get('/api/books', headers=headers).get_json()
+        assert book['author'] == 'Terry Pratchett'
+        assert book['status'] == 'read'
+        assert book['rating'] == 4.5
+
+    def test_finished_without_page_count(self, app, client, auth_headers):
+        """A finished row of a book with no page count stays read and rated, and takes progress updates"""
+        app.config['IMPORT_ASYNC'] = False
+        headers = auth_headers
+
+        _upload(client, headers, STORYGRAPH_CSV)
+
+        [book] = client.get('/api/books', headers=headers).get_json()
+        assert book['total_pages'] is None
+        assert book['status'] == 'read'
+        assert book['rating'] == 4.5
+        assert Book.query.filter_by(title='Good Omens').one().rating_count == 1
+        assert client.get('/api/books?status=read', headers=headers).get_json() == [book]
+
+        # A re-read: no page count to bound the progress, and no longer finished
+        response = client.put(f"/api/books/{book['id']}/progress", json={'page_progress': 120}, headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'reading'
+        assert response.get_json()['page_progress'] == 120
+
+    def test_rejects_unknown_csv(self, client, auth_headers):
+        """Files that are not a known export fail fast"""
+        headers = auth_headers
+
+        response = _upload(client, headers, 'name,value\na,b\n')
+
+        assert response.status_code == 400
+        assert ImportJob.query.count() == 0
+
+    def test_other_users_job_is_hidden(self, app, client, register, auth_headers):
+        """Jobs are only visible to their owner"""
+        app.config['IMPORT_ASYNC'] = False
+        headers = auth_headers
+        job = _upload(client, headers, STORYGRAPH_CSV).get_json()
+
+        response = client.get(f"/api/imports/{job['id']}", headers=register('other').headers)
+
+        assert response.status_code == 404
@@ -0,0 +1,55 @@
+from extensions import metrics
+from services.metrics import Histogram
+
+
+def _sample(text, name, **labels):
+    """Return the value of the first sample matching name and labels"""
+    for line in text.splitlines():
+        if not line.startswith(name + '{'):
+            continue
+        if all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class TestHistogram:
+    """Tests for the fixed-bucket histogram"""
+
+    def test_cumulative_buckets(self):
+        """Test bucket counts are cumulative and end with +Inf"""
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 10):
+            histogram.observe(value)
+
+        assert list(histogram.samples()) == [('1', 2), ('5', 3), ('+Inf', 4)]
+        assert histogram.sum == 14
+
+
+class TestMetricsEndpoint:
+    """Tests for /api/metrics endpoint"""
+
+    def test_records_route_latency(self, client):
+        """Test requests are recorded per route template"""
+        metrics.reset()
+        client.get('/api/health')
+        client.get('/api/health')
+
+        response = client.get('/api/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        text = response.get_data(as_text=True)
+
+        assert _sample(text, 'bookmarkd_http_requests_total', route='/api/health', status='200') == 2
+        assert _sample(text, 'bookmarkd_http_request_duration_seconds_count', route='/api/health') == 2
+        assert _sample(text, 'bookmarkd_http_response_size_bytes_sum', route='/api/health') > 0
+
+    def test_records_sql_statements(self, client, auth_headers):
+        """Test SQL statements are attributed to the request that issued them"""
+        metrics.reset()
+
+        client.get('/api/books', headers=auth_headers)
+        client.get('/api/health')
+
+        text = client.get('/api/metrics').get_data(as_text=True)
+        assert _sample(text, 'bookmarkd_sql_queries_per_request_sum', route='/api/books') >= 1
+        assert _sample(text, 'bookmarkd_sql_queries_per_request_sum', route='/api/health') == 0
@@ -0,0 +1,76 @@
+import json
+import time
+import pytest
+from app import create_app
+from config import config, TestingConfig
+from extensions import db
+from services.profiler import sign_token, verify_token
+
+
+@pytest.fixture
+def profiled_app(monkeypatch, tmp_path):
+    profile = type('ProfilingTestConfig', (TestingConfig,), {
+        'PROFILING_ENABLED': True,
+        'PROFILING_SECRET': 'profiling-secret',
+        'PROFILING_DIR': str(tmp_path),
+        'PROFILING_MAX_DUMPS': 2,
+        'JWT_SECRET_KEY': 'test-secret-key-for-profiling',
+    })
+    monkeypatch.setitem(config, 'profiling_test', profile)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    app = create_app('profiling_test')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _token(expires_in=60):
+    return sign_token('profiling-secret', int(time.time()) + expires_in)
+
+
+class TestRequestProfiler:
+    """Tests for on-demand per-request profiling"""
+
+    def test_signed_request_is_profiled(self, profiled_app, tmp_path, register):
+        """A valid token produces a dump with the profile and SQL timings"""
+        client = profiled_app.test_client()
+        headers = register('slowuser', client).headers
+
+        response = client.get('/api/books', headers={**headers, 'X-Profile-Token': _token()})
+
+        assert response.status_code == 200
+        dump_id = response.headers['X-Profile-Id']
+        assert (tmp_path / f'{dump_id}.prof').exists()
+        dump = json.loads((tmp_path / f'{dump_id}.json').read_text())
+        assert dump['endpoint'] == 'books.get_books'
+        assert dump['sql']['count'] == len(dump['sql']['statements']) >= 1
+        assert 'get_books' in dump['profile']
+
+    def test_unsigned_requests_are_not_profiled(self, profiled_app, tmp_path):
+        """Missing, forged and expired tokens are ignored"""
+        client = profiled_app.test_client()
+        for token in (None, _token().split('.')[0] + '.forged', _token(expires_in=-1)):
+            headers = {'X-Profile-Token': token} if token else {}
+            assert 'X-Profile-Id' not in client.get('/api/health', headers=headers).headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_dumps_are_bounded(self, profiled_app, tmp_path):
+        """Only the newest PROFILING_MAX_DUMPS dumps are kept"""
+        client = profiled_app.test_client()
+        ids = [
+            client.get('/api/health', headers={'X-Profile-Token': _token()}).headers['X-Profile-Id']
+            for _ in range(3)
+        ]
+
+        remaining = sorted(path.name for path in tmp_path.iterdir())
+        assert len(remaining) == 4
+        assert f'{ids[-1]}.json' in remaining
+
+    def test_token_command(self, profiled_app):
+        """flask profile-token prints a header the app accepts"""
+        result = profiled_app.test_cli_runner().invoke(args=['profile-token', '--minutes', '5'])
+
+        name, value = result.output.strip().split(': ')
+        assert name == 'X-Profile-Token'
+        assert verify_token('profiling-secret', value)
@@ -0,0 +1,131 @@
+import os
+import runpy
+import threading
+import pytest
+from config import ProductionConfig
+from extensions import db, progress_buffer
+from models import UserBook
+
+
+@pytest.fixture
+def write_behind(app):
+    app.config['PROGRESS_WRITE_BEHIND'] = True
+    app.config['PROGRESS_FLUSH_SECONDS'] = 0
+    return app
+
+
+def _add_book(client, headers, title='Paged Book', total_pages=300):
+    return client.post('/api/books', json={
+        'title': title, 'author': 'Author', 'total_pages': total_pages,
+        'open_library_id': f'OL-{title}'
+    }, headers=headers).get_json()['id']
+
+
+def _stored_progress(book_id):
+    db.session.expire_all()
+    return db.session.query(UserBook.page_progress).filter_by(book_id=book_id).scalar()
+
+
+class TestProgressWriteBehind:
+    """Tests for write-behind page progress updates"""
+
+    def test_updates_are_coalesced(self, client, write_behind, query_budget, auth_headers):
+        """Repeat updates are acknowledged without SQL and flushed as one row"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        client.put(f'/api/books/{book_id}/progress', json={'page_progress': 1}, headers=headers)
+
+        with query_budget(0):
+            for page in range(2, 41):
+                response = client.put(f'/api/books/{book_id}/progress',
+                                      json={'page_progress': page}, headers=headers)
+                assert response.status_code == 200
+        assert response.get_json()['page_progress'] == 40
+        assert response.get_json()['status'] == 'reading'
+        assert _stored_progress(book_id) == 0
+
+        assert progress_buffer.flush() == 1
+        assert _stored_progress(book_id) == 40
+        assert progress_buffer.stats['updates'] == 40
+        assert progress_buffer.stats['rows_written'] == 1
+
+    def test_reads_see_buffered_progress(self, client, write_behind, auth_headers):
+        """Listing, filtering and rating reflect progress not yet flushed"""
+        headers = auth_headers
+        book_id = _add_book(client, headers, total_pages=100)
+        client.put(f'/api/books/{book_id}/progress', json={'page_progress': 100}, headers=headers)
+
+        [book] = client.get('/api/books?status=read', headers=headers).get_json()
+        assert book['page_progress'] == 100
+        response = client.put(f'/api/books/{book_id}/rating', json={'rating': 4}, headers=headers)
+        assert response.status_code == 200
+        assert progress_buffer.pending() == 0
+
+    def test_flush_on_size_threshold(self, client, write_behind, auth_headers):
+        """Reaching PROGRESS_FLUSH_SIZE pending entries writes them out"""
+        write_behind.config['PROGRESS_FLUSH_SIZE'] = 3
+        headers = auth_headers
+        book_ids = [_add_book(client, headers, title=f'Book {i}') for i in range(3)]
+
+        for book_id in book_ids:
+            client.put(f'/api/books/{book_id}/progress', json={'page_progress': 7}, headers=headers)
+
+        assert progress_buffer.pending() == 0
+        assert [_stored_progress(book_id) for book_id in book_ids] == [7, 7, 7]
+
+    def test_validation_and_removal(self, client, write_behind, auth_headers):
+        """Bounds are still checked and removed books drop their buffered progress"""
+        headers = auth_headers
+        book_id = _add_book(client, headers, total_pages=50)
+
+        response = client.put(f'/api/books/{book_id}/progress', json={'page_progress': 51}, headers=headers)
+        assert response.status_code == 400
+        response = client.put('/api/books/999999/progress', json={'page_progress': 1}, headers=headers)
+        assert response.status_code == 404
+
+        client.put(f'/api/books/{book_id}/progress', json={'page_progress': 10}, headers=headers)
+        client.delete(f'/api/books/{book_id}', headers=headers)
+        assert progress_buffer.pending() == 0
+        response = client.put(f'/api/books/{book_id}/progress', json={'page_progress': 5}, headers=headers)
+        assert response.status_code == 404
+
+    def test_overlapping_flushes_keep_the_newest(self, app, client, write_behind, register, monkeypatch):
+        """A flush started while another is writing waits for its commit, so the newer page wins"""
+        user_id, _, headers = register('pager')
+        book_id = _add_book(client, headers)
+        client.put(f'/api/books/{book_id}/progress', json={'page_progress': 10}, headers=headers)
+        execute = db.session.execute
+        racers = []
+
+        def flush_in_thread():
+            with app.app_context():
+                progress_buffer.flush(user_id)
+
+        def execute_and_race(statement, params=None, **kwargs):
+            if not racers:
+                # While this flush writes page 10, page 20 arrives and is flushed elsewhere
+                client.put(f'/api/books/{book_id}/progress', json={'page_progress': 20}, headers=headers)
+                racers.append(threading.Thread(target=flush_in_thread))
+                racers[0].start()
+                racers[0].join(0.2)
+                assert racers[0].is_alive()
+                assert progress_buffer.pending(user_id) == {book_id: 20}
+            return execute(statement, params, **kwargs)
+
+        monkeypatch.setattr(db.session, 'execute', execute_and_race)
+        progress_buffer.flush()
+        racers[0].join()
+
+        assert _stored_progress(book_id) == 20
+
+    def test_refused_with_several_workers(self, monkeypatch):
+        """gunicorn will not start several workers with per-process buffers"""
+        monkeypatch.setenv('FLASK_CONFIG', 'production')
+        monkeypatch.setattr(ProductionConfig, 'PROGRESS_WRITE_BEHIND', True)
+        conf = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+
+        monkeypatch.setattr(ProductionConfig, 'SERVER_WORKERS', 3)
+        with pytest.raises(RuntimeError, match='single worker'):
+            runpy.run_path(conf)
+        monkeypatch.setattr(ProductionConfig, 'SERVER_WORKERS', 1)
+        assert runpy.run_path(conf)['workers'] == 1
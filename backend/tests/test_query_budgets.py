@@ -0,0 +1,270 @@
+import pytest
+from models import User
+from services.trending import compute_trending
+
+# Maximum SQL statements per request, keyed by endpoint. Lowering a budget
+# after an optimization is encouraged; raising one needs a reason.
+QUERY_BUDGETS = {
+    'auth.register': 3,
+    'auth.login': 1,
+    'auth.logout': 1,
+    'auth.get_current_user': 1,
+    'books.create_book': 4,
+    'books.get_books': 1,
+    'books.delete_book': 2,
+    'books.update_book_progress': 3,
+    'books.update_book_rating': 4,
+    'books.get_book_recommendations': 0,
+    'books.get_trending_books': 1,
+    'goals.create_goal': 2,
+    'goals.get_goals': 4,
+    'goals.update_goal': 5,
+    'goals.delete_goal': 5,
+    'dashboard.get_dashboard': 7,
+    # A year's first session inserts its bitmap inside a SAVEPOINT (+2)
+    'reading.create_session': 7,
+    'reading.get_sessions': 1,
+    'reading.get_streak': 1,
+    'reading.get_heatmap': 1,
+    'follows.follow_user': 3,
+    'follows.unfollow_user': 2,
+    'follows.get_followers': 3,
+    'follows.get_following': 3,
+    'follows.get_suggestions': 5,
+}
+
+BUDGETED_BLUEPRINTS = ('auth', 'books', 'goals', 'dashboard', 'reading', 'follows')
+
+
+def _add_books(client, headers, count):
+    ids = []
+    for i in range(count):
+        response = client.post('/api/books', json={
+            'title': f'Budget Book {i}',
+            'author': 'Author',
+            'total_pages': 100
+        }, headers=headers)
+        ids.append(response.get_json()['id'])
+    return ids
+
+
+class TestBudgetCoverage:
+    """Every route in the budgeted blueprints must declare a budget"""
+
+    def test_every_route_has_budget(self, app):
+        endpoints = {
+            rule.endpoint for rule in app.url_map.iter_rules()
+            if rule.endpoint.split('.')[0] in BUDGETED_BLUEPRINTS
+        }
+
+        assert endpoints - set(QUERY_BUDGETS) == set()
+
+    def test_exceeding_budget_fails(self, app, query_budget):
+        with pytest.raises(AssertionError, match='budget is 1'):
+            with query_budget(1):
+                User.query.all()
+                User.query.all()
+
+
+class TestAuthBudgets:
+    """Query budgets for routes/auth.py"""
+
+    def test_register(self, client, query_budget):
+        with query_budget(QUERY_BUDGETS['auth.register']):
+            response = client.post('/api/auth/register', json={
+                'username': 'newuser',
+                'email': 'new@example.com',
+                'password': 'password123'
+            })
+        assert response.status_code == 201
+
+    def test_login(self, client, sample_user, query_budget):
+        with query_budget(QUERY_BUDGETS['auth.login']):
+            response = client.post('/api/auth/login', json={
+                'email': 'test@example.com',
+                'password': 'password123'
+            })
+        assert response.status_code == 200
+
+    def test_logout(self, client, auth_headers, query_budget):
+        with query_budget(QUERY_BUDGETS['auth.logout']):
+            response = client.post('/api/auth/logout', headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_me(self, client, auth_headers, query_budget):
+        with query_budget(QUERY_BUDGETS['auth.get_current_user']):
+            response = client.get('/api/auth/me', headers=auth_headers)
+        assert response.status_code == 200
+
+
+class TestBookBudgets:
+    """Query budgets for routes/books.py"""
+
+    def test_create_book(self, client, auth_headers, query_budget):
+        with query_budget(QUERY_BUDGETS['books.create_book']):
+            response = client.post('/api/books', json={
+                'title': 'Dune',
+                'author': 'Frank Herbert',
+                'total_pages': 896,
+                'open_library_id': 'OL-BUDGET-1'
+            }, headers=auth_headers)
+        assert response.status_code == 201
+
+    def test_get_books_is_constant(self, client, auth_headers, query_budget):
+        """The budget must hold regardless of library size"""
+        _add_books(client, auth_headers, 5)
+
+        with query_budget(QUERY_BUDGETS['books.get_books']):
+            response = client.get('/api/books', headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.get_json()) == 5
+
+    def test_delete_book(self, client, auth_headers, query_budget):
+        [book_id] = _add_books(client, auth_headers, 1)
+
+        with query_budget(QUERY_BUDGETS['books.delete_book']):
+            response = client.delete(f'/api/books/{book_id}', headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_update_progress(self, client, auth_headers, query_budget):
+        [book_id] = _add_books(client, auth_headers, 1)
+
+        with query_budget(QUERY_BUDGETS['books.update_book_progress']):
+            response = client.put(f'/api/books/{book_id}/progress',
+                json={'page_progress': 100}, headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_update_rating(self, client, auth_headers, query_budget):
+        [book_id] = _add_books(client, auth_headers, 1)
+        client.put(f'/api/books/{book_id}/progress',
+            json={'page_progress': 100}, headers=auth_headers)
+
+        with query_budget(QUERY_BUDGETS['books.update_book_rating']):
+            response = client.put(f'/api/books/{book_id}/rating',
+                json={'rating': 4.5}, headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_trending(self, client, auth_headers, query_budget):
+        _add_books(client, auth_headers, 5)
+        compute_trending()
+
+        with query_budget(QUERY_BUDGETS['books.get_trending_books']):
+            response = client.get('/api/books/trending?limit=50', headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['books']) >= 5
+
+    def test_recommendations(self, client, auth_headers, query_budget, monkeypatch):
+        monkeypatch.delenv('GROQ_API_KEY', raising=False)
+
+        with query_budget(QUERY_BUDGETS['books.get_book_recommendations']):
+            response = client.post('/api/recommendations', json={
+                'genre': 'Sci-Fi', 'length': 'long', 'series': 'no', 'mood': 'hopeful'
+            }, headers=auth_headers)
+        assert response.status_code == 200
+
+
+class TestGoalBudgets:
+    """Query budgets for routes/goals.py"""
+
+    def _create_hour_goal(self, client, headers):
+        # Hour goals are probed last, so they are the worst case for lookups.
+        response = client.post('/api/goals',
+            json={'amount': 10, 'type': 'hours read', 'duration': 'this month'},
+            headers=headers)
+        return response.get_json()['goal']['id']
+
+    def test_create_goal(self, client, auth_headers, query_budget):
+        with query_budget(QUERY_BUDGETS['goals.create_goal']):
+            response = client.post('/api/goals',
+                json={'amount': 5, 'type': 'books read', 'duration': 'this year'},
+                headers=auth_headers)
+        assert response.status_code == 201
+
+    def test_get_goals(self, client, auth_headers, query_budget):
+        self._create_hour_goal(client, auth_headers)
+
+        with query_budget(QUERY_BUDGETS['goals.get_goals']):
+            response = client.get('/api/goals', headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_update_goal(self, client, auth_headers, query_budget):
+        goal_id = self._create_hour_goal(client, auth_headers)
+
+        with query_budget(QUERY_BUDGETS['goals.update_goal']):
+            response = client.put(f'/api/goals/{goal_id}',
+                json={'progress': 3}, headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_delete_goal(self, client, auth_headers, query_budget):
+        goal_id = self._create_hour_goal(client, auth_headers)
+
+        with query_budget(QUERY_BUDGETS['goals.delete_goal']):
+            response = client.delete(f'/api/goals/{goal_id}', headers=auth_headers)
+        assert response.status_code == 200
+
+
+class TestDashboardBudgets:
+    """Query budgets for routes/dashboard.py"""
+
+    def test_get_dashboard_is_constant(self, client, auth_headers, query_budget):
+        """The budget must hold however many books, goals and clubs there are"""
+        _add_books(client, auth_headers, 5)
+        for goal_type in ('books read', 'pages read', 'hours read', 'books read'):
+            client.post('/api/goals', json={'amount': 10, 'type': goal_type, 'duration': 'this year'},
+                        headers=auth_headers)
+
+        with query_budget(QUERY_BUDGETS['dashboard.get_dashboard']):
+            response = client.get('/api/dashboard', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()['library']['total_books'] == 5
+        assert len(response.get_json()['goals']) == 4
+
+
+class TestReadingBudgets:
+    """Query budgets for routes/reading.py"""
+
+    def test_reading_routes(self, client, auth_headers, query_budget):
+        """Streaks and heatmaps read the bitmaps, not the sessions, however many there are"""
+        [book_id] = _add_books(client, auth_headers, 1)
+        for day in ('2024-12-31', '2025-07-01', '2026-01-01', '2026-01-02'):
+            with query_budget(QUERY_BUDGETS['reading.create_session']):
+                response = client.post('/api/reading/sessions', json={
+                    'book_id': book_id,
+                    'started_at': f'{day}T20:00:00+00:00',
+                    'ended_at': f'{day}T21:00:00+00:00',
+                }, headers=auth_headers)
+            assert response.status_code == 201
+
+        with query_budget(QUERY_BUDGETS['reading.get_sessions']):
+            assert len(client.get('/api/reading/sessions', headers=auth_headers).get_json()) == 4
+        with query_budget(QUERY_BUDGETS['reading.get_streak']):
+            response = client.get('/api/reading/streak?today=2026-01-02', headers=auth_headers)
+        assert response.get_json()['active_days'] == 4
+        with query_budget(QUERY_BUDGETS['reading.get_heatmap']):
+            response = client.get('/api/reading/heatmap?year=2026', headers=auth_headers)
+        assert response.get_json()['active_days'] == 2
+
+
+class TestFollowBudgets:
+    """Query budgets for routes/follows.py"""
+
+    def test_follow_routes(self, client, register, auth_headers, query_budget):
+        """Suggestions take a fixed number of queries, whatever the graph"""
+        me = client.get('/api/auth/me', headers=auth_headers).get_json()['user']['id']
+        friends = [register(f'friend{i}') for i in range(6)]
+        for friend in friends[:3]:
+            with query_budget(QUERY_BUDGETS['follows.follow_user']):
+                assert client.post(f'/api/users/{friend.user_id}/follow', headers=auth_headers).status_code == 201
+        for friend in friends[:3]:
+            for other in friends[3:]:
+                client.post(f'/api/users/{other.user_id}/follow', headers=friend.headers)
+
+        with query_budget(QUERY_BUDGETS['follows.get_suggestions']):
+            assert len(client.get('/api/users/suggestions', headers=auth_headers).get_json()) == 3
+        with query_budget(QUERY_BUDGETS['follows.get_following']):
+            assert client.get(f'/api/users/{me}/following', headers=auth_headers).get_json()['total'] == 3
+        with query_budget(QUERY_BUDGETS['follows.get_followers']):
+            response = client.get(f'/api/users/{friends[3].user_id}/followers', headers=auth_headers)
+        assert response.get_json()['total'] == 3
+        with query_budget(QUERY_BUDGETS['follows.unfollow_user']):
+            assert client.delete(f'/api/users/{friends[0].user_id}/follow', headers=auth_headers).status_code == 200
@@ -0,0 +1,82 @@
+import pytest
+from services.rate_limit import MemoryBackend, parse_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestParseLimit:
+    """Tests for rate limit spec parsing"""
+
+    def test_parse_formats(self):
+        """Test both supported spellings"""
+        assert parse_limit('10/minute') == (10, 60)
+        assert parse_limit('5 per hour') == (5, 3600)
+        assert parse_limit('2/seconds') == (2, 1)
+
+    def test_parse_invalid(self):
+        """Test malformed specs are rejected"""
+        with pytest.raises(ValueError):
+            parse_limit('ten/minute')
+        with pytest.raises(ValueError):
+            parse_limit('10/fortnight')
+
+
+class TestMemoryBackend:
+    """Tests for the in-process token bucket backend"""
+
+    def test_bucket_exhausts_and_refills(self):
+        """Test requests are refused once the bucket is empty and allowed after refill"""
+        clock = FakeClock()
+        backend = MemoryBackend(clock=clock)
+
+        assert backend.hit('k', 2, 60)[0] is True
+        assert backend.hit('k', 2, 60)[0] is True
+        allowed, remaining, retry_after = backend.hit('k', 2, 60)
+        assert allowed is False
+        assert remaining == 0
+        assert retry_after == 30
+
+        clock.now += 30
+        assert backend.hit('k', 2, 60)[0] is True
+
+    def test_keys_are_bounded(self):
+        """Test least recently used keys are evicted past max_keys"""
+        backend = MemoryBackend(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            backend.hit(key, 1, 60)
+
+        assert len(backend) == 2
+        # 'a' was evicted, so it starts with a full bucket again
+        assert backend.hit('a', 1, 60)[0] is True
+
+
+class TestLoginRateLimit:
+    """Tests for throttling on /auth/login"""
+
+    def test_login_throttled(self, client, app):
+        """Test login returns 429 with Retry-After once the limit is hit"""
+        app.config['RATELIMIT_LIMITS'] = {'auth.login': '2/minute'}
+        payload = {'email': 'nobody@example.com', 'password': 'password123'}
+
+        assert client.post('/api/auth/login', json=payload).status_code == 401
+        assert client.post('/api/auth/login', json=payload).status_code == 401
+        response = client.post('/api/auth/login', json=payload)
+
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        assert 'too many' in response.get_json()['error'].lower()
+
+    def test_limit_disabled(self, client, app):
+        """Test RATELIMIT_ENABLED turns throttling off"""
+        app.config['RATELIMIT_ENABLED'] = False
+        app.config['RATELIMIT_LIMITS'] = {'auth.login': '1/minute'}
+        payload = {'email': 'nobody@example.com', 'password': 'password123'}
+
+        for _ in range(3):
+            assert client.post('/api/auth/login', json=payload).status_code == 401
@@ -0,0 +1,55 @@
+from extensions import db
+from models import Book, UserBook
+from services.ratings import rebuild_rating_aggregates
+
+
+def _finish_and_rate(client, headers, rating):
+    book = client.post('/api/books', json={
+        'title': 'Rated Book', 'author': 'Author', 'total_pages': 100,
+        'open_library_id': 'OL-RATED', 'page_progress': 100
+    }, headers=headers).get_json()
+    response = client.put(f"/api/books/{book['id']}/rating", json={'rating': rating}, headers=headers)
+    return book['id'], response
+
+
+class TestRatingAggregates:
+    """Tests for the denormalized per-book rating aggregates"""
+
+    def test_ratings_update_aggregates(self, client, register):
+        """Rating, re-rating and removing a book keep sum, count and histogram exact"""
+        alice, bob = register('alice_r').headers, register('bob_r').headers
+        book_id, _ = _finish_and_rate(client, alice, 4.5)
+        _, response = _finish_and_rate(client, bob, 3)
+
+        assert response.get_json()['community_rating'] == {
+            'average': 3.75, 'count': 2, 'histogram': [0, 0, 0, 1, 1, 0]
+        }
+
+        client.put(f'/api/books/{book_id}/rating', json={'rating': 5}, headers=bob)
+        client.delete(f'/api/books/{book_id}', headers=alice)
+
+        [book] = client.get('/api/books', headers=bob).get_json()
+        assert book['community_rating'] == {'average': 5.0, 'count': 1, 'histogram': [0, 0, 0, 0, 0, 1]}
+
+    def test_rebuild_fixes_drift(self, client, auth_headers):
+        """The rebuild recomputes aggregates written around the API"""
+        headers = auth_headers
+        book_id, _ = _finish_and_rate(client, headers, 2)
+        book = db.session.get(Book, book_id)
+        book.rating_count = 7
+        db.session.commit()
+
+        assert rebuild_rating_aggregates(verify_only=True)['mismatched'] == 1
+        report = rebuild_rating_aggregates()
+
+        assert report['fixed'] == 1
+        assert rebuild_rating_aggregates(verify_only=True)['mismatched'] == 0
+        db.session.refresh(book)
+        assert (book.rating_count, book.rating_sum, book.rating_hist_2) == (1, 2.0, 1)
+
+    def test_seeded_aggregates_are_consistent(self, app, runner):
+        """Seeded ratings are reflected in the aggregates"""
+        result = runner.invoke(args=['rebuild-ratings', '--verify'])
+
+        assert result.exit_code == 0, result.output
+        assert '0 out of date' in result.output
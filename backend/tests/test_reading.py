@@ -0,0 +1,138 @@
+from datetime import date
+from extensions import db
+from models import ReadingActivity
+from services import reading_activity
+from services.reading_activity import longest_run, record_activity, trailing_run
+
+
+def _add_book(client, headers):
+    return client.post('/api/books', json={
+        'title': 'Session Book', 'author': 'Author', 'total_pages': 300
+    }, headers=headers).get_json()['id']
+
+
+def _read(client, headers, book_id, day, start='20:00:00', end='20:30:00', offset='+00:00'):
+    return client.post('/api/reading/sessions', json={
+        'book_id': book_id,
+        'started_at': f'{day}T{start}{offset}',
+        'ended_at': f'{day}T{end}{offset}' if 'T' not in end else f'{end}{offset}',
+        'pages_read': 12,
+    }, headers=headers)
+
+
+class TestBitOperations:
+    """Tests for the run-length helpers"""
+
+    def test_runs(self):
+        """Trailing and longest runs of set bits"""
+        bits = 0b1110_0111_1101
+        assert trailing_run(bits, 0) == 1
+        assert trailing_run(bits, 1) == 0
+        assert trailing_run(bits, 4) == 3
+        assert trailing_run(bits, 11) == 3
+        assert longest_run(bits) == 5
+        assert longest_run(0) == 0
+
+
+class TestReadingSessions:
+    """Tests for logging sessions and the activity bitmaps"""
+
+    def test_log_and_list(self, client, auth_headers):
+        """Sessions are stored in UTC and listed newest first"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        response = _read(client, headers, book_id, '2026-03-01', offset='-05:00')
+        assert response.status_code == 201
+        assert response.get_json()['started_at'] == '2026-03-02T01:00:00Z'
+        assert response.get_json()['minutes'] == 30
+        _read(client, headers, book_id, '2026-03-05')
+
+        sessions = client.get('/api/reading/sessions?limit=1', headers=headers).get_json()
+        assert [s['started_at'] for s in sessions] == ['2026-03-05T20:00:00Z']
+        assert sessions[0]['title'] == 'Session Book'
+
+    def test_validation(self, client, auth_headers):
+        """Bad timestamps, lengths and books are rejected"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        assert _read(client, headers, book_id, '2026-03-01', start='21:00:00').status_code == 400
+        assert _read(client, headers, book_id, '2026-03-01', end='2026-03-03T20:00:00').status_code == 400
+        assert _read(client, headers, book_id, 'yesterday').status_code == 400
+        assert _read(client, headers, 999999, '2026-03-01').status_code == 404
+        assert _read(client, headers, str(book_id), '2026-03-01').status_code == 400
+        assert _read(client, headers, [book_id], '2026-03-01').status_code == 400
+
+    def test_local_dates_are_marked(self, client, app, auth_headers):
+        """The reader's local dates are set, including every day a session spans"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        # 23:30 on Dec 31 in UTC-5 is Jan 1 in UTC; the local date counts
+        _read(client, headers, book_id, '2025-12-31', start='23:30:00', end='2026-01-01T00:30:00', offset='-05:00')
+
+        heatmap = client.get('/api/reading/heatmap?year=2025', headers=headers).get_json()
+        assert heatmap['dates'] == ['2025-12-31']
+        heatmap = client.get('/api/reading/heatmap?year=2026', headers=headers).get_json()
+        assert heatmap == {'year': 2026, 'active_days': 1, 'dates': ['2026-01-01']}
+
+        with app.app_context():
+            rows = db.session.query(ReadingActivity).filter(ReadingActivity.year == 2025).all()
+            assert all(len(row.days) == 46 for row in rows)
+
+
+    def test_concurrent_first_session_of_the_year(self, client, app, monkeypatch, auth_headers):
+        """Losing the race to create a year's row merges into the winner's row"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        _read(client, headers, book_id, '2026-03-01')
+        user_id = db.session.query(ReadingActivity.user_id).filter_by(year=2026).order_by(
+            ReadingActivity.user_id.desc()).scalar()
+
+        # The row did not exist when looked up, but exists by the time of the insert
+        lookups = iter([None])
+        locked_row = reading_activity._locked_row
+        monkeypatch.setattr(reading_activity, '_locked_row',
+                            lambda *args: next(lookups, None) or locked_row(*args))
+        record_activity(user_id, date(2026, 3, 2), date(2026, 3, 2))
+        db.session.commit()
+
+        heatmap = client.get('/api/reading/heatmap?year=2026', headers=headers).get_json()
+        assert heatmap['dates'] == ['2026-03-01', '2026-03-02']
+
+    def test_sessions_count_towards_hour_goals(self, client, auth_headers):
+        """Session time is added to unfinished hour goals"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        goal = client.post('/api/goals', json={
+            'amount': 10, 'type': 'hours read', 'duration': 'this year'
+        }, headers=headers).get_json()['goal']
+        _read(client, headers, book_id, '2026-03-01', start='20:00:00', end='21:30:00')
+
+        [listed] = [g for g in client.get('/api/goals', headers=headers).get_json()['goals'] if g['id'] == goal['id']]
+        assert listed['progress'] == 1.5
+        assert listed['version'] == goal['version'] + 1
+
+
+class TestStreaks:
+    """Tests for streaks computed from the bitmaps"""
+
+    def test_streaks_across_years(self, client, auth_headers):
+        """Runs continue over a year boundary; today may still be unread"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        for day in ['2025-06-01', '2025-06-02', '2025-12-30', '2025-12-31', '2026-01-01', '2026-01-02']:
+            _read(client, headers, book_id, day)
+        # The same day twice counts once
+        _read(client, headers, book_id, '2026-01-02', start='08:00:00', end='09:00:00')
+
+        streak = client.get('/api/reading/streak?today=2026-01-03', headers=headers).get_json()
+        assert streak == {'current': 4, 'longest': 4, 'active_days': 6, 'last_active': '2026-01-02'}
+        streak = client.get('/api/reading/streak?today=2026-01-04', headers=headers).get_json()
+        assert streak['current'] == 0
+        streak = client.get('/api/reading/streak?today=2025-06-02', headers=headers).get_json()
+        assert streak == {'current': 2, 'longest': 2, 'active_days': 2, 'last_active': '2025-06-02'}
+
+    def test_no_activity(self, client, auth_headers):
+        """A reader without sessions has empty streaks"""
+        headers = auth_headers
+        assert client.get('/api/reading/streak', headers=headers).get_json()['current'] == 0
+        assert client.get('/api/reading/streak?today=soon', headers=headers).status_code == 400
@@ -0,0 +1,113 @@
+import shutil
+import pytest
+from app import create_app
+from config import config, Config
+from extensions import db, replica_router
+from services.replica import STICKY_COOKIE
+
+
+@pytest.fixture
+def replica_app(monkeypatch, tmp_path, register):
+    """App with two SQLite files standing in for primary and replica"""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    profile = type('ReplicaTestConfig', (Config,), {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}',
+        'SQLALCHEMY_BINDS': {'replica': f'sqlite:///{replica}'},
+        'SEED_DATABASE': False,
+        'JWT_SECRET_KEY': 'test-secret-key-for-replica-routing',
+    })
+    monkeypatch.setitem(config, 'replica_test', profile)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    app = create_app('replica_test')
+
+    client = app.test_client()
+    headers = register('reader', client).headers
+    client.post('/api/books', json={'title': 'Replicated', 'author': 'A', 'total_pages': 10}, headers=headers)
+
+    # "Replicate" the primary, then let the user's sticky window lapse
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    shutil.copy(primary, replica)
+    replica_router._recent_writes.clear()
+    client.delete_cookie(STICKY_COOKIE)
+
+    yield app, client, headers
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # init_app registered a metadata for the bind on the shared db object;
+    # drop it so later apps without a replica don't try to create/drop it.
+    db.metadatas.pop('replica', None)
+
+
+class TestReplicaRouting:
+    """Tests for read-replica routing of read-only endpoints"""
+
+    def test_reads_go_to_replica(self, replica_app):
+        """Test a read-only endpoint does not see rows only on the primary"""
+        app, client, headers = replica_app
+        client.post('/api/books', json={'title': 'Primary only', 'author': 'A', 'total_pages': 10},
+            headers=headers)
+        replica_router._recent_writes.clear()
+        client.delete_cookie(STICKY_COOKIE)
+
+        titles = [b['title'] for b in client.get('/api/books', headers=headers).get_json()]
+
+        assert titles == ['Replicated']
+
+    def test_read_your_writes(self, replica_app):
+        """Test a user's own mutation pins their reads to the primary"""
+        app, client, headers = replica_app
+        client.post('/api/books', json={'title': 'Just added', 'author': 'A', 'total_pages': 10},
+            headers=headers)
+
+        titles = [b['title'] for b in client.get('/api/books', headers=headers).get_json()]
+
+        assert 'Just added' in titles
+
+    def test_read_your_writes_on_another_worker(self, replica_app):
+        """Test the signed cookie keeps reads on the primary in a process that did not take the write"""
+        app, client, headers = replica_app
+        client.post('/api/books', json={'title': 'Elsewhere', 'author': 'A', 'total_pages': 10},
+            headers=headers)
+        # Another worker has none of this process's in-memory marks
+        replica_router._recent_writes.clear()
+
+        titles = [b['title'] for b in client.get('/api/books', headers=headers).get_json()]
+        assert 'Elsewhere' in titles
+
+        # A tampered cookie does not pin the reader
+        cookie = client.get_cookie(STICKY_COOKIE).value
+        client.set_cookie(STICKY_COOKIE, cookie[:-2] + 'xx')
+        titles = [b['title'] for b in client.get('/api/books', headers=headers).get_json()]
+        assert 'Elsewhere' not in titles
+
+    def test_sticky_window_expires(self, replica_app):
+        """Test reads return to the replica once the sticky window has passed"""
+        app, client, headers = replica_app
+        app.config['REPLICA_STICKY_SECONDS'] = 0
+        client.post('/api/books', json={'title': 'Lagging', 'author': 'A', 'total_pages': 10},
+            headers=headers)
+
+        titles = [b['title'] for b in client.get('/api/books', headers=headers).get_json()]
+
+        assert 'Lagging' not in titles
+
+    def test_writes_go_to_primary(self, replica_app):
+        """Test mutations are never sent to the replica"""
+        app, client, headers = replica_app
+        response = client.post('/api/goals',
+            json={'amount': 3, 'type': 'books read', 'duration': 'this year'}, headers=headers)
+        assert response.status_code == 201
+
+        with app.app_context():
+            primary, replica = db.engines[None], db.engines['replica']
+            count = 'SELECT COUNT(*) FROM book_goal'
+            with primary.connect() as conn:
+                assert conn.execute(db.text(count)).scalar() == 1
+            with replica.connect() as conn:
+                assert conn.execute(db.text(count)).scalar() == 0
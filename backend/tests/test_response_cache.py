@@ -0,0 +1,108 @@
+import pytest
+from services.response_cache import ENTRY_OVERHEAD, MemoryBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cached_app(app):
+    app.config['RESPONSE_CACHE_ENABLED'] = True
+    return app
+
+
+class TestMemoryBackend:
+    """Tests for the in-process response cache backend"""
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """The byte budget holds; recently read entries survive eviction"""
+        body = b'x' * 100
+        backend = MemoryBackend(max_bytes=10 * (len(body) + 1 + ENTRY_OVERHEAD))
+        for key in 'abcdefghij':
+            backend.set('1', key, (body, 'application/json'), 0)
+        backend.get('1', 'a')
+        backend.set('1', 'k', (body, 'application/json'), 0)
+        backend.set('1', 'huge', (b'x' * backend.max_bytes, 'application/json'), 0)
+
+        assert backend.get('1', 'b') is None
+        assert backend.get('1', 'a') is not None
+        assert backend.get('1', 'huge') is None
+        assert backend.stats()['evictions'] == 1
+        assert backend.stats()['bytes'] <= backend.max_bytes
+
+    def test_invalidation_and_stale_generations(self):
+        """A response computed before an invalidation is not stored"""
+        backend = MemoryBackend()
+        backend.set('1', 'k', (b'old', 'application/json'), backend.generation('1'))
+        backend.set('2', 'k', (b'other', 'application/json'), backend.generation('2'))
+        started = backend.generation('1')
+        backend.invalidate('1')
+        backend.set('1', 'k', (b'stale', 'application/json'), started)
+
+        assert backend.get('1', 'k') is None
+        assert backend.get('2', 'k') is not None
+        assert len(backend) == 1
+
+    def test_entries_expire(self):
+        """Entries are dropped once their TTL has passed"""
+        clock = FakeClock()
+        backend = MemoryBackend(ttl=10, clock=clock)
+        backend.set('1', 'k', (b'body', 'application/json'), 0)
+        clock.now = 10
+
+        assert backend.get('1', 'k') is None
+        assert backend.stats()['bytes'] == 0
+
+
+class TestResponseCache:
+    """Tests for cached library and goal reads"""
+
+    def test_reads_are_cached_per_user(self, client, cached_app, query_budget, register):
+        """Repeat reads are served without SQL, separately for each user"""
+        alice, bob = register('alice_c').headers, register('bob_c').headers
+        client.post('/api/books', json={'title': 'Mine', 'author': 'A', 'total_pages': 10}, headers=alice)
+
+        assert client.get('/api/books', headers=alice).headers['X-Cache'] == 'MISS'
+        with query_budget(0):
+            response = client.get('/api/books', headers=alice)
+        assert response.headers['X-Cache'] == 'HIT'
+        assert [b['title'] for b in response.get_json()] == ['Mine']
+        assert client.get('/api/books', headers=bob).get_json() == []
+        assert client.get('/api/books?fields=title', headers=alice).headers['X-Cache'] == 'MISS'
+
+    def test_mutations_invalidate(self, client, cached_app, auth_headers):
+        """Book and goal writes are visible on the next read"""
+        headers = auth_headers
+        client.get('/api/books', headers=headers)
+        client.get('/api/goals', headers=headers)
+
+        book = client.post('/api/books', json={
+            'title': 'New', 'author': 'A', 'total_pages': 10
+        }, headers=headers).get_json()
+        client.put(f"/api/books/{book['id']}/progress", json={'page_progress': 4}, headers=headers)
+        [listed] = client.get('/api/books', headers=headers).get_json()
+        assert listed['page_progress'] == 4
+
+        goal = client.post('/api/goals', json={
+            'amount': 3, 'type': 'books read', 'duration': 'this year'
+        }, headers=headers).get_json()['goal']
+        client.get('/api/goals', headers=headers)
+        client.put(f"/api/goals/{goal['id']}", json={'progress': 1}, headers=headers)
+        response = client.get('/api/goals', headers=headers)
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.get_json()['goals'][0]['progress'] == 1
+
+    def test_hit_ratio_metrics(self, client, cached_app, auth_headers):
+        """Hits, misses and the hit ratio are exported with the other metrics"""
+        headers = auth_headers
+        for _ in range(4):
+            client.get('/api/goals', headers=headers)
+
+        body = client.get('/api/metrics').get_data(as_text=True)
+        assert 'bookmarkd_response_cache_hits_total 3' in body
+        assert 'bookmarkd_response_cache_hit_ratio 0.75' in body
@@ -0,0 +1,107 @@
+import time
+from flask_jwt_extended import decode_token
+from extensions import db, revocation_store
+from models import RevokedToken
+from services.revocation import BloomFilter
+from services.scheduler import PeriodicJob
+
+
+class TestBloomFilter:
+    """Tests for the revocation Bloom filter"""
+
+    def test_no_false_negatives(self):
+        """Every added item is reported present; unseen items mostly are not"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+
+        assert all(f'jti-{i}' in bloom for i in range(1000))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+class TestLogout:
+    """Tests for server-side token revocation"""
+
+    def test_logout_revokes_token(self, client, register):
+        """A logged-out token is rejected while other tokens keep working"""
+        token = register().token
+        other = register('bystander').token
+        headers = {'Authorization': f'Bearer {token}'}
+
+        assert client.post('/api/auth/logout', headers=headers).status_code == 200
+
+        assert client.get('/api/auth/me', headers=headers).status_code == 401
+        assert client.get('/api/auth/me', headers={'Authorization': f'Bearer {other}'}).status_code == 200
+        assert RevokedToken.query.count() == 1
+
+    def test_valid_tokens_skip_the_database(self, app, client, query_budget, monkeypatch, register):
+        """Checking a token issues no SQL; syncing happens on a background thread"""
+        started = []
+        monkeypatch.setattr(PeriodicJob, 'start', lambda job, app, interval: started.append(job.name))
+        app.config['REVOCATION_SYNC_SECONDS'] = 60
+        token = register().token
+        headers = {'Authorization': f'Bearer {token}'}
+
+        # /me itself loads the user: one statement, none for the token check
+        for _ in range(2):
+            with query_budget(1):
+                response = client.get('/api/auth/me', headers=headers)
+            assert response.status_code == 200
+        assert started == ['revocation-sync']
+
+    def test_sync_picks_up_other_processes(self, app, client, monkeypatch, register):
+        """Revocations written by another process are applied by start() and each sync"""
+        monkeypatch.setattr(PeriodicJob, 'start', lambda job, app, interval: None)
+        app.config['REVOCATION_SYNC_SECONDS'] = 60
+        first, second = register().token, register('second').token
+        db.session.add(RevokedToken(jti=decode_token(first)['jti']))
+        db.session.commit()
+
+        revocation_store.start(app)
+        assert client.get('/api/auth/me', headers={'Authorization': f'Bearer {first}'}).status_code == 401
+
+        db.session.add(RevokedToken(jti=decode_token(second)['jti']))
+        db.session.commit()
+        revocation_store._sync_and_compact()
+        assert client.get('/api/auth/me', headers={'Authorization': f'Bearer {second}'}).status_code == 401
+
+    def test_sync_picks_up_late_commits(self, app, monkeypatch, register):
+        """A revocation committed after a higher id was synced is still applied"""
+        monkeypatch.setattr(PeriodicJob, 'start', lambda job, app, interval: None)
+        app.config['REVOCATION_SYNC_SECONDS'] = 60
+        first, second = register().token, register('second').token
+        db.session.add(RevokedToken(id=10, jti=decode_token(first)['jti']))
+        db.session.commit()
+        revocation_store.sync()
+
+        # A concurrent logout took a lower id but committed after that sync
+        db.session.add(RevokedToken(id=5, jti=decode_token(second)['jti']))
+        db.session.commit()
+        revocation_store.sync()
+
+        assert revocation_store.is_revoked(decode_token(first)['jti'])
+        assert revocation_store.is_revoked(decode_token(second)['jti'])
+
+    def test_logout_already_revoked_elsewhere(self, client, register):
+        """A second logout with a token another process already revoked succeeds"""
+        token = register().token
+        db.session.add(RevokedToken(jti=decode_token(token)['jti']))
+        db.session.commit()
+
+        response = client.post('/api/auth/logout', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+        assert RevokedToken.query.count() == 1
+
+    def test_compaction_drops_expired(self, app):
+        """Expired revocations are removed from memory and the table"""
+        revocation_store.revoke('expired', time.time() - 1)
+        revocation_store.revoke('live', time.time() + 60)
+        db.session.commit()
+
+        revocation_store.compact()
+
+        assert not revocation_store.is_revoked('expired')
+        assert revocation_store.is_revoked('live')
+        assert len(revocation_store) == 1
+        assert [r.jti for r in RevokedToken.query] == ['live']
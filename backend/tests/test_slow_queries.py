@@ -0,0 +1,98 @@
+import json
+import logging
+import time
+import pytest
+from app import create_app
+from config import config, ProductionConfig, TestingConfig
+from extensions import db, slow_queries
+from services.profiler import HEADER, sign_token
+
+
+@pytest.fixture
+def logged_app(monkeypatch):
+    profile = type('SlowQueryTestConfig', (TestingConfig,), {
+        # Everything counts as slow
+        'SLOW_QUERY_THRESHOLD_MS': 1e-6,
+        'SLOW_QUERY_ENDPOINT_ENABLED': True,
+        'JWT_SECRET_KEY': 'test-secret-key-for-slow-queries',
+    })
+    monkeypatch.setitem(config, 'slow_query_test', profile)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    app = create_app('slow_query_test')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    # Later apps configure the shared extension afresh; make sure it is off
+    slow_queries._threshold = 0.0
+
+
+class TestSlowQueryLog:
+    """Tests for the slow-query log and its summary"""
+
+    def test_logs_statement_route_and_plan(self, logged_app, caplog, register):
+        """Slow statements are logged as JSON with the route and query plan"""
+        client = logged_app.test_client()
+        headers = register('sloth', client).headers
+
+        with caplog.at_level(logging.WARNING, logger='bookmarkd.slow_query'):
+            client.get('/api/goals', headers=headers)
+
+        records = [json.loads(r.getMessage()) for r in caplog.records if r.name == 'bookmarkd.slow_query']
+        goal_reads = [r for r in records if 'FROM book_goal' in r['statement']]
+        assert goal_reads
+        assert goal_reads[0]['route'] == 'GET /api/goals'
+        assert any('ix_book_goal_user_id' in line for line in goal_reads[0]['plan'])
+
+    def test_parameter_values_not_logged(self, logged_app, caplog, register):
+        """Only parameter types are logged unless SLOW_QUERY_LOG_PARAMETERS is set"""
+        client = logged_app.test_client()
+        with caplog.at_level(logging.WARNING, logger='bookmarkd.slow_query'):
+            register('secretive', client)
+
+        records = [json.loads(r.getMessage()) for r in caplog.records if r.name == 'bookmarkd.slow_query']
+        assert records
+        assert not any('secretive' in json.dumps(r['parameters']) for r in records)
+        user_lookup = next(r for r in records if 'FROM user' in r['statement'] and r['parameters']['count'])
+        assert user_lookup['parameters']['types'][0] == 'str'
+
+        slow_queries._log_parameters = True
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger='bookmarkd.slow_query'):
+            client.post('/api/auth/login', json={'email': 'secretive@example.com', 'password': 'wrong'})
+        assert any('secretive' in r.getMessage() for r in caplog.records if r.name == 'bookmarkd.slow_query')
+
+    def test_summary_endpoint(self, logged_app, register):
+        """The worst statements are listed with their routes and plans"""
+        client = logged_app.test_client()
+        headers = register('sloth', client).headers
+        for _ in range(3):
+            client.get('/api/books', headers=headers)
+
+        admin = {HEADER: sign_token(logged_app.config['SECRET_KEY'], int(time.time()) + 60)}
+        response = client.get('/api/slow-queries?sort=count&limit=5', headers=admin)
+        statements = response.get_json()['statements']
+
+        assert response.status_code == 200
+        assert len(statements) <= 5
+        assert [s['count'] for s in statements] == sorted((s['count'] for s in statements), reverse=True)
+        listing = next(s for s in statements if 'GET /api/books' in s['routes'])
+        assert listing['count'] >= 3 and listing['plan']
+        assert client.get('/api/slow-queries?sort=bogus', headers=admin).status_code == 400
+
+    def test_summary_requires_admin_token(self, logged_app):
+        """The summary is refused without a valid signed token"""
+        client = logged_app.test_client()
+        expired = {HEADER: sign_token(logged_app.config['SECRET_KEY'], int(time.time()) - 1)}
+        assert client.get('/api/slow-queries').status_code == 401
+        assert client.get('/api/slow-queries', headers=expired).status_code == 401
+        assert client.get('/api/slow-queries', headers={HEADER: '9999999999.forged'}).status_code == 401
+
+    def test_disabled_by_default(self, client):
+        """Without a threshold nothing is recorded and the summary is hidden"""
+        assert client.get('/api/slow-queries').status_code == 404
+
+    def test_endpoint_off_in_production(self):
+        """Production logs slow queries but does not serve the summary unless asked"""
+        assert ProductionConfig.SLOW_QUERY_THRESHOLD_MS > 0
+        assert ProductionConfig.SLOW_QUERY_ENDPOINT_ENABLED is False
@@ -0,0 +1,103 @@
+import fcntl
+from datetime import date, timedelta
+from app import create_app, start_background_jobs
+from extensions import db, trending
+from models import Book, UserBook, User, TrendingBook
+from services.scheduler import acquire_lock
+from services.trending import compute_trending
+
+TODAY = date(2026, 3, 1)
+
+
+def _reader(n):
+    user = User(username=f'trend{n}', email=f'trend{n}@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def _add(user, book, days_ago, rating=None):
+    db.session.add(UserBook(user_id=user.user_id, book_id=book.book_id,
+                            add_date=TODAY - timedelta(days=days_ago), user_rating=rating))
+
+
+class TestTrending:
+    """Tests for the precomputed trending snapshot"""
+
+    def _catalog(self):
+        UserBook.query.delete()
+        fresh = Book(title='Fresh', author='A', page_count=10, genre='Fantasy')
+        old_hit = Book(title='Old Hit', author='B', page_count=10, genre='Fantasy')
+        loved = Book(title='Loved', author='C', page_count=10, genre='History')
+        db.session.add_all([fresh, old_hit, loved])
+        db.session.flush()
+        readers = [_reader(n) for n in range(4)]
+        for reader in readers[:2]:
+            _add(reader, fresh, days_ago=1)
+        for reader in readers:
+            _add(reader, old_hit, days_ago=60)
+        _add(readers[0], loved, days_ago=1, rating=5)
+        _add(readers[1], loved, days_ago=200)  # outside the window
+        db.session.commit()
+        return fresh, old_hit, loved
+
+    def test_recent_additions_outrank_old_ones(self, app):
+        """Decay favours recent activity, ratings add weight, and genres rank separately"""
+        fresh, old_hit, loved = self._catalog()
+
+        report = compute_trending(top_n=10, half_life_days=7, window_days=90, today=TODAY)
+
+        assert report['books_scored'] == 3
+        overall = TrendingBook.query.filter_by(genre='').order_by(TrendingBook.rank).all()
+        assert [t.book_id for t in overall] == [fresh.book_id, loved.book_id, old_hit.book_id]
+        fantasy = TrendingBook.query.filter_by(genre='Fantasy').order_by(TrendingBook.rank).all()
+        assert [t.book_id for t in fantasy] == [fresh.book_id, old_hit.book_id]
+
+    def test_snapshot_is_replaced(self, app):
+        """Each run replaces the previous snapshot and respects top_n"""
+        self._catalog()
+        compute_trending(top_n=10, today=TODAY)
+
+        compute_trending(top_n=1, today=TODAY)
+
+        assert TrendingBook.query.filter_by(genre='').count() == 1
+
+    def test_endpoint(self, client, query_budget, auth_headers):
+        """The endpoint serves the stored ranking with a single query"""
+        fresh, _, _ = self._catalog()
+        compute_trending(today=TODAY)
+        headers = auth_headers
+
+        with query_budget(1):
+            response = client.get('/api/books/trending?genre=Fantasy&limit=1', headers=headers)
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['genre'] == 'Fantasy'
+        assert [b['title'] for b in data['books']] == ['Fresh']
+
+
+class TestTrendingSchedule:
+    """Tests for when the trending job starts"""
+
+    def test_not_started_by_create_app(self, app, monkeypatch):
+        """Only start_background_jobs starts the job, after init_db"""
+        started = []
+        monkeypatch.setattr(trending._job, 'start', lambda app, interval: started.append(interval))
+        app.config['TRENDING_INTERVAL_SECONDS'] = 60
+        create_app('testing')
+        assert started == []
+
+        start_background_jobs(app)
+        assert started == [60]
+
+    def test_scheduler_lock_is_exclusive(self, tmp_path):
+        """A second process cannot take the lock while it is held"""
+        path = str(tmp_path / 'scheduler.lock')
+        with open(path, 'a') as other_process:
+            fcntl.flock(other_process, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            assert acquire_lock(path) is False
+            fcntl.flock(other_process, fcntl.LOCK_UN)
+        assert acquire_lock(path) is True
+        assert acquire_lock(path) is True
@@ -0,0 +1,118 @@
+from sqlalchemy import event, update
+from extensions import db
+from models import UserBook
+
+
+def _add_book(client, headers):
+    return client.post('/api/books', json={
+        'title': 'Two Devices', 'author': 'Author', 'total_pages': 100
+    }, headers=headers).get_json()['id']
+
+
+class TestOptimisticConcurrency:
+    """Tests for version-checked updates of library entries and goals"""
+
+    def test_stale_progress_update_conflicts(self, client, auth_headers):
+        """A device writing from an outdated version gets 409 and the current state"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        [book] = client.get('/api/books?fields=id,version', headers=headers).get_json()
+        seen = book['version']
+
+        phone = client.put(f'/api/books/{book_id}/progress',
+                           json={'page_progress': 30, 'version': seen}, headers=headers)
+        tablet = client.put(f'/api/books/{book_id}/progress',
+                            json={'page_progress': 10, 'version': seen}, headers=headers)
+
+        assert phone.status_code == 200
+        assert phone.get_json()['version'] == seen + 1
+        assert tablet.status_code == 409
+        assert tablet.get_json()['book']['page_progress'] == 30
+        assert tablet.get_json()['book']['version'] == seen + 1
+
+        # Unversioned writes keep working and still bump the version
+        response = client.put(f'/api/books/{book_id}/progress', json={'page_progress': 100}, headers=headers)
+        assert response.get_json()['version'] == seen + 2
+        response = client.put(f'/api/books/{book_id}/rating', json={'rating': 4, 'version': seen}, headers=headers)
+        assert response.status_code == 409
+
+    def test_lost_race_rolls_back(self, client, auth_headers):
+        """A row changed between read and write is not overwritten"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+
+        def concurrent_write(session, flush_context, instances):
+            session.connection().execute(
+                update(UserBook).where(UserBook.book_id == book_id).values(version=UserBook.version + 1)
+            )
+
+        event.listen(db.session, 'before_flush', concurrent_write)
+        try:
+            response = client.put(f'/api/books/{book_id}/progress', json={'page_progress': 50}, headers=headers)
+        finally:
+            event.remove(db.session, 'before_flush', concurrent_write)
+
+        assert response.status_code == 409
+        db.session.expire_all()
+        assert UserBook.query.filter_by(book_id=book_id).one().page_progress == 0
+
+    def test_stale_goal_update_conflicts(self, client, auth_headers):
+        """Goal progress updates are version-checked too"""
+        headers = auth_headers
+        goal = client.post('/api/goals', json={
+            'amount': 10, 'type': 'books read', 'duration': 'this year'
+        }, headers=headers).get_json()['goal']
+
+        first = client.put(f"/api/goals/{goal['id']}", json={'progress': 2, 'version': goal['version']}, headers=headers)
+        second = client.put(f"/api/goals/{goal['id']}", json={'progress': 1, 'version': goal['version']}, headers=headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 409
+        assert second.get_json()['goal']['progress'] == 2
+        assert second.get_json()['goal']['version'] == first.get_json()['goal']['version']
+        bad = client.put(f"/api/goals/{goal['id']}", json={'progress': 1, 'version': 'x'}, headers=headers)
+        assert bad.status_code == 400
+
+    def test_delete_racing_an_update_conflicts(self, client, auth_headers):
+        """A delete that loses a race with an update gets 409, not 500, and deletes nothing"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        goal = client.post('/api/goals', json={
+            'amount': 10, 'type': 'pages read', 'duration': 'this year'
+        }, headers=headers).get_json()['goal']
+
+        def concurrent_write(session, flush_context, instances):
+            for instance in list(session.deleted):
+                table = type(instance).__table__
+                session.connection().execute(
+                    update(table).where(table.c.user_id == instance.user_id).values(version=table.c.version + 1)
+                )
+
+        event.listen(db.session, 'before_flush', concurrent_write)
+        try:
+            book = client.delete(f'/api/books/{book_id}', headers=headers)
+            goal_response = client.delete(f"/api/goals/{goal['id']}", headers=headers)
+        finally:
+            event.remove(db.session, 'before_flush', concurrent_write)
+
+        assert book.status_code == 409
+        assert book.get_json()['book']['id'] == book_id
+        assert goal_response.status_code == 409
+        assert goal_response.get_json()['goal']['id'] == goal['id']
+        assert client.delete(f'/api/books/{book_id}', headers=headers).status_code == 200
+        assert client.delete(f"/api/goals/{goal['id']}", headers=headers).status_code == 200
+
+    def test_version_must_be_an_integer(self, client, auth_headers):
+        """Books and goals reject a non-integer version with the same message"""
+        headers = auth_headers
+        book_id = _add_book(client, headers)
+        goal = client.post('/api/goals', json={
+            'amount': 10, 'type': 'books read', 'duration': 'this year'
+        }, headers=headers).get_json()['goal']
+
+        for response in (
+            client.put(f'/api/books/{book_id}/progress', json={'page_progress': 1, 'version': '1'}, headers=headers),
+            client.put(f"/api/goals/{goal['id']}", json={'progress': 1, 'version': True}, headers=headers),
+        ):
+            assert response.status_code == 400
+            assert response.get_json()['error'] == 'Version must be an integer'
@@ -0,0 +1,19 @@
+"""
+WSGI entrypoint for production servers.
+
+    gunicorn -c gunicorn.conf.py
+
+gunicorn.conf.py preloads this module in the master process, so create_app
+(and with it table creation and seeding) runs once before workers fork.
+"""
+import logging
+import os
+
+from app import create_app
+
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO'),
+    format='%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s',
+)
+
+app = create_app(os.environ.get('FLASK_CONFIG', 'production'))